@@ -149,6 +149,132 @@ def NI_DAQ_SR_Extract_Testing():
     ao_chn_str = 'Dev2/ao0:1'
     NI_DAQ_Lib.Extract_Sample_Rate(ao_chn_str, 'Dev2', True)
 
+def Channel_Spec_Testing(n_trials = 2000, seed = 1):
+
+    # Property checks for NI_DAQ_Lib.Parse_Channel_Spec and Extract_Sample_Rate against randomly generated descriptors
+    # of each of the forms listed in the Extract_Sample_Rate docstring, for each descriptor
+    # the channels are those expected, re-parsing the expanded channel list gives the same spec (round trip),
+    # shuffling the items and repeating one leaves the channels and SR unchanged, adding a channel never raises the SR
+    # and SR * no. channels never exceeds the max rate, a device_name not in the descriptor is rejected
+    # 18 - 10 - 2026
+
+    import io
+    import random
+    import contextlib
+
+    rng = random.Random(seed)
+
+    AI_SR_MAX = 20000 # max sample rate on single AI channel, units of Hz
+    AO_SR_MAX = 5000 # max sample rate on single AO channel, units of Hz
+
+    n_fail = 0
+    for trial in range(0, n_trials, 1):
+        dev = rng.choice(['Dev1', 'Dev2', 'DevInfo', 'myDAQ_3'])
+        kind = rng.choice(['ai', 'ao'])
+        n_max = 8 if kind == 'ai' else 2
+
+        # build the descriptor from random single channel and range items, keep track of the expected channel order
+        items = []
+        expected = []
+        for i in range(0, rng.randint(1, 4), 1):
+            v1 = rng.randrange(n_max)
+            v2 = rng.randrange(n_max)
+            if rng.random() < 0.5 or v1 == v2:
+                items.append(dev + '/' + kind + str(v1))
+                nums = [v1]
+            else:
+                items.append(dev + '/' + kind + str(v1) + ':' + str(v2))
+                nums = list(range(v1, v2 + 1)) if v2 > v1 else list(range(v1, v2 - 1, -1))
+            for n in nums:
+                if n not in expected: expected.append(n)
+        chn_str = rng.choice([', ', ',']).join(items)
+
+        spec = NI_DAQ_Lib.Parse_Channel_Spec(chn_str)
+        SR, no_ch = NI_DAQ_Lib.Extract_Sample_Rate(chn_str, dev)
+        SR_MAX = AI_SR_MAX if kind == 'ai' else AO_SR_MAX
+
+        ok = list(spec.channel_numbers) == expected
+        ok = ok and spec.no_ch == len(expected) == no_ch
+        ok = ok and spec.kind == kind and spec.devices == (dev,)
+        ok = ok and isinstance(SR, int) and SR == SR_MAX // len(expected)
+        ok = ok and spec.channels == tuple( [ dev + '/' + kind + str(n) for n in expected ] )
+        ok = ok and NI_DAQ_Lib.Parse_Channel_Spec(chn_str) is spec # memoized
+
+        # round trip through the expanded channel list
+        trip = NI_DAQ_Lib.Parse_Channel_Spec(', '.join(spec.channels))
+        ok = ok and trip.channels == spec.channels and trip.sample_rate == spec.sample_rate and trip.devices == spec.devices
+
+        # item order and repeated items do not change which channels are read or the SR
+        shuffled = items + [rng.choice(items)]
+        rng.shuffle(shuffled)
+        perm = NI_DAQ_Lib.Parse_Channel_Spec(','.join(shuffled))
+        ok = ok and set(perm.channels) == set(spec.channels) and perm.no_ch == spec.no_ch and perm.sample_rate == spec.sample_rate
+
+        # monotonic, one more channel never raises the SR and the total rate stays within the max
+        more = NI_DAQ_Lib.Parse_Channel_Spec(chn_str + ', ' + dev + '/' + kind + str(rng.randrange(n_max)))
+        ok = ok and more.no_ch >= spec.no_ch and more.sample_rate <= spec.sample_rate
+        ok = ok and spec.sample_rate * spec.no_ch <= SR_MAX and more.sample_rate * more.no_ch <= SR_MAX
+
+        # device_name must name the device in the descriptor, the error message is not wanted here
+        with contextlib.redirect_stdout(io.StringIO()):
+            ok = ok and NI_DAQ_Lib.Extract_Sample_Rate(chn_str, dev + 'x') is None
+        if not ok:
+            n_fail += 1
+            print("Failed: ", chn_str, spec)
+
+    print("Channel spec trials: %(v1)d, failures: %(v2)d"%{"v1":n_trials, "v2":n_fail})
+
+def Channel_Spec_Benchmark():
+
+    # Time Extract_Sample_Rate, which now parses through the memoized Parse_Channel_Spec, against the original regex branches
+    # 18 - 10 - 2026
+
+    import re
+    import time
+
+    AI_SR_MAX = 20000 # max sample rate on single AI channel, units of Hz
+
+    def Legacy_Extract(physical_channel_str, device_name):
+        # the branch structure that Extract_Sample_Rate used before Parse_Channel_Spec
+        reduced_str = physical_channel_str.replace( device_name+'/', '' )
+        if ',' in physical_channel_str and ':' not in physical_channel_str:
+            ch_nums = list ( set ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", reduced_str ) ) ) )
+            no_ch = len(ch_nums)
+        elif ':' in physical_channel_str and ',' not in physical_channel_str:
+            ch_nums = list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", reduced_str ) ) )
+            no_ch = 1 + ( max(ch_nums) - min(ch_nums) )
+        elif ':' in physical_channel_str and ',' in physical_channel_str:
+            ch_nums = []
+            for item in reduced_str.split(','):
+                nums = list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", item) ) )
+                ch_nums.extend( range( nums[0], 1+nums[1], 1 ) if ":" in item else nums )
+            no_ch = len( set( ch_nums ) )
+        else:
+            no_ch = 1
+        return [int(AI_SR_MAX / no_ch), no_ch]
+
+    chn_strs = ['Dev2/ai0', 'Dev2/ai3:6', 'Dev2/ai0, Dev2/ai1, Dev2/ai4, Dev2/ai7', 'Dev2/ai1:3, Dev2/ai4, Dev2/ai6', 'Dev2/ai0:1, Dev2/ai5:7']
+
+    n_reps = 20000
+    for chn_str in chn_strs:
+        tstart = time.perf_counter()
+        for i in range(0, n_reps, 1):
+            Legacy_Extract(chn_str, 'Dev2')
+        t_old = ( time.perf_counter() - tstart ) / n_reps
+
+        NI_DAQ_Lib.Parse_Channel_Spec.cache_clear()
+        tstart = time.perf_counter()
+        NI_DAQ_Lib.Parse_Channel_Spec(chn_str)
+        t_first = time.perf_counter() - tstart
+
+        tstart = time.perf_counter()
+        for i in range(0, n_reps, 1):
+            NI_DAQ_Lib.Extract_Sample_Rate(chn_str, 'Dev2')
+        t_new = ( time.perf_counter() - tstart ) / n_reps
+
+        print("%(v1)-40s legacy: %(v2)0.2f (us), first parse: %(v3)0.2f (us), cached: %(v4)0.2f (us)"%{"v1":chn_str,
+                "v2":1.0e6*t_old, "v3":1.0e6*t_first, "v4":1.0e6*t_new})
+
 def Making_Waves():
 
     # Ensure that you can make some waves with specific frequencies and sample rates
@@ -167,7 +293,7 @@ def Making_Waves():
         phase = 0.0
         t0 = 0.0
 
-        timeInt, w_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase)
+        timeInt, w_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, cached = True)
         t_vals, dT_AO = numpy.linspace(timeInt.start, timeInt.stop, timeInt.Nsteps, endpoint = True, retstep = True)
 
         # generate a plot
@@ -191,8 +317,8 @@ def Making_Waves():
         phase = 0.0 # phase offset
         t0 = 0.0
 
-        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase)
-        timeInt, w_vals = NI_DAQ_Lib.Generate_Square_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase)
+        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, cached = True)
+        timeInt, w_vals = NI_DAQ_Lib.Generate_Square_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, cached = True)
         t_vals, dT_AO = numpy.linspace(timeInt.start, timeInt.stop, timeInt.Nsteps, endpoint = True, retstep = True)
 
         # generate a plot
@@ -227,8 +353,8 @@ def Making_Waves():
         phase = 0.0 # phase offset
         t0 = 0.0
 
-        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase)
-        timeInt, w_vals = NI_DAQ_Lib.Generate_Square_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, pulsed = True)
+        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, cached = True)
+        timeInt, w_vals = NI_DAQ_Lib.Generate_Square_Waveform(AO_SR_MAX, AO_SR_MAX, t0, nu, amp, phase, pulsed = True, cached = True)
         t_vals, dT_AO = numpy.linspace(timeInt.start, timeInt.stop, timeInt.Nsteps, endpoint = True, retstep = True)
 
         # generate a plot
@@ -260,8 +386,8 @@ def Making_Waves():
         phase = 0.0 # phase offset
         t0 = 0.0
 
-        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX>>1, AO_SR_MAX>>1, t0, nu, amp, phase)
-        timeInt, w_vals = NI_DAQ_Lib.Generate_Triangle_Waveform(AO_SR_MAX>>1, AO_SR_MAX>>1, t0, nu, amp, phase, pulsed = True)
+        timeInt, ww_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX>>1, AO_SR_MAX>>1, t0, nu, amp, phase, cached = True)
+        timeInt, w_vals = NI_DAQ_Lib.Generate_Triangle_Waveform(AO_SR_MAX>>1, AO_SR_MAX>>1, t0, nu, amp, phase, pulsed = True, cached = True)
         t_vals, dT_AO = numpy.linspace(timeInt.start, timeInt.stop, timeInt.Nsteps, endpoint = True, retstep = True)
 
         # generate a plot
@@ -286,6 +412,209 @@ def Making_Waves():
         
         Plotting.plot_multiple_curves([[t_vals, w_vals], [t_vals, ww_vals]], args)    
 
+def Waveform_Generation_Benchmark():
+
+    # Compare the vectorised waveform generators against the original per-sample numpy.append loop
+    # 18 - 10 - 2026
+
+    import time
+
+    AO_SR_MAX = 5000 # max sample rate on single AO channel, units of Hz
+
+    nu = 10 # frequency in units of Hz
+    amp = 1.0 # wave amplitude
+    phase = 0.0 # phase offset
+    t0 = 0.0
+
+    def Legacy_Sine_Waveform(sample_rate, no_smpls, t_start, frequency, amplitude, phase):
+        # the loop that Generate_Sine_Waveform used before it was vectorised
+        deltaT = ( 1.0 / float(sample_rate) )
+        t_now = t_start
+        two_pi_nu = 2.0 * math.pi * frequency
+        w_vals = numpy.array([])
+        count = 0
+        while count < no_smpls:
+            w_vals = numpy.append(w_vals, amplitude * math.sin(two_pi_nu * t_now + phase) )
+            t_now += deltaT
+            count += 1
+        return w_vals
+
+    for n_smpls in [AO_SR_MAX>>2, AO_SR_MAX, AO_SR_MAX<<2]:
+        tstart = time.perf_counter()
+        w_old = Legacy_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase)
+        t_loop = time.perf_counter() - tstart
+
+        n_reps = 100
+        tstart = time.perf_counter()
+        for i in range(0, n_reps, 1):
+            timeInt, w_vals = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase)
+        t_vec = ( time.perf_counter() - tstart ) / n_reps
+
+        # in place generation into a preallocated float32 buffer
+        buf = numpy.empty(n_smpls, dtype = numpy.float32)
+        tstart = time.perf_counter()
+        for i in range(0, n_reps, 1):
+            NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, out = buf)
+        t_inp = ( time.perf_counter() - tstart ) / n_reps
+
+        # repeated set-up served from the waveform cache, only the first call generates
+        tstart = time.perf_counter()
+        for i in range(0, n_reps, 1):
+            NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, cached = True)
+        t_cch = ( time.perf_counter() - tstart ) / n_reps
+
+        print("N = %(v1)d, loop: %(v2)0.3f (ms), vectorised: %(v3)0.3f (ms), in place float32: %(v4)0.3f (ms), cached: %(v7)0.3f (ms), speedup: %(v5)0.1f, max diff: %(v6)0.2e"%{"v1":n_smpls,
+                "v2":1000.0*t_loop, "v3":1000.0*t_vec, "v4":1000.0*t_inp, "v5":t_loop / t_vec, "v6":numpy.max(numpy.abs(w_old - w_vals)), "v7":1000.0*t_cch})
+
+def Waveform_Cache_Testing(n_smpls = 1000, n_entries = 4):
+
+    # Check the hit / miss / eviction counts of the waveform cache behind Generate_*_Waveform(..., cached = True)
+    # a repeat set-up must be a hit that returns the same read-only array, the values must match the uncached generators,
+    # pulsed must not split the sine entries and the cache must evict least recently used entries to stay within max_bytes
+    # the cache is emptied before and after the checks and the original max_bytes is restored
+    # 18 - 10 - 2026
+
+    AO_SR_MAX = 5000 # max sample rate on single AO channel, units of Hz
+
+    nu = 10 # frequency in units of Hz
+    amp = 1.0 # wave amplitude
+    phase = 0.0 # phase offset
+    t0 = 0.0
+
+    max_bytes_default = NI_DAQ_Lib.Waveform_Cache_Info()['max_bytes']
+    max_bytes = n_entries * n_smpls * numpy.dtype(numpy.float64).itemsize # room for n_entries float64 waveforms
+    NI_DAQ_Lib.Waveform_Cache_Clear(max_bytes = max_bytes)
+
+    checks = []
+
+    # first request generates, the repeat is served from the cache
+    timeInt, w_first = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('first call is a miss', info['misses'] == 1 and info['hits'] == 0 and info['n_entries'] == 1) )
+
+    timeInt, w_again = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('repeat call is a hit', info['misses'] == 1 and info['hits'] == 1 and w_again is w_first) )
+
+    # cached arrays are shared, so they must be read-only
+    try:
+        w_first[0] = 0.0
+        raised = False
+    except ValueError:
+        raised = True
+    checks.append( ('cached array is read-only', w_first.flags.writeable is False and raised) )
+
+    # same values as the uncached generator, which still hands back a writeable array
+    timeInt, w_plain = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase)
+    checks.append( ('values match uncached', numpy.array_equal(w_plain, w_first) and w_plain.flags.writeable) )
+
+    # pulsed has no effect on a sine, both spellings share an entry
+    timeInt, w_pulsed = NI_DAQ_Lib.Generate_Cached_Waveform('sine', AO_SR_MAX, n_smpls, t0, nu, amp, phase, pulsed = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('sine pulsed shares entry', w_pulsed is w_first and info['hits'] == 2 and info['n_entries'] == 1) )
+
+    # a caller-supplied buffer bypasses the cache and is written in place
+    buf = numpy.empty(n_smpls, dtype = numpy.float64)
+    NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, out = buf, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('out bypasses cache', numpy.array_equal(buf, w_first) and info['hits'] == 2 and info['misses'] == 1) )
+
+    # n_entries + 1 more distinct waveforms, the sine is least recently used and goes first
+    for i in range(0, n_entries + 1, 1):
+        NI_DAQ_Lib.Generate_Square_Waveform(AO_SR_MAX, n_smpls, t0, nu + i + 1, amp, phase, pulsed = True, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('evictions counted', info['evictions'] == 2 and info['n_entries'] == n_entries and info['misses'] == n_entries + 2) )
+    checks.append( ('n_bytes within max_bytes', info['n_bytes'] <= info['max_bytes'] and info['n_bytes'] == n_entries * w_first.nbytes) )
+
+    timeInt, w_back = NI_DAQ_Lib.Generate_Sine_Waveform(AO_SR_MAX, n_smpls, t0, nu, amp, phase, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('evicted entry is a miss', info['misses'] == n_entries + 3 and w_back is not w_first and numpy.array_equal(w_back, w_first)) )
+
+    # a waveform larger than max_bytes is returned but not held
+    timeInt, w_big = NI_DAQ_Lib.Generate_Triangle_Waveform(AO_SR_MAX, (n_entries + 1) * n_smpls, t0, nu, amp, phase, cached = True)
+    info = NI_DAQ_Lib.Waveform_Cache_Info()
+    checks.append( ('oversize waveform not held', len(w_big) == (n_entries + 1) * n_smpls and info['n_bytes'] <= info['max_bytes'] and info['evictions'] == 3) )
+
+    NI_DAQ_Lib.Waveform_Cache_Clear(max_bytes = max_bytes_default)
+
+    n_fail = 0
+    for name, ok in checks:
+        if not ok:
+            n_fail += 1
+            print("Failed: ", name)
+
+    print("Waveform cache checks: %(v1)d, failures: %(v2)d"%{"v1":len(checks), "v2":n_fail})
+
+def Spectrum_Metrics_Testing(snr_db = 57.0, tol_db = 1.0, seed = 1):
+
+    # Check the SNR / ENOB reported by NI_DAQ_Spectrum.Spectrum_Metrics against synthetic tones of known SNR
+    # the tones are not bin-centred so the leakage skirt of each window has to be counted as part of the tone, not as noise
+    # 18 - 10 - 2026
+
+    import NI_DAQ_Spectrum
+
+    rng = numpy.random.default_rng(seed)
+
+    SR = 5000.0 # sample rate in units of Hz
+    n_per_seg = 4096
+    n_smpls = 16 * n_per_seg
+    amp = 1.0 # tone amplitude in units of V
+    sigma = (amp / math.sqrt(2.0)) * 10.0**(-snr_db / 20.0) # noise rms giving snr_db
+    enob = (snr_db - 1.76) / 6.02
+
+    t_vals = numpy.arange(n_smpls) / SR
+    n_fail = 0
+    for nu in [137.3, 611.7, 1000.0]:
+        w_vals = amp * numpy.sin(2.0 * math.pi * nu * t_vals) + rng.normal(0.0, sigma, n_smpls)
+        for window in ['hann', 'blackman', 'flattop']:
+            psd = NI_DAQ_Spectrum.Welch_PSD(1, SR, n_per_seg, window = window)
+            psd.update(w_vals)
+            metrics = NI_DAQ_Spectrum.Spectrum_Metrics(psd.frequencies, psd.psd()[0], psd.mainlobe)
+            ok = abs(metrics['snr_db'] - snr_db) < tol_db and abs(metrics['frequency'] - nu) < psd.frequencies[1]
+            if not ok: n_fail += 1
+            print("%(v1)s: f = %(v2)0.1f (Hz), SNR = %(v3)0.1f (dB), ENOB = %(v4)0.2f, expected %(v5)0.1f (dB), %(v6)0.2f, %(v7)s"%{"v1":window,
+                    "v2":nu, "v3":metrics['snr_db'], "v4":metrics['enob'], "v5":snr_db, "v6":enob, "v7":'pass' if ok else 'FAIL'})
+
+    print("Spectrum metrics failures: %(v1)d"%{"v1":n_fail})
+
+def Pipeline_Testing(n_blocks = 10, n_runs = 20):
+
+    # Check that every block reaches a lossless stage in order and that a slow lossy stage skips blocks
+    # but always processes the last block of the run and is not ranked as the bottleneck
+    # 18 - 10 - 2026
+
+    import time
+    import NI_DAQ_Pipeline
+
+    n_fail = 0
+    for run in range(0, n_runs, 1):
+        count = [0]
+        def Source(buf):
+            if count[0] == n_blocks: return 0
+            buf[:] = count[0]
+            count[0] += 1
+            return buf.shape[1]
+
+        seen = []
+        plotted = []
+        stages = [NI_DAQ_Pipeline.Stage('reduce', lambda block: seen.append(block.seq)),
+                  NI_DAQ_Pipeline.Stage('plot', lambda block: [plotted.append(block.seq), time.sleep(0.005)], lossy = True)]
+        # more buffers than blocks so the producer ends the run while the lossy stage is still busy
+        pipe = NI_DAQ_Pipeline.Pipeline(Source, stages, shape = (2, 100), n_buffers = n_blocks + 2)
+        stats = pipe.run(10.0)
+
+        plot_stats = stats['stages']['plot']
+        ok = seen == list(range(n_blocks))
+        ok = ok and len(plotted) > 0 and plotted[-1] == n_blocks - 1 and plotted == sorted(plotted)
+        ok = ok and plot_stats['blocks'] + plot_stats['skipped'] == n_blocks and pipe.pool.n_free() == n_blocks + 2
+        # the busy lossy stage is never reported as the bottleneck
+        ok = ok and stats['producer']['blocks'] == n_blocks and pipe.bottleneck() == 'reduce'
+        if not ok:
+            n_fail += 1
+            print("Failed: ", seen, plotted, plot_stats)
+
+    print("Pipeline runs: %(v1)d, failures: %(v2)d"%{"v1":n_runs, "v2":n_fail})
+
 def main():
     pass
 
@@ -295,9 +624,27 @@ if __name__ == '__main__':
     pwd = os.getcwd() # get current working directory
 
     print(pwd)
+
+    # Uncomment to run any of the routines below against a simulated USB-6001 instead of hardware
+    #import NI_DAQ_Sim
+    #NI_DAQ_Sim.Add_Device('Dev2', noise = 1.0e-3, latency = 1.0e-3, realtime = True)
+    #NI_DAQ_Lib.Use_Backend(NI_DAQ_Sim)
+
+    # Uncomment to time every driver call made by the routines below, see NI_DAQ_Metrics.py
+    #import NI_DAQ_Metrics
+    #NI_DAQ_Lib.Instrumentation(True)
+    #NI_DAQ_Metrics.Report() # after the routine has run, or NI_DAQ_Metrics.Export_JSON('metrics.json'), NI_DAQ_Metrics.Export_Prometheus('metrics.prom')
     
     #Making_Waves()
 
+    #Waveform_Generation_Benchmark()
+
+    #Waveform_Cache_Testing()
+
+    # Full benchmark suite, results saved as JSON and compared against an earlier run, see NI_DAQ_Bench.py
+    #import NI_DAQ_Bench
+    #NI_DAQ_Bench.Compare_Benchmarks('bench_old.json', NI_DAQ_Bench.Run_Benchmarks('bench_new.json'))
+
     #NI_DAQ_Lib.AO_Write_Test()
     
     #NI_DAQ_Lib.AI_Read_Test()
@@ -306,14 +653,67 @@ if __name__ == '__main__':
 
     #NI_DAQ_Lib.AI_Read_Multiple_Channels()
 
+    #block = NI_DAQ_Lib.AI_Read_Raw('Dev2/ai0:3', 'Dev2', 10000, loud = True) # int16 codes, block.volts() scales on demand
+
     #NI_DAQ_Lib.NI_DAQ_String_Hacking()
 
     #NI_DAQ_Lib.NI_DAQ_SR_Extract_Testing()
 
+    #Channel_Spec_Testing()
+
+    #Channel_Spec_Benchmark()
+
     #NI_DAQ_Lib.AI_Read_Multiple_Channels_with_Clock()
 
     #NI_DAQ_Lib.DC_Sweep_Diode()
 
     NI_DAQ_Lib.AO_Waveform_Write_Test()
 
-    #NI_DAQ_Lib.AI_Waveform_Read_Test()
\ No newline at end of file
+    # Long runs to disk, open the file with NI_DAQ_Recorder.Recording('ai_run.bin') while it is being written or afterwards
+    #NI_DAQ_Lib.AI_Record('Dev2/ai0:3', 'Dev2', 'ai_run.bin', duration = 3600.0, loud = True)
+
+    #NI_DAQ_Lib.AI_Live_View('Dev2/ai0:3', 'Dev2', duration = 30.0, window_time = 2.0, loud = True)
+
+    # Capture 10 ms before to 40 ms after each rising crossing of 0.5 V on ai0, see NI_DAQ_Trigger.py for the other conditions
+    #NI_DAQ_Lib.AI_Triggered_Capture('Dev2/ai0:3', 'Dev2', channel = 0, mode = 'edge', level = 0.5, hysteresis = 0.05, n_captures = 10, loud = True)
+
+    # Welch PSD of each channel with THD / SNR / ENOB of the largest tone, drive ao0 with AO_Stream_Waveform for a loopback test
+    #NI_DAQ_Lib.AI_Spectrum('Dev2/ai0:3', 'Dev2', duration = 10.0, n_per_seg = 4096, window = 'blackman', loud = True)
+
+    #Spectrum_Metrics_Testing()
+
+    # Bode plot data in about a second, ai0 reads the ao0 loopback as the reference, ai1 the output of the device under test
+    #NI_DAQ_Lib.Frequency_Response('Dev2/ao0', 'Dev2/ai0:1', 'Dev2', excitation = 'multisine', f_start = 10.0, f_stop = 2000.0, loud = True)
+
+    # Lock-in detection of a small 137 Hz excitation, run AO_Stream_Waveform('Dev2/ao0', 'Dev2', 'sine', 137.0, 0.05, duration = 30.0) alongside
+    #NI_DAQ_Lib.AI_Lock_In('Dev2/ai0:3', 'Dev2', frequencies = [137.0], out_rate = 10.0, duration = 20.0, loud = True)
+
+    # Low-noise DC readings, 20 readings at 10 Hz each the CIC filtered average of the samples acquired at the max AI rate, see NI_DAQ_Decimate.py
+    #NI_DAQ_Lib.AI_Read_Decimated('Dev2/ai0:3', 'Dev2', n_out = 20, out_rate = 10.0, method = 'cic', loud = True)
+    #NI_DAQ_Lib.AI_Decimated_Stream('Dev2/ai0:3', 'Dev2', out_rate = 10.0, method = 'cic', duration = 30.0, loud = True)
+
+    # Acquisition on its own thread overlapped with processing stages, prints the queue depth and utilisation of each stage, see NI_DAQ_Pipeline.py
+    #import NI_DAQ_Pipeline
+    #stages = [NI_DAQ_Pipeline.Stage('reduce', lambda block: print(block.seq, block.volts().mean(axis = 1)), lossy = True)]
+    #NI_DAQ_Lib.AI_Pipeline('Dev2/ai0:3', 'Dev2', stages = stages, duration = 10.0, block_time = 0.1, loud = True)
+
+    #Pipeline_Testing()
+
+    # asyncio facade, every driver call runs on an executor dedicated to its task so the event loop is never blocked, see NI_DAQ_Async.py
+    #import asyncio, NI_DAQ_Async
+    #means, stds = asyncio.run( NI_DAQ_Async.Async_DC_Sweep('Dev2/ao0', 'Dev2/ai0:3', 'Dev2', numpy.linspace(0.0, 5.0, 11), loud = True) )
+
+    # Publish the live AI stream on a shared-memory bus, other processes read it with NI_DAQ_Bus.Bus_Subscriber('NI_DAQ_Bus'), see NI_DAQ_Bus.py
+    #NI_DAQ_Lib.AI_Publish('Dev2/ai0:3', 'Dev2', bus_name = 'NI_DAQ_Bus', duration = 3600.0, bus_time = 10.0, loud = True)
+
+    # Several devices at once, merged onto one drift-corrected time grid, see NI_DAQ_Multi.py
+    #import NI_DAQ_Multi
+    #NI_DAQ_Multi.Multi_Device_Acquire([('Dev1/ai0:3', 'Dev1'), ('Dev2/ai0:3', 'Dev2')], duration = 30.0, loud = True)
+
+    #NI_DAQ_Lib.AO_Stream_Waveform('Dev2/ao0', 'Dev2', 'sine', frequency = 7.3, amplitude = 1.0, duration = 30.0, loud = True)
+
+    #NI_DAQ_Lib.AI_Waveform_Read_Test()
+
+    #NI_DAQ_Lib.AI_Monitor('Dev2/ai0:3', 'Dev2', loud = True, duration = 30.0)
+
+    #NI_DAQ_Lib.Session_Latency_Test('Dev2/ai0:3', 'Dev2/ao0', 'Dev2')
\ No newline at end of file
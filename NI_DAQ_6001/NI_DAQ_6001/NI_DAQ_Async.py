@@ -0,0 +1,329 @@
+"""
+asyncio facade for NI-DAQ acquisition and generation tasks
+
+Every blocking driver call, task creation, configuration, start, read, write, wait and close, runs on an executor
+dedicated to its task, a single worker thread, so the calls on one task stay in order while the event loop stays free
+Many tasks on one or more devices can then be coordinated from one event loop with asyncio.gather, and the caller
+never sees a thread
+
+18 - 10 - 2026
+"""
+
+# Usage
+# async with Async_AI_Stream('Dev2/ai0:3', 'Dev2', block_time = 0.1) as stream:
+#     async for block in stream.blocks(duration = 10.0):
+#         volts = stream.volts(block)
+# async with Async_AO('Dev2/ao0', 'Dev2') as ao: await ao.write(1.5)
+# means, stds = await Async_DC_Sweep('Dev2/ao0', 'Dev2/ai0:3', 'Dev2', numpy.linspace(0, 5, 11))
+# asyncio.run(main()) from synchronous code
+
+# Cancellation
+# A driver call that has started cannot be interrupted, so when an awaiting coroutine is cancelled the call finishes on the executor,
+# at most one read of block_time later, and its result is discarded. close() is shielded from cancellation and queued behind it,
+# so leaving an async with block, normally, by an exception or by cancellation, always stops and closes the task and ends its thread
+
+# import required libraries
+import asyncio
+import functools
+import concurrent.futures
+import numpy
+import NI_DAQ_Lib
+
+MOD_NAME_STR = "NI_DAQ_Async"
+
+class Async_Task:
+    """
+    An nidaqmx task driven from asyncio, every call on the task runs on the task's own single-thread executor
+
+    Inputs
+    configure(function) called as configure(task) on the executor after the task is created, adds channels, timing, readers
+
+    await open() creates and configures the task, or use async with, which also closes it
+    await start(), stop(), read(n), write(values), wait_until_done(timeout), close()
+    await call(func, ...) runs any other blocking function on the task's executor, e.g. call(lambda: task.in_stream.avail_samp_per_chan)
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, configure = None):
+        self.configure = configure
+        self.task = None
+        self.closed = False
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1, thread_name_prefix = MOD_NAME_STR)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    async def call(self, func, *args, **kwargs):
+        """
+        run func(*args, **kwargs) on the executor of this task and return its result
+        """
+        if self.closed:
+            raise RuntimeError('task is closed')
+        return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def _open(self):
+        task = NI_DAQ_Lib.nidaqmx.Task()
+        try:
+            if self.configure is not None: self.configure(task)
+        except Exception:
+            task.close()
+            raise
+        self.task = task
+
+    async def open(self):
+        await self.call(self._open)
+        return self
+
+    async def start(self):
+        await self.call(self.task.start)
+
+    async def stop(self):
+        await self.call(self.task.stop)
+
+    async def read(self, number_of_samples_per_channel = None, timeout = 10.0):
+        if number_of_samples_per_channel is None:
+            return await self.call(self.task.read, timeout = timeout)
+        return await self.call(self.task.read, number_of_samples_per_channel, timeout = timeout)
+
+    async def write(self, values, timeout = 10.0):
+        return await self.call(self.task.write, values, timeout = timeout)
+
+    async def wait_until_done(self, timeout = 10.0):
+        await self.call(self.task.wait_until_done, timeout = timeout)
+
+    def _close(self):
+        if self.task is None: return
+        try:
+            self.task.stop()
+        except Exception:
+            pass
+        self.task.close()
+        self.task = None
+
+    async def close(self):
+        """
+        stop and close the task, then end the executor thread, shielded so a cancelled caller still releases the device
+        """
+        if self.closed: return
+        self.closed = True
+        future = asyncio.get_running_loop().run_in_executor(self.executor, self._close)
+        try:
+            await asyncio.shield(future)
+        finally:
+            self.executor.shutdown(wait = False)
+
+class Async_AO(Async_Task):
+    """
+    On-demand AO channels, await write(value) sets the output, a list gives one value per channel
+
+    Inputs
+    physical_channel_str(str) AO channels, e.g. 'Dev2/ao0:1'
+    device_name(str) e.g. 'Dev2'
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, physical_channel_str = 'Dev2/ao0', device_name = 'Dev2'):
+        Async_Task.__init__(self, self._configure)
+        self.physical_channel_str = physical_channel_str
+        self.device_name = device_name
+
+    def _configure(self, task):
+        task.ao_channels.add_ao_voltage_chan(self.physical_channel_str, min_val = -10, max_val = +10)
+
+class Async_AI_Stream(Async_Task):
+    """
+    Continuous AI at the max rate, read block by block with an async iterator
+
+    Inputs
+    physical_channel_str(str) AI channels, differential read is assumed, e.g. 'Dev2/ai0:3'
+    device_name(str) e.g. 'Dev2'
+    block_time(float) length of time covered by each block in units of second
+    raw(boolean) True => blocks are int16 codes, use volts(block) to scale them, False => float64 volts
+
+    Attributes
+    sample_rate(float) per channel in units of Hz, n_channels(int), block_size(int) samples per channel per block
+    coeffs(numpy array) scaling of raw codes to volts, set by open() when raw is True
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', block_time = 0.1, raw = False):
+        if block_time <= 0:
+            raise ValueError('block_time must be positive')
+        Async_Task.__init__(self, self._configure)
+        self.physical_channel_str = physical_channel_str
+        self.device_name = device_name
+        self.sample_rate, self.n_channels = NI_DAQ_Lib.Extract_Sample_Rate(physical_channel_str, device_name)
+        self.block_time = block_time
+        self.block_size = max(1, int(self.sample_rate * block_time))
+        self.raw = raw
+        self.coeffs = None
+        self.running = False
+
+    def _configure(self, task):
+        nidaqmx = NI_DAQ_Lib.nidaqmx
+        task.ai_channels.add_ai_voltage_chan(self.physical_channel_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF,
+                                             min_val = -10, max_val = +10)
+        # In CONTINUOUS mode samps_per_chan sets the size of the driver buffer, 2 s covers a busy event loop
+        task.timing.cfg_samp_clk_timing(self.sample_rate, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS,
+                                        samps_per_chan = max(8 * self.block_size, int(2.0 * self.sample_rate)), active_edge = nidaqmx.constants.Edge.RISING)
+        if self.raw:
+            self.coeffs = NI_DAQ_Lib.AI_Scaling_Coefficients(task)
+            self.read_many = nidaqmx.stream_readers.AnalogUnscaledReader(task.in_stream).read_int16
+        else:
+            self.read_many = nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream).read_many_sample
+
+    async def start(self):
+        await Async_Task.start(self)
+        self.running = True
+
+    async def stop(self):
+        await Async_Task.stop(self)
+        self.running = False
+
+    def _read(self, out):
+        self.read_many(out, number_of_samples_per_channel = self.block_size, timeout = self.block_time + 10.0)
+        return out
+
+    async def read_block(self, out = None):
+        """
+        next block of shape (n_channels, block_size), read into out if given, starts the task if it is not running
+        """
+        if not self.running: await self.start()
+        if out is None: out = numpy.zeros( (self.n_channels, self.block_size), dtype = numpy.int16 if self.raw else numpy.float64 )
+        return await self.call(self._read, out)
+
+    async def blocks(self, n_blocks = None, duration = None):
+        """
+        async iterator over the acquired blocks, ends after n_blocks blocks or duration seconds of samples, None => runs until the
+        loop is left, each block is a new array the caller may keep
+        """
+        if duration is not None:
+            n_blocks = int(round(duration / self.block_time))
+        count = 0
+        while n_blocks is None or count < n_blocks:
+            yield await self.read_block()
+            count += 1
+
+    def volts(self, block):
+        """
+        block in units of V
+        """
+        return NI_DAQ_Lib.Scale_Raw(block, self.coeffs) if self.raw else block
+
+class Async_Set_Measure:
+    """
+    Set-point-then-measure on an AO / AI pair, await measure(value) sets the AO, waits settle_time without blocking the loop
+    and averages a FINITE AI acquisition of measure_time at the max rate
+
+    Inputs
+    ao_chn_str(str) AO channels, ai_chn_str(str) AI channels, device_name(str)
+    settle_time(float) wait after each set-point in units of second
+    measure_time(float) length of each AI acquisition in units of second
+
+    measure(value) output is a list [mean, std], each of shape (n_ai_channels,) in units of V
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, ao_chn_str = 'Dev2/ao0', ai_chn_str = 'Dev2/ai0:3', device_name = 'Dev2', settle_time = 0.01, measure_time = 0.05):
+        self.ao = Async_AO(ao_chn_str, device_name)
+        self.ai_chn_str = ai_chn_str
+        self.sample_rate, self.n_channels = NI_DAQ_Lib.Extract_Sample_Rate(ai_chn_str, device_name)
+        self.n_samples = max(2, int(self.sample_rate * measure_time)) # at least 2 for the ddof = 1 std
+        self.settle_time = settle_time
+        self.data = numpy.zeros( (self.n_channels, self.n_samples) ) # reused for every measurement
+        self.ai = Async_Task(self._configure)
+
+    def _configure(self, task):
+        nidaqmx = NI_DAQ_Lib.nidaqmx
+        task.ai_channels.add_ai_voltage_chan(self.ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, min_val = -10, max_val = +10)
+        task.timing.cfg_samp_clk_timing(self.sample_rate, sample_mode = nidaqmx.constants.AcquisitionType.FINITE,
+                                        samps_per_chan = self.n_samples, active_edge = nidaqmx.constants.Edge.RISING)
+        self.reader = nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    async def open(self):
+        try:
+            await asyncio.gather(self.ao.open(), self.ai.open())
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def close(self):
+        await asyncio.gather(self.ao.close(), self.ai.close())
+
+    def _acquire(self):
+        task = self.ai.task
+        task.start()
+        self.reader.read_many_sample(self.data, number_of_samples_per_channel = self.n_samples, timeout = self.n_samples / float(self.sample_rate) + 10.0)
+        task.stop()
+        return [numpy.mean(self.data, axis = 1), numpy.std(self.data, axis = 1, ddof = 1)]
+
+    async def measure(self, value):
+        await self.ao.write(value)
+        await asyncio.sleep(self.settle_time)
+        return await self.ai.call(self._acquire)
+
+async def Async_DC_Sweep(ao_chn_str, ai_chn_str, device_name, ao_vals, settle_time = 0.01, measure_time = 0.05, loud = False):
+    """
+    DC sweep awaiting each set-point-then-measure step, other coroutines run during every settle and acquisition
+
+    Inputs
+    ao_chn_str(str), ai_chn_str(str), device_name(str), settle_time(float), measure_time(float) as for Async_Set_Measure
+    ao_vals(numpy array) set-points of shape (n_ao_channels, n_steps), a 1D array is accepted for a single AO channel
+    loud(boolean) print each step
+
+    Output is a list [means, stds], each of shape (n_ai_channels, n_steps), as returned by NI_DAQ_Lib.Hardware_Timed_DC_Sweep
+    The output is returned to zero at the end of the sweep, and the tasks are closed even if the sweep is cancelled
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Async_DC_Sweep()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ao_vals = numpy.atleast_2d( numpy.asarray(ao_vals, dtype = numpy.float64) )
+        n_ao = NI_DAQ_Lib.Parse_Channel_Spec(ao_chn_str).no_ch
+
+        c1 = True if ao_vals.shape[0] == n_ao and ao_vals.shape[1] > 0 else False
+        c2 = True if settle_time >= 0 and measure_time > 0 else False
+        c10 = c1 and c2
+
+        if c10:
+            n_steps = ao_vals.shape[1]
+            async with Async_Set_Measure(ao_chn_str, ai_chn_str, device_name, settle_time, measure_time) as sm:
+                means = numpy.zeros( (sm.n_channels, n_steps) )
+                stds = numpy.zeros( (sm.n_channels, n_steps) )
+                try:
+                    for i in range(n_steps):
+                        value = float(ao_vals[0, i]) if n_ao == 1 else ao_vals[:, i].tolist()
+                        means[:, i], stds[:, i] = await sm.measure(value)
+                        if loud:
+                            print("step %(v1)d: "%{"v1":i}, value, numpy.round(means[:, i], 4))
+                finally:
+                    await asyncio.shield( sm.ao.write(0.0 if n_ao == 1 else [0.0] * n_ao) )
+            return [means, stds]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_vals must have one row per AO channel and at least one step'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsettle_time must be >= 0 and measure_time > 0'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
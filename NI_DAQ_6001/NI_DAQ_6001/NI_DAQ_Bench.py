@@ -0,0 +1,423 @@
+"""
+Benchmark suite for the hot paths in NI_DAQ_Lib
+
+Times waveform generation, channel string parsing, live plot decimation and rendering,
+single-point vs block reads and end-to-end sweeps
+Results are written as JSON so that runs can be compared and regressions flagged
+
+18 - 10 - 2026
+"""
+
+# Usage
+# python NI_DAQ_Bench.py --out bench_new.json
+# python NI_DAQ_Bench.py --out bench_new.json --compare bench_old.json
+# By default reads and sweeps run against NI_DAQ_Sim on its virtual clock, so they measure software overhead only
+# Pass --hardware to run them against the device selected by NI_DAQ_Lib instead
+
+# import required libraries
+import sys
+import json
+import time
+import numpy
+import asyncio
+import argparse
+import datetime
+import platform
+import NI_DAQ_Lib
+import NI_DAQ_Sim
+import NI_DAQ_Live_Plot
+import NI_DAQ_Trigger
+import NI_DAQ_Spectrum
+import NI_DAQ_Lockin
+import NI_DAQ_Decimate
+import NI_DAQ_Pipeline
+import NI_DAQ_Async
+import NI_DAQ_Bus
+
+MOD_NAME_STR = "NI_DAQ_Bench"
+
+def Time_Call(func, n_reps = 20, n_warmup = 2):
+    """
+    Time func() n_reps times after n_warmup untimed calls
+
+    Output is a dict with keys n, min, median, mean, max, all times in units of second
+
+    18 - 10 - 2026
+    """
+
+    for i in range(0, n_warmup, 1):
+        func()
+
+    times = numpy.zeros(n_reps)
+    for i in range(0, n_reps, 1):
+        tstart = time.perf_counter()
+        func()
+        times[i] = time.perf_counter() - tstart
+
+    return {'n':n_reps, 'min':float(numpy.min(times)), 'median':float(numpy.median(times)), 'mean':float(numpy.mean(times)), 'max':float(numpy.max(times))}
+
+def Bench_Waveforms(sizes = (1000, 5000, 20000, 100000), n_reps = 20):
+    """
+    Time Generate_Sine_Waveform, Generate_Square_Waveform and Generate_Triangle_Waveform across buffer sizes
+    waveform.sine_cached times the repeated set-up served from the waveform cache
+
+    18 - 10 - 2026
+    """
+
+    results = {}
+    for n in sizes:
+        results['waveform.sine.%d'%(n)] = Time_Call(lambda: NI_DAQ_Lib.Generate_Sine_Waveform(NI_DAQ_Lib.AO_SR_MAX, n, 0.0, 10.0, 1.0, 0.0), n_reps)
+        results['waveform.square.%d'%(n)] = Time_Call(lambda: NI_DAQ_Lib.Generate_Square_Waveform(NI_DAQ_Lib.AO_SR_MAX, n, 0.0, 10.0, 1.0, 0.0, True), n_reps)
+        results['waveform.triangle.%d'%(n)] = Time_Call(lambda: NI_DAQ_Lib.Generate_Triangle_Waveform(NI_DAQ_Lib.AO_SR_MAX, n, 0.0, 10.0, 1.0, 0.0, False), n_reps)
+        results['waveform.sine_cached.%d'%(n)] = Time_Call(lambda: NI_DAQ_Lib.Generate_Sine_Waveform(NI_DAQ_Lib.AO_SR_MAX, n, 0.0, 10.0, 1.0, 0.0, cached = True), n_reps)
+    return results
+
+def Bench_Channel_Parsing(n_reps = 200):
+    """
+    Time Extract_Sample_Rate across the channel string shapes listed in its docstring
+    Both the first (uncached) parse and the repeated (memoized) call are timed
+
+    18 - 10 - 2026
+    """
+
+    shapes = {'single':'Dev2/ai0', 'range':'Dev2/ai0:3', 'list':'Dev2/ai0, Dev2/ai1, Dev2/ai4, Dev2/ai7',
+              'mixed':'Dev2/ai1:3, Dev2/ai4, Dev2/ai6', 'ranges':'Dev2/ai0:1, Dev2/ai5:7'}
+
+    def First_Parse(chn_str):
+        NI_DAQ_Lib.Parse_Channel_Spec.cache_clear()
+        NI_DAQ_Lib.Extract_Sample_Rate(chn_str, 'Dev2')
+
+    results = {}
+    for label, chn_str in shapes.items():
+        results['channels.first.' + label] = Time_Call(lambda: First_Parse(chn_str), n_reps)
+        results['channels.cached.' + label] = Time_Call(lambda: NI_DAQ_Lib.Extract_Sample_Rate(chn_str, 'Dev2'), n_reps)
+    return results
+
+def Bench_Reads(ai_chn_str = 'Dev2/ai0:3', device_name = 'Dev2', n_samples = 1000, n_reps = 10):
+    """
+    Compare n_samples single-point on-demand reads against one block read of n_samples per channel
+    returned as a list, read into a float64 array and read as raw int16 codes, plus the cost of scaling the raw codes
+    Output includes the effective sample throughput of each method in samples per second per channel
+
+    18 - 10 - 2026
+    """
+
+    ai_SR, ai_no_ch = NI_DAQ_Lib.Extract_Sample_Rate(ai_chn_str, device_name)
+
+    results = {}
+
+    with NI_DAQ_Lib.nidaqmx.Task() as task:
+        task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = NI_DAQ_Lib.nidaqmx.constants.TerminalConfiguration.DIFF,
+                                             min_val = -10, max_val = +10)
+        task.start()
+        def Single_Points():
+            for i in range(0, n_samples, 1):
+                task.read()
+        results['reads.single_point'] = Time_Call(Single_Points, n_reps, 1)
+        task.stop()
+
+    with NI_DAQ_Lib.nidaqmx.Task() as task:
+        task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = NI_DAQ_Lib.nidaqmx.constants.TerminalConfiguration.DIFF,
+                                             min_val = -10, max_val = +10)
+        task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = NI_DAQ_Lib.nidaqmx.constants.AcquisitionType.FINITE, samps_per_chan = n_samples)
+        task.control(NI_DAQ_Lib.nidaqmx.constants.TaskMode.TASK_COMMIT)
+        def Block_List():
+            task.start()
+            task.read(n_samples)
+            task.stop()
+        results['reads.block_list'] = Time_Call(Block_List, n_reps, 1)
+
+        reader = NI_DAQ_Lib.nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream)
+        data = numpy.zeros((ai_no_ch, n_samples))
+        def Block_Numpy():
+            task.start()
+            reader.read_many_sample(data, number_of_samples_per_channel = n_samples)
+            task.stop()
+        results['reads.block_numpy'] = Time_Call(Block_Numpy, n_reps, 1)
+
+        raw_reader = NI_DAQ_Lib.nidaqmx.stream_readers.AnalogUnscaledReader(task.in_stream)
+        codes = numpy.zeros((ai_no_ch, n_samples), dtype = numpy.int16)
+        def Block_Raw():
+            task.start()
+            raw_reader.read_int16(codes, number_of_samples_per_channel = n_samples)
+            task.stop()
+        results['reads.block_raw_int16'] = Time_Call(Block_Raw, n_reps, 1)
+
+        # cost of the deferred conversion of the raw block to volts
+        coeffs = NI_DAQ_Lib.AI_Scaling_Coefficients(task)
+        volts = numpy.zeros((ai_no_ch, n_samples))
+        results['reads.scale_raw'] = Time_Call(lambda: NI_DAQ_Lib.Scale_Raw(codes, coeffs, volts), n_reps)
+
+    for key in ('reads.single_point', 'reads.block_list', 'reads.block_numpy', 'reads.block_raw_int16'):
+        results[key]['samples_per_s'] = n_samples / results[key]['median']
+
+    return results
+
+def Bench_Sweeps(ao_chn_str = 'Dev2/ao0:1', ai_chn_str = 'Dev2/ai0:3', device_name = 'Dev2', n_steps = 20, n_reps = 3):
+    """
+    End-to-end latency of a DC sweep with the hardware-timed and the adaptive settle engines
+
+    18 - 10 - 2026
+    """
+
+    ao_vals = numpy.vstack( [numpy.linspace(0.0, 3.0, n_steps), numpy.zeros(n_steps)] )
+
+    results = {}
+    results['sweep.hardware_timed'] = Time_Call(lambda: NI_DAQ_Lib.Hardware_Timed_DC_Sweep(ao_chn_str, ai_chn_str, device_name, ao_vals, 0.02, 0.1), n_reps, 1)
+    results['sweep.adaptive'] = Time_Call(lambda: NI_DAQ_Lib.Adaptive_DC_Sweep(ao_chn_str, ai_chn_str, device_name, ao_vals), n_reps, 1)
+    return results
+
+def Bench_Live_Plot(n_channels = 4, n_samples = 20000, n_reps = 20):
+    """
+    Time min / max and LTTB decimation of a 20 000 sample window and one headless (Agg) frame of the live plot
+
+    18 - 10 - 2026
+    """
+
+    t = numpy.arange(n_samples) / 5000.0
+    data = numpy.vstack( [ numpy.sin(2.0 * numpy.pi * (i + 1) * t) + 1.0e-3 * numpy.random.default_rng(i).standard_normal(n_samples)
+                          for i in range(n_channels) ] )
+
+    view = NI_DAQ_Live_Plot.Live_Plot(n_channels, 5000.0, n_samples / 5000.0, headless = True)
+
+    results = {}
+    results['plot.decimate_minmax'] = Time_Call(lambda: NI_DAQ_Live_Plot.Decimate_Min_Max(data, 1000), n_reps)
+    results['plot.decimate_lttb'] = Time_Call(lambda: [ NI_DAQ_Live_Plot.Decimate_LTTB(row, 1000) for row in data ], n_reps)
+    results['plot.frame_headless'] = Time_Call(lambda: view.update(data), n_reps)
+    return results
+
+def Bench_Trigger(n_samples = 20000, n_reps = 20):
+    """
+    Time software trigger detection on one second of a 1 kHz sine at the full 20 kS/s, i.e. 1000 trigger events per block
+
+    18 - 10 - 2026
+    """
+
+    x = numpy.sin(2.0 * numpy.pi * 1000.0 * numpy.arange(n_samples) / 20000.0) + 1.0e-3 * numpy.random.default_rng(0).standard_normal(n_samples)
+
+    results = {}
+    results['trigger.detect_edge'] = Time_Call(lambda: NI_DAQ_Trigger.Find_Triggers( NI_DAQ_Trigger.Condition_State(x, 'edge', 0.1, 'rising', 0.05) ), n_reps)
+    results['trigger.detect_window'] = Time_Call(lambda: NI_DAQ_Trigger.Find_Triggers( NI_DAQ_Trigger.Condition_State(x, 'window', hysteresis = 0.05, 
+                                                                                                                   window = (-0.2, 0.2)) ), n_reps)
+    return results
+
+def Bench_Spectrum(n_channels = 4, n_samples = 5000, n_reps = 20):
+    """
+    Time one Welch update with one second of 4 channel data at 5 kS/s, 4096 point Hann segments with 50 % overlap
+
+    18 - 10 - 2026
+    """
+
+    t = numpy.arange(n_samples) / 5000.0
+    data = numpy.vstack( [ numpy.sin(2.0 * numpy.pi * 50.0 * (i + 1) * t) + 1.0e-3 * numpy.random.default_rng(i).standard_normal(n_samples)
+                          for i in range(n_channels) ] )
+    welch = NI_DAQ_Spectrum.Welch_PSD(n_channels, 5000.0, 4096)
+
+    results = {}
+    results['spectrum.welch_update'] = Time_Call(lambda: welch.update(data), n_reps)
+    results['spectrum.metrics'] = Time_Call(lambda: NI_DAQ_Spectrum.Spectrum_Metrics(welch.frequencies, welch.psd()[0], welch.mainlobe), n_reps)
+    return results
+
+def Bench_Lock_In(n_channels = 4, n_samples = 5000, n_reps = 20):
+    """
+    Time lock-in demodulation of one second of 4 channel data at 5 kS/s against 2 references, 10 Hz output
+    lock_in.per_sample is the cost per input sample per channel per reference, in units of second
+
+    18 - 10 - 2026
+    """
+
+    t = numpy.arange(n_samples) / 5000.0
+    data = numpy.vstack( [ 1.0e-2 * numpy.sin(2.0 * numpy.pi * 137.0 * t) + 1.0e-3 * numpy.random.default_rng(i).standard_normal(n_samples)
+                          for i in range(n_channels) ] )
+    lock_in = NI_DAQ_Lockin.Lock_In(5000.0, n_channels, [137.0, 211.0], out_rate = 10.0)
+
+    results = {}
+    results['lock_in.block'] = Time_Call(lambda: lock_in.process(data), n_reps)
+    n_ops = float(n_samples * n_channels * 2)
+    results['lock_in.per_sample'] = dict( [ (key, value / n_ops if key != 'n' else value) for key, value in results['lock_in.block'].items() ] )
+    return results
+
+def Bench_Decimate(n_channels = 4, n_samples = 20000, ratio = 100, n_reps = 20):
+    """
+    Time each decimator on one second of 4 channel int16 codes at 20 kS/s, decimated by 100 to 200 Hz
+    decimate.<method>.per_sample is the cost per input sample per channel, in units of second
+
+    18 - 10 - 2026
+    """
+
+    codes = numpy.random.default_rng(0).integers(-100, 100, size = (n_channels, n_samples), dtype = numpy.int16)
+    results = {}
+    for method in NI_DAQ_Decimate.DECIMATOR_METHODS:
+        decimator = NI_DAQ_Decimate.Make_Decimator(method, ratio)
+        key = 'decimate.' + method
+        results[key] = Time_Call(lambda: decimator.process(codes), n_reps)
+        n_ops = float(n_samples * n_channels)
+        results[key + '.per_sample'] = dict( [ (name, value / n_ops if name != 'n' else value) for name, value in results[key].items() ] )
+    return results
+
+def Bench_Pipeline(n_blocks = 1000, n_stages = 3, n_reps = 5):
+    """
+    Time n_blocks small blocks through a pipeline of n_stages stages that do nothing
+    pipeline.per_block is the thread hand-off overhead per block for the whole chain, in units of second
+
+    18 - 10 - 2026
+    """
+
+    def Run():
+        count = [0]
+        def Source(buf):
+            count[0] += 1
+            return buf.shape[1] if count[0] <= n_blocks else 0
+        stages = [ NI_DAQ_Pipeline.Stage('stage%d'%(k), lambda block: None) for k in range(n_stages) ]
+        NI_DAQ_Pipeline.Pipeline(Source, stages, (4, 100), numpy.int16, n_buffers = 8).run()
+
+    results = {}
+    results['pipeline.run'] = Time_Call(Run, n_reps, 1)
+    results['pipeline.per_block'] = dict( [ (key, value / n_blocks if key != 'n' else value) for key, value in results['pipeline.run'].items() ] )
+    return results
+
+def Bench_Async(n_calls = 1000, n_reps = 5):
+    """
+    Time n_calls awaited no-op calls on the executor of an NI_DAQ_Async.Async_Task
+    async.per_call is the event loop to executor round trip added to every driver call, in units of second
+
+    18 - 10 - 2026
+    """
+
+    async def Calls():
+        task = NI_DAQ_Async.Async_Task()
+        for i in range(n_calls): await task.call(int)
+        task.executor.shutdown()
+
+    results = {}
+    results['async.calls'] = Time_Call(lambda: asyncio.run(Calls()), n_reps, 1)
+    results['async.per_call'] = dict( [ (key, value / n_calls if key != 'n' else value) for key, value in results['async.calls'].items() ] )
+    return results
+
+def Bench_Bus(n_channels = 4, block_size = 2000, n_reps = 20):
+    """
+    Time publishing one 0.1 s block of 4 channel int16 codes at 20 kS/s on a shared-memory bus and reading it back
+    bus.publish is the cost added to the acquisition thread, bus.read_new the cost of a subscriber copying one block
+
+    18 - 10 - 2026
+    """
+
+    block = numpy.random.default_rng(0).integers(-100, 100, size = (n_channels, block_size), dtype = numpy.int16)
+    names = [ 'Dev2/ai%d'%(i) for i in range(n_channels) ]
+    results = {}
+    with NI_DAQ_Bus.Bus_Publisher('NI_DAQ_Bench_Bus', names, 20000.0 / n_channels, block_size, 10 * block_size, replace = True) as bus:
+        sub = NI_DAQ_Bus.Bus_Subscriber('NI_DAQ_Bench_Bus')
+        results['bus.publish'] = Time_Call(lambda: bus.publish(block), n_reps)
+        def Publish_Read():
+            bus.publish(block)
+            sub.read_new()
+        results['bus.publish_read_new'] = Time_Call(Publish_Read, n_reps)
+        results['bus.latest'] = Time_Call(lambda: sub.latest(block_size), n_reps)
+        sub.close()
+    return results
+
+def Run_Benchmarks(out_path = None, hardware = False, loud = True):
+    """
+    Run every benchmark and optionally save the results to out_path as JSON
+
+    hardware(boolean) False => reads and sweeps run against NI_DAQ_Sim on its virtual clock
+
+    Output is a dict with keys meta and results, results maps benchmark name onto the dict returned by Time_Call
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Run_Benchmarks()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        results = {}
+        results.update( Bench_Waveforms() )
+        results.update( Bench_Channel_Parsing() )
+        results.update( Bench_Live_Plot() )
+        results.update( Bench_Trigger() )
+        results.update( Bench_Spectrum() )
+        results.update( Bench_Lock_In() )
+        results.update( Bench_Decimate() )
+        results.update( Bench_Pipeline() )
+        results.update( Bench_Async() )
+        results.update( Bench_Bus() )
+
+        previous = None
+        if not hardware:
+            NI_DAQ_Sim.Add_Device('Dev2', realtime = False, noise = 1.0e-3, seed = 0)
+            previous = NI_DAQ_Lib.Use_Backend(NI_DAQ_Sim)
+        try:
+            results.update( Bench_Reads() )
+            results.update( Bench_Sweeps() )
+        finally:
+            if not hardware: NI_DAQ_Lib.Use_Backend(previous)
+
+        report = {'meta':{'date':datetime.datetime.now().isoformat(), 'python':platform.python_version(), 'numpy':numpy.__version__,
+                          'platform':platform.platform(), 'backend':'hardware' if hardware else 'NI_DAQ_Sim'},
+                  'results':results}
+
+        if loud:
+            for name in sorted(results):
+                print("%(v1)-32s median: %(v2)10.4f (ms), min: %(v3)10.4f (ms)"%{"v1":name, "v2":1000.0 * results[name]['median'], "v3":1000.0 * results[name]['min']})
+
+        if out_path is not None:
+            with open(out_path, 'w') as f:
+                json.dump(report, f, indent = 2)
+
+        return report
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Compare_Benchmarks(baseline, current, threshold = 0.10, loud = True):
+    """
+    Compare two benchmark reports, either dicts returned by Run_Benchmarks or paths to the JSON files
+
+    A benchmark is flagged as a regression when its median time has increased by more than threshold (fractional)
+    and as an improvement when it has decreased by more than threshold
+
+    Output is a dict with keys regressions, improvements, each a list of [name, baseline median, current median, ratio]
+
+    18 - 10 - 2026
+    """
+
+    if isinstance(baseline, str):
+        with open(baseline) as f: baseline = json.load(f)
+    if isinstance(current, str):
+        with open(current) as f: current = json.load(f)
+
+    regressions = []
+    improvements = []
+    for name in sorted(current['results']):
+        if name not in baseline['results']: continue
+        t_old = baseline['results'][name]['median']
+        t_new = current['results'][name]['median']
+        ratio = t_new / t_old if t_old > 0 else float('inf')
+        if ratio > 1.0 + threshold: regressions.append([name, t_old, t_new, ratio])
+        elif ratio < 1.0 - threshold: improvements.append([name, t_old, t_new, ratio])
+
+    if loud:
+        for label, items in (('REGRESSION', regressions), ('improvement', improvements)):
+            for name, t_old, t_new, ratio in items:
+                print("%(v1)-12s %(v2)-32s %(v3)10.4f -> %(v4)10.4f (ms), x%(v5)0.2f"%{"v1":label, "v2":name, "v3":1000.0 * t_old, "v4":1000.0 * t_new, "v5":ratio})
+        print("%(v1)d regressions, %(v2)d improvements at threshold %(v3)0.0f%%"%{"v1":len(regressions), "v2":len(improvements), "v3":100.0 * threshold})
+
+    return {'regressions':regressions, 'improvements':improvements}
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Benchmark the NI_DAQ_Lib hot paths')
+    parser.add_argument('--out', default = None, help = 'write the results to this JSON file')
+    parser.add_argument('--compare', default = None, help = 'baseline JSON file to compare the results against')
+    parser.add_argument('--threshold', type = float, default = 0.10, help = 'fractional change in median time flagged by --compare')
+    parser.add_argument('--hardware', action = 'store_true', help = 'run reads and sweeps on the real device instead of NI_DAQ_Sim')
+    args = parser.parse_args()
+
+    report = Run_Benchmarks(args.out, args.hardware)
+
+    if args.compare is not None and report is not None:
+        comparison = Compare_Benchmarks(args.compare, report, args.threshold)
+        if len(comparison['regressions']) > 0: sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+Shared-memory live data bus, one process owns the AI task and publishes the stream, any no. of local processes subscribe
+
+The USB-6001 runs one AI task at a time, a Bus_Publisher puts each block into a multiprocessing.shared_memory ring buffer
+laid out like NI_DAQ_Lib.AI_Ring_Buffer, and a Bus_Subscriber in another process attaches by name and reads the
+latest samples as zero-copy views, or every new sample in order, without locks and without slowing the publisher
+
+18 - 10 - 2026
+"""
+
+# Usage
+# publishing process:  NI_DAQ_Lib.AI_Publish('Dev2/ai0:3', 'Dev2', bus_name = 'NI_DAQ_Bus', duration = 3600.0)
+# any other process:   sub = Bus_Subscriber('NI_DAQ_Bus')
+#                      view, first = sub.latest(1000)   ...use view...   sub.valid(first) False => view was overwritten meanwhile
+#                      data, first, lost = sub.read_new()   every sample since the last call, lost > 0 after an overrun
+#                      sub.volts(data), sub.channel_names, sub.sample_rate, sub.alive()
+
+# Memory layout
+# [0, 72)            fixed header: magic, version, JSON length, capacity, block size, claimed and committed sample counts,
+#                    blocks committed, finished flag, time.time() of the last commit
+# [72, DATA_OFFSET)  JSON header: channel names, sample rate, dtype, scaling coefficients, start time, metadata
+# [DATA_OFFSET, ...) (n_channels, 2 * capacity) samples, each block is written in both halves so the latest capacity samples
+#                    are always contiguous and can be returned as a view
+
+# Lock-free protocol, one writer, any no. of readers
+# the publisher first advances claimed to the end of the block it is about to write, then writes the samples, then advances committed
+# a reader only uses samples below committed, and sample s is intact as long as s >= claimed - capacity
+# so a reader checks claimed after it has used or copied the samples, a failed check means the publisher overran it
+# The counters are aligned 64 bit words written with single stores, which are atomic on x86-64 and ARM64
+
+# import required libraries
+import json
+import time
+import numpy
+import datetime
+import NI_DAQ_Scaling
+from multiprocessing import shared_memory
+
+MOD_NAME_STR = "NI_DAQ_Bus"
+
+MAGIC = b'NIDAQBUS'
+VERSION = 1
+DATA_OFFSET = 4096 # reserved for the header
+PUBLISHED = set() # bus names created by this process, already known to its resource tracker
+FIXED_DTYPE = numpy.dtype( [('magic', 'S8'), ('version', '<u4'), ('json_len', '<u4'), ('capacity', '<u8'), ('block_size', '<u8'),
+                            ('claimed', '<u8'), ('committed', '<u8'), ('n_blocks', '<u8'), ('finished', '<u4'), ('pad', 'V4'), ('t_wall', '<f8')] )
+
+class Bus_Publisher:
+    """
+    Create the shared-memory bus name and publish fixed size blocks of shape (n_channels, block_size) into it
+
+    Inputs
+    name(str) shared memory name, subscribers attach with the same name
+    channel_names(list of str) physical channel of each row of the blocks
+    sample_rate(float) sample rate per channel in units of Hz
+    block_size(int) no. of samples per channel in every block
+    capacity(int) no. of samples per channel held, a multiple of block_size, subscribers must keep up to within this
+    dtype(numpy dtype) e.g. numpy.int16 for raw codes or numpy.float64 for volts
+    coeffs(numpy array) optional (n_channels, n_coeffs) scaling from raw codes to volts, see NI_DAQ_Lib.AI_Scaling_Coefficients
+    metadata(dict) optional extra entries stored in the JSON header
+    replace(boolean) True => remove a bus of the same name left behind by a publisher that did not close it
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, name, channel_names, sample_rate, block_size, capacity, dtype = numpy.int16, coeffs = None, metadata = None, replace = False):
+        if block_size < 1 or capacity < block_size or capacity % block_size != 0:
+            raise ValueError('capacity must be a positive multiple of block_size')
+        self.name = name
+        self.n_channels = len(channel_names)
+        self.dtype = numpy.dtype(dtype)
+        self.block_size = int(block_size)
+        self.capacity = int(capacity)
+
+        header = {'channel_names':list(channel_names), 'sample_rate':float(sample_rate), 'dtype':self.dtype.str,
+                  'coeffs':None if coeffs is None else numpy.asarray(coeffs, dtype = numpy.float64).tolist(),
+                  'start_time':time.time(), 'start_time_iso':datetime.datetime.now().isoformat(),
+                  'metadata':{} if metadata is None else metadata}
+        text = json.dumps(header).encode('utf-8')
+        if FIXED_DTYPE.itemsize + len(text) > DATA_OFFSET:
+            raise ValueError('Bus header is too large')
+
+        size = DATA_OFFSET + self.n_channels * 2 * self.capacity * self.dtype.itemsize
+        if replace:
+            try:
+                stale = shared_memory.SharedMemory(name = name)
+                stale.close()
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = shared_memory.SharedMemory(name = name, create = True, size = size)
+        PUBLISHED.add(name)
+
+        self.fixed = numpy.ndarray((1,), dtype = FIXED_DTYPE, buffer = self.shm.buf)[0]
+        self.shm.buf[FIXED_DTYPE.itemsize:FIXED_DTYPE.itemsize + len(text)] = text
+        self.data = numpy.ndarray( (self.n_channels, 2 * self.capacity), dtype = self.dtype, buffer = self.shm.buf, offset = DATA_OFFSET )
+        self.fixed['json_len'] = len(text)
+        self.fixed['version'] = VERSION
+        self.fixed['capacity'] = self.capacity
+        self.fixed['block_size'] = self.block_size
+        self.fixed['t_wall'] = time.time()
+        self.fixed['magic'] = MAGIC # written last, a subscriber only attaches to a complete header
+        self.pos = 0
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def publish(self, block):
+        """
+        copy a (n_channels, block_size) block into the bus, no memory is allocated and the call never waits for a subscriber
+        """
+        n = self.block_size
+        end = self.total + n
+        self.fixed['claimed'] = end
+        self.data[:, self.pos:self.pos + n] = block
+        self.data[:, self.pos + self.capacity:self.pos + self.capacity + n] = block
+        self.pos = (self.pos + n) % self.capacity
+        self.total = end
+        self.fixed['t_wall'] = time.time()
+        self.fixed['n_blocks'] += 1
+        self.fixed['committed'] = end
+
+    def close(self, unlink = True):
+        """
+        mark the bus finished, subscribers can still read what was published until they close, unlink removes the name
+        """
+        if self.shm is None: return
+        self.fixed['finished'] = 1
+        self.fixed = None
+        self.data = None
+        self.shm.close()
+        if unlink: self.shm.unlink()
+        PUBLISHED.discard(self.name)
+        self.shm = None
+
+class Bus_Subscriber:
+    """
+    Attach to the bus name published by a Bus_Publisher, in this or any other local process
+
+    Attributes taken from the header
+    channel_names, n_channels, sample_rate, dtype, coeffs (None when the samples are already in volts), start_time, metadata,
+    capacity, block_size
+
+    stats(dict) with keys reads, overruns, lost, overruns counts the reads that found their samples overwritten,
+    lost the samples read_new skipped because the subscriber fell more than capacity behind
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, name, timeout = 5.0):
+        self.name = name
+        t_end = time.perf_counter() + timeout
+        while True:
+            try:
+                self.shm = Attach_Shared_Memory(name)
+                fixed = numpy.ndarray((1,), dtype = FIXED_DTYPE, buffer = self.shm.buf)[0]
+                if fixed['magic'] == MAGIC: break
+                self.shm.close()
+            except FileNotFoundError:
+                pass
+            if time.perf_counter() > t_end:
+                raise FileNotFoundError('No NI_DAQ_Bus named ' + name)
+            time.sleep(0.05)
+
+        self.fixed = fixed
+        json_len = int(fixed['json_len'])
+        self.header = json.loads( bytes(self.shm.buf[FIXED_DTYPE.itemsize:FIXED_DTYPE.itemsize + json_len]).decode('utf-8') )
+        self.channel_names = self.header['channel_names']
+        self.n_channels = len(self.channel_names)
+        self.sample_rate = self.header['sample_rate']
+        self.dtype = numpy.dtype(self.header['dtype'])
+        self.coeffs = None if self.header['coeffs'] is None else numpy.array(self.header['coeffs'])
+        self.start_time = self.header['start_time']
+        self.metadata = self.header['metadata']
+        self.capacity = int(fixed['capacity'])
+        self.block_size = int(fixed['block_size'])
+        self.data = numpy.ndarray( (self.n_channels, 2 * self.capacity), dtype = self.dtype, buffer = self.shm.buf, offset = DATA_OFFSET )
+        self.data.flags.writeable = False
+        self.cursor = None # sample no. of the next sample read_new returns, None => start from the latest block
+        self.stats = {'reads':0, 'overruns':0, 'lost':0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def total(self):
+        """
+        no. of samples per channel published so far
+        """
+        return int(self.fixed['committed'])
+
+    def valid(self, first):
+        """
+        True while samples from sample no. first onwards have not been overwritten, check it after using a view
+        """
+        return first >= int(self.fixed['claimed']) - self.capacity
+
+    def alive(self, max_age = 2.0):
+        """
+        True while the publisher is running and has published within the last max_age seconds
+        """
+        return not self.fixed['finished'] and time.time() - float(self.fixed['t_wall']) < max_age
+
+    def _view(self, first, stop):
+        # (n_channels, stop - first) view of samples [first, stop), stop - first <= capacity
+        end = stop % self.capacity + self.capacity
+        return self.data[:, end - (stop - first):end]
+
+    def latest(self, n = None):
+        """
+        zero-copy read-only view of the latest n samples, n = None => all samples held
+        Output is a list [view, first], first is the sample no. of view[:, 0], pass it to valid() once the view has been used
+        """
+        stop = self.total()
+        n = min(stop, self.capacity) if n is None else min(n, stop, self.capacity)
+        self.stats['reads'] += 1
+        return [self._view(stop - n, stop), stop - n]
+
+    def read_new(self, max_n = None):
+        """
+        copy of every sample published since the last call, the first call starts from the latest block
+        max_n(int) optional limit on the no. of samples per channel returned
+
+        Output is a list [data, first, lost]
+        data(numpy array) (n_channels, n) copy, n may be 0
+        first(int) sample no. of data[:, 0]
+        lost(int) no. of samples skipped because they were overwritten before they could be read, 0 normally
+        """
+        stop = self.total()
+        if self.cursor is None: self.cursor = max(0, stop - self.block_size)
+        lost = 0
+        while True:
+            first = self.cursor
+            if stop - first > self.capacity:
+                # overrun, skip to the oldest samples still held, leaving one block of margin for the publisher
+                first = max(first, stop - self.capacity + self.block_size)
+            if max_n is not None: stop = min(stop, first + max_n)
+            data = numpy.array(self._view(first, stop), copy = True)
+            if self.valid(first): break
+            stop = self.total()
+        if first > self.cursor:
+            lost = first - self.cursor
+            self.stats['overruns'] += 1
+            self.stats['lost'] += lost
+        self.cursor = stop
+        self.stats['reads'] += 1
+        return [data, first, lost]
+
+    def volts(self, codes):
+        """
+        samples read from the bus converted to volts using the published scaling coefficients, a copy
+        """
+        return NI_DAQ_Scaling.Scale_Raw(codes, self.coeffs)
+
+    def close(self):
+        """
+        detach from the bus, views returned by latest() must have been released first
+        """
+        if self.shm is None: return
+        self.fixed = None
+        self.data = None
+        self.shm.close()
+        self.shm = None
+
+def Attach_Shared_Memory(name):
+    """
+    attach to existing shared memory without handing it to this process's resource tracker, which would otherwise
+    unlink the publisher's bus when the subscriber exits
+
+    18 - 10 - 2026
+    """
+
+    try:
+        return shared_memory.SharedMemory(name = name, track = False) # Python >= 3.13
+    except TypeError:
+        shm = shared_memory.SharedMemory(name = name)
+        if name in PUBLISHED: return shm # a subscriber in the publishing process, the tracker entry belongs to the publisher
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
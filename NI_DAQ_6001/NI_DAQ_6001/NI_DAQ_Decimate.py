@@ -0,0 +1,268 @@
+"""
+Stateful decimating filters for streamed AI blocks
+
+A decimator takes blocks of any length and returns the filtered samples at the reduced rate, samples that do not yet
+complete an output are carried over to the next block, so the output is the same however the stream is split into blocks
+
+Boxcar_Decimator    mean of each run of ratio samples, 1 add per sample, first nulls at multiples of the output rate
+CIC_Decimator       order cascaded integrator-comb stages in exact integer arithmetic, for raw int16 ADC codes, sinc^order response
+FIR_Decimator       any FIR kernel evaluated only at the retained outputs, e.g. Boxcar_Kernel or the windowed-sinc Lowpass_Kernel
+
+Averaging ratio samples of white noise improves the resolution by 0.5 * log2(ratio) bits, e.g. 100 samples take
+the 14-bit USB-6001 to an effective 17 bits for a DC reading, provided the noise spans a few LSB
+
+18 - 10 - 2026
+"""
+
+# Usage
+# dec = Make_Decimator('cic', 100, order = 4)   or FIR_Decimator(Boxcar_Kernel(100, 4), 100)
+# y = dec.process(block)   block of shape (..., n), y of shape (..., n_out), the leading axes (channels, references) are kept
+# every decimator has reset(), ratio, delay (in input samples), n_in, n_out and n_warmup, the no. of initial outputs whose kernel
+# reaches back before the first sample, and centre(m), the input sample no. at the centre of the kernel of output m
+
+# import required libraries
+import math
+import numpy
+
+MOD_NAME_STR = "NI_DAQ_Decimate"
+
+DECIMATOR_METHODS = ('boxcar', 'cic', 'fir')
+
+def Boxcar_Kernel(ratio, order = 1):
+    """
+    Kernel of order cascaded moving averages of length ratio, unity gain at DC
+
+    The response is sinc^order with nulls at every multiple of sample_rate / ratio, i.e. at every multiple of the output rate,
+    so tones that fall on those frequencies, such as the 2f term of a lock-in, are removed exactly
+
+    Inputs
+    ratio(int) length of each moving average, normally the decimation ratio
+    order(int) no. of cascaded moving averages, each adds about 13 dB of alias rejection
+
+    Output is a numpy array of order * (ratio - 1) + 1 taps
+
+    18 - 10 - 2026
+    """
+
+    box = numpy.full(ratio, 1.0 / ratio)
+    h = box
+    for i in range(1, order):
+        h = numpy.convolve(h, box)
+    return h
+
+def Lowpass_Kernel(ratio, n_taps = None, cutoff = 0.8, window = 'blackman'):
+    """
+    Windowed-sinc low-pass kernel for decimation by ratio, unity gain at DC
+
+    Inputs
+    ratio(int) decimation ratio
+    n_taps(int) no. of taps, None => 8 * ratio + 1, more taps give a sharper transition
+    cutoff(float) -6 dB frequency as a fraction of the output Nyquist frequency, sample_rate / (2 * ratio)
+    window(str) 'blackman' (about 75 dB stop band) or 'hann' (about 44 dB)
+
+    Output is a numpy array of n_taps taps
+
+    18 - 10 - 2026
+    """
+
+    n_taps = 8 * ratio + 1 if n_taps is None else int(n_taps)
+    fc = 0.5 * cutoff / ratio # cycles per input sample
+    k = numpy.arange(n_taps) - 0.5 * (n_taps - 1)
+    h = 2.0 * fc * numpy.sinc(2.0 * fc * k)
+    x = 2.0 * numpy.pi * numpy.arange(n_taps) / max(1, n_taps - 1)
+    if window == 'blackman':
+        h *= 0.42 - 0.5 * numpy.cos(x) + 0.08 * numpy.cos(2.0 * x)
+    elif window == 'hann':
+        h *= 0.5 - 0.5 * numpy.cos(x)
+    else:
+        raise ValueError('window must be blackman or hann')
+    return h / numpy.sum(h)
+
+class Boxcar_Decimator:
+    """
+    Mean of each run of ratio samples, the simplest and cheapest decimator
+
+    Inputs
+    ratio(int) decimation ratio
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, ratio):
+        if ratio < 1:
+            raise ValueError('ratio must be >= 1')
+        self.ratio = int(ratio)
+        self.delay = 0.5 * (self.ratio - 1)
+        self.n_warmup = 0
+        self.reset()
+
+    def centre(self, m):
+        return m * self.ratio + self.delay
+
+    def reset(self):
+        self.buf = None # samples of the incomplete run
+        self.n_in = 0
+        self.n_out = 0
+
+    def process(self, block):
+        """
+        decimate a block of shape (..., n), output is (..., n_out) in float64
+        """
+        block = numpy.asarray(block)
+        buf = block if self.buf is None or self.buf.shape[-1] == 0 else numpy.concatenate( [self.buf, block], axis = -1 )
+        self.n_in += block.shape[-1]
+        n_out = buf.shape[-1] // self.ratio
+        m = n_out * self.ratio
+        y = numpy.mean( buf[..., :m].reshape(buf.shape[:-1] + (n_out, self.ratio)), axis = -1, dtype = numpy.float64 )
+        self.buf = numpy.array(buf[..., m:], copy = True)
+        self.n_out += n_out
+        return y
+
+class CIC_Decimator:
+    """
+    Cascaded integrator-comb decimator for integer samples, e.g. raw int16 codes from AI_Read_Raw or AI_Monitor(raw = True)
+
+    order integrators run at the input rate and order combs at the output rate, so there are no multiplications and
+    the cost per input sample is order additions, the response is that of FIR_Decimator(Boxcar_Kernel(ratio, order), ratio)
+    The registers are int64 and allowed to wrap, which is exact while 16 + order * log2(ratio) < 64 bits,
+    floating point integrators would instead accumulate rounding error without bound on a long stream
+
+    Inputs
+    ratio(int) decimation ratio
+    order(int) no. of integrator / comb pairs
+
+    Output of process is float64, normalised to unity DC gain, i.e. in units of ADC codes
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, ratio, order = 4):
+        if ratio < 1 or order < 1:
+            raise ValueError('ratio and order must be >= 1')
+        if 16 + order * math.log2(ratio) >= 63:
+            raise ValueError('ratio ** order is too large for 64 bit CIC registers')
+        self.ratio = int(ratio)
+        self.order = int(order)
+        self.gain = float(self.ratio)**self.order
+        self.delay = 0.5 * self.order * (self.ratio - 1)
+        self.n_warmup = self.order - 1
+        self.reset()
+
+    def centre(self, m):
+        return (m + 1) * self.ratio - 1 - self.delay
+
+    def reset(self):
+        self.integrators = None # (order, ...) integrator state
+        self.combs = None # (order, ...) previous input of each comb
+        self.phase = 0 # no. of input samples since the last output
+        self.n_in = 0
+        self.n_out = 0
+
+    def process(self, block):
+        """
+        decimate an integer block of shape (..., n), output is (..., n_out)
+        """
+        block = numpy.asarray(block)
+        if block.dtype.kind not in 'iu':
+            raise TypeError('CIC_Decimator needs integer samples, use FIR_Decimator(Boxcar_Kernel(ratio, order), ratio) for volts')
+        n = block.shape[-1]
+        if self.integrators is None:
+            self.integrators = numpy.zeros( (self.order,) + block.shape[:-1], dtype = numpy.int64 )
+            self.combs = numpy.zeros( (self.order,) + block.shape[:-1], dtype = numpy.int64 )
+
+        with numpy.errstate(over = 'ignore'):
+            y = block.astype(numpy.int64)
+            for k in range(self.order):
+                y = numpy.cumsum(y, axis = -1, dtype = numpy.int64)
+                y += self.integrators[k][..., None]
+                self.integrators[k] = y[..., -1]
+
+            # outputs are taken when a whole run of ratio samples has been integrated, the sample no. of output m is (m + 1) * ratio - 1
+            first = self.ratio - 1 - self.phase
+            y = y[..., first::self.ratio]
+            self.phase = (self.phase + n) % self.ratio
+
+            for k in range(self.order):
+                prev = numpy.concatenate( [self.combs[k][..., None], y[..., :-1]], axis = -1 ) if y.shape[-1] > 0 else y
+                if y.shape[-1] > 0: self.combs[k] = y[..., -1]
+                y = y - prev
+
+        self.n_in += n
+        self.n_out += y.shape[-1]
+        return y / self.gain
+
+def Make_Decimator(method, ratio, order = 4, n_taps = None, integer = True):
+    """
+    Decimator for method 'boxcar', 'cic' or 'fir', see the table at the top of the module
+    order is used by cic, n_taps by fir
+    integer(boolean) False => the input is in volts, cic is then the equivalent FIR_Decimator(Boxcar_Kernel(ratio, order), ratio)
+
+    18 - 10 - 2026
+    """
+
+    if method == 'boxcar':
+        return Boxcar_Decimator(ratio)
+    if method == 'cic':
+        return CIC_Decimator(ratio, order) if integer else FIR_Decimator(Boxcar_Kernel(ratio, order), ratio)
+    if method == 'fir':
+        return FIR_Decimator(Lowpass_Kernel(ratio, n_taps), ratio)
+    raise ValueError('method must be one of ' + str(DECIMATOR_METHODS))
+
+class FIR_Decimator:
+    """
+    FIR filter evaluated only at the retained output samples
+
+    y[m] = sum_j h[j] x[m * ratio - j], each output costs len(h) multiply-adds, i.e. len(h) / ratio per input sample,
+    the samples between outputs are never filtered, which is the saving of a polyphase implementation
+
+    Inputs
+    h(numpy array) filter taps
+    ratio(int) decimation ratio
+
+    Attributes
+    n_in(int), n_out(int) total no. of input and output samples per channel
+    delay(float) group delay of a symmetric kernel in units of input samples, (len(h) - 1) / 2
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, h, ratio):
+        if ratio < 1 or len(h) < 1:
+            raise ValueError('ratio must be >= 1 and h must have at least one tap')
+        self.h = numpy.asarray(h, dtype = numpy.float64)
+        self.h_rev = numpy.ascontiguousarray(self.h[::-1])
+        self.ratio = int(ratio)
+        self.delay = 0.5 * (len(self.h) - 1)
+        self.n_warmup = int(math.ceil( (len(self.h) - 1) / float(self.ratio) ))
+        self.reset()
+
+    def centre(self, m):
+        return m * self.ratio - self.delay
+
+    def reset(self):
+        self.buf = None # input from the first sample of the next output window onwards
+        self.n_in = 0
+        self.n_out = 0
+
+    def process(self, block):
+        """
+        filter a block of shape (..., n), output is (..., n_out) with n_out >= 0
+        """
+        block = numpy.asarray(block)
+        L = len(self.h)
+        if self.buf is None:
+            # the filter starts from a history of zeros, as an FIR filter switched on at the first sample
+            self.buf = numpy.zeros(block.shape[:-1] + (L - 1,), dtype = numpy.result_type(block.dtype, numpy.float64))
+        buf = numpy.concatenate( [self.buf, block], axis = -1 ) if self.buf.shape[-1] > 0 else block
+        self.n_in += block.shape[-1]
+
+        n = buf.shape[-1]
+        n_out = 0 if n < L else 1 + (n - L) // self.ratio
+        if n_out > 0:
+            windows = numpy.lib.stride_tricks.sliding_window_view(buf, L, axis = -1)[..., ::self.ratio, :][..., :n_out, :]
+            y = windows @ self.h_rev
+        else:
+            y = numpy.zeros(buf.shape[:-1] + (0,), dtype = buf.dtype)
+        self.buf = numpy.array(buf[..., n_out * self.ratio:], copy = True)
+        self.n_out += n_out
+        return y
@@ -19,25 +19,125 @@ R. Sheehan 21 - 11 - 2025
 # import required libraries
 import os
 
-import nitypes.waveform
-
 os.environ["NIDAQMX_ENABLE_WAVEFORM_SUPPORT"] = "1"
 
 import re
 import math
 import numpy
 import time
-import nidaqmx
-import nitypes
-import datetime
-import matplotlib.pyplot as plot
+import functools
+import threading
+import collections
+
+# The NI-DAQmx driver is optional so that the library can be run against the simulated backend in NI_DAQ_Sim
+# on machines without the driver installed, see Use_Backend
+try:
+    import nidaqmx
+    import nidaqmx.stream_readers
+    import nidaqmx.stream_writers
+except ImportError:
+    nidaqmx = None
+
+# nitypes is a separate package, its waveforms are also accepted by the simulated backend
+try:
+    import nitypes
+    import nitypes.waveform
+except ImportError:
+    nitypes = None
+
 import Sweep_Interval
 import Plotting
+import NI_DAQ_Metrics
+import NI_DAQ_Scaling
+import NI_DAQ_Recorder
+import NI_DAQ_Stats
+import NI_DAQ_Live_Plot
+import NI_DAQ_Timing
+import NI_DAQ_Trigger
+import NI_DAQ_Spectrum
+import NI_DAQ_Lockin
+import NI_DAQ_Decimate
+import NI_DAQ_Pipeline
+import NI_DAQ_Bus
 
 MOD_NAME_STR = "NI_DAQ_Lib"
 AI_SR_MAX = 20000 # max sample rate on single AI channel, units of Hz
 AO_SR_MAX = 5000 # max sample rate on single AO channel, units of Hz
 
+# LRU cache of generated waveform buffers, see Generate_Cached_Waveform
+# entries are keyed on the waveform parameters, the cache is bounded by the total no. of bytes held
+WAVEFORM_CACHE = collections.OrderedDict()
+WAVEFORM_CACHE_LOCK = threading.Lock()
+WAVEFORM_CACHE_STATS = {'hits':0, 'misses':0, 'evictions':0, 'n_bytes':0, 'max_bytes':64 * 1024 * 1024}
+
+# Persistent committed tasks, see Session_Task
+# each device holds at most one AI and one AO session, SESSION_TASKS[(device_name, kind)] = [backend, key, task]
+# a task is built and committed once and reused until Close_Sessions, a different channel spec, timing config or backend replaces it
+# SESSION_STATS is keyed on channel spec and timing config
+SESSION_TASKS = {}
+SESSION_STATS = {}
+SESSION_LOCK = threading.Lock()
+
+def Use_Backend(backend = None):
+    """
+    Select the module used for every driver call in this library
+
+    backend(module) a module that mirrors the nidaqmx API, e.g. NI_DAQ_Sim for hardware-free testing
+    backend = None => restore the NI-DAQmx driver, or no backend if the driver is not installed
+
+    Output is the backend that was previously selected
+
+    18 - 10 - 2026
+    """
+
+    global nidaqmx
+
+    # sessions belong to the backend that built them
+    Close_Sessions()
+
+    previous = nidaqmx
+    if backend is None:
+        try:
+            import nidaqmx as driver
+            import nidaqmx.stream_readers
+            import nidaqmx.stream_writers
+            backend = driver
+        except ImportError:
+            nidaqmx = None
+            return previous
+    # keep instrumentation in place across a change of backend
+    if isinstance(previous, NI_DAQ_Metrics.Instrumented_Backend) and not isinstance(backend, NI_DAQ_Metrics.Instrumented_Backend):
+        backend = NI_DAQ_Metrics.Instrumented_Backend(backend)
+    nidaqmx = backend
+
+    return previous
+
+def Instrumentation(enable = True, backlog = True, reset = False):
+    """
+    Switch the per-call latency and throughput instrumentation in NI_DAQ_Metrics on or off
+
+    enable = True => the active backend is wrapped so that every task, channel, timing, start, stop, read, write and 
+    callback made by this library is timed, enable = False => the wrapper is removed and driver calls are made directly
+    backlog(boolean) query the AI buffer backlog after every read, costs one extra driver call per read
+    reset(boolean) clear the metrics recorded so far
+
+    Read the results with NI_DAQ_Metrics.Report(), Snapshot(), Export_JSON() or Export_Prometheus()
+
+    18 - 10 - 2026
+    """
+
+    global nidaqmx
+
+    if reset: NI_DAQ_Metrics.Reset()
+    if enable:
+        if not isinstance(nidaqmx, NI_DAQ_Metrics.Instrumented_Backend):
+            nidaqmx = NI_DAQ_Metrics.Instrumented_Backend(nidaqmx)
+        NI_DAQ_Metrics.Enable(backlog)
+    else:
+        NI_DAQ_Metrics.Disable()
+        if isinstance(nidaqmx, NI_DAQ_Metrics.Instrumented_Backend):
+            nidaqmx = nidaqmx.backend
+
 # Basic Test and Operation Routines
 # Use these to check basic DAQ communication and functionality
 
@@ -51,27 +151,20 @@ def AO_Write_Test():
     ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
     
     try:
-        task = nidaqmx.Task()
-        
-        task.ao_channels.add_ao_voltage_chan('Dev1/ao0')
-        
-        task.start()
-        
+        # the AO task is built and committed once by Session_Task and reused for every write
         voltage = 2.7        
-        task.write(voltage)
+        Session_Write('Dev1/ao0', 'Dev1', voltage)
         time.sleep(5)
         
         voltage = -4.2
-        task.write(voltage)
+        Session_Write('Dev1/ao0', 'Dev1', voltage)
         time.sleep(5)
         
         voltage = 0.0
-        task.write(voltage)
+        Session_Write('Dev1/ao0', 'Dev1', voltage)
         time.sleep(5)
 
-        task.stop()
-        
-        task.close()
+        Close_Sessions()
 
     except Exception as e:
         print(ERR_STATEMENT)
@@ -121,34 +214,25 @@ def AO_AI_Loopback_Test():
     ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
 
     try:
-        # Configure Analog Output
-        ao_task = nidaqmx.Task()
-        ao_task.ao_channels.add_ao_voltage_chan('Dev2/ao0', min_val = -10, max_val = +10)
-        ao_task.start()
-        
-        # Configure Analog Input
-        from nidaqmx.constants import (TerminalConfiguration)
-        ai_task = nidaqmx.Task()        
-        ai_task.ai_channels.add_ai_voltage_chan('Dev2/ai0',terminal_config=TerminalConfiguration.DIFF, min_val = -10, max_val = +10)        
-        #ai_task.ai_channels.add_ai_voltage_chan('Dev1/ai0')        
-        ai_task.start()
+        # Analog Output and Analog Input are persistent committed on-demand tasks, see Session_Task
+        # each is built once and reused for every write and read, differential read on ai0
         
         # output the voltage value
         voltage = 7.6234
-        ao_task.write(voltage)   
+        Session_Write('Dev2/ao0', 'Dev2', voltage)
         print("Set voltage:",voltage," (V)")
         
         # read some data
         N = 21
         count = 0
-        read_vals = numpy.array([]) # instantiate an empty numpy array
+        read_stats = NI_DAQ_Stats.Running_Stats(1) # running mean and variance, no array of readings is kept
         while count < N:
-            value = ai_task.read()
-            read_vals = numpy.append(read_vals, value)
+            value = Session_Read('Dev2/ai0', 'Dev2')
+            read_stats.update(value)
             time.sleep(0.5)
             count = count + 1
-        avg = numpy.mean(read_vals)
-        stdev = numpy.std(read_vals, ddof = 1)
+        avg = read_stats.mean[0]
+        stdev = read_stats.std()[0]
         upper = avg+stdev
         lower = avg-stdev
         in_range = True if voltage < upper and voltage > lower else False
@@ -160,20 +244,20 @@ def AO_AI_Loopback_Test():
         
         # change the voltage value
         voltage = -4.3271       
-        ao_task.write(voltage)
+        Session_Write('Dev2/ao0', 'Dev2', voltage)
         print("\nSet voltage:",voltage," (V)")
         
         # read some more data
         N = 21
         count = 0
-        read_vals = numpy.array([]) # instantiate an empty numpy array
+        read_stats = NI_DAQ_Stats.Running_Stats(1) # running mean and variance, no array of readings is kept
         while count < N:
-            value = ai_task.read()
-            read_vals = numpy.append(read_vals, value)
+            value = Session_Read('Dev2/ai0', 'Dev2')
+            read_stats.update(value)
             time.sleep(0.5)
             count = count + 1
-        avg = numpy.mean(read_vals)
-        stdev = numpy.std(read_vals, ddof = 1)
+        avg = read_stats.mean[0]
+        stdev = read_stats.std()[0]
         upper = avg+stdev
         lower = avg-stdev
         in_range = True if voltage < upper and voltage > lower else False
@@ -185,14 +269,10 @@ def AO_AI_Loopback_Test():
         
         # reset to zero
         voltage = 0.0        
-        ao_task.write(voltage)    
+        Session_Write('Dev2/ao0', 'Dev2', voltage)
         
         # close all tasks
-        ao_task.stop()
-        ai_task.stop()
-        
-        ao_task.close()
-        ai_task.close()
+        Close_Sessions()
 
     except Exception as e:
         print(ERR_STATEMENT)
@@ -423,14 +503,14 @@ def DC_Sweep_Diode_Test():
             #data = ai_task.read(nidaqmx.constants.READ_ALL_AVAILABLE)
             data = ai_task.read(ai_SR>>1)
 
-            print("no. meas taken per channel: ",len(data[0]))
+            read_stats = NI_DAQ_Stats.Running_Stats(ai_no_ch)
+            read_stats.update(data)
+            print("no. meas taken per channel: ",read_stats.count)
             for i in range(0, ai_no_ch, 1):
-                avg = numpy.mean(data[i])
-                stdev = numpy.std(data[i], ddof = 1)
-                print("ai%(v1)d: %(v2)0.5f +/- %(v3)0.5f (V)"%{"v1":i, "v2":avg, "v3":stdev})
+                print("ai%(v1)d: %(v2)0.5f +/- %(v3)0.5f (V)"%{"v1":i, "v2":read_stats.mean[i], "v3":read_stats.std()[i]})
             print()
-            Ival = numpy.mean(data[1]) / Rs
-            Vval = numpy.mean(data[2])
+            Ival = read_stats.mean[1] / Rs
+            Vval = read_stats.mean[2]
             print("Diode Current: %(v1)0.3f (mA), Diode Voltage: %(v2)0.3f (V)"%{"v1":Ival, "v2":Vval})
 
             # reset to zero
@@ -441,11 +521,16 @@ def DC_Sweep_Diode_Test():
             ao_task.stop()
             ai_task.stop()
 
+        # the sweep engine below configures its own tasks, release these ones first
+        ao_task.close()
+        ai_task.close()
+
         # Perform Multiple Reads
         PERFORM_MULTIPLE_READS = True
 
         if PERFORM_MULTIPLE_READS:
             # perform the DC sweep, assumes that current amplifier is in place
+            # returns a structured array with fields Vset, daqVset, I, V, I_std, V_std, t_settle, one entry per point
             Vlow = 0.0
             Vhigh = 3.0
             N_dV = 20
@@ -453,47 +538,347 @@ def DC_Sweep_Diode_Test():
         
             interval = Sweep_Interval.SweepSpace(N_dV, Vlow, Vhigh)
 
-            # reset the output voltage
+            # The sweep is performed as a single hardware-timed AO staircase read by one continuous AI acquisition
+            # ao0 steps through Vset, ao1 is held at zero, see Hardware_Timed_DC_Sweep
+            Vset_vals = interval.start + interval.delta * numpy.arange(interval.Nsteps)
+            ao_vals = numpy.vstack( [Vset_vals, numpy.zeros(interval.Nsteps)] )
+
+            # Adaptive settle holds each point only until ai0 (Vset) and ai2 (diode voltage) have settled
+            # and records the settle time of each point, set False for a fixed settle window
+            ADAPTIVE_SETTLE = True
+
+            if ADAPTIVE_SETTLE:
+                means, stds, t_settle, settled = Adaptive_DC_Sweep(ao_chn_str, ai_chn_str, dev_name, ao_vals, settle_chans = [0, 2], 
+                                                                   window_time = 0.05, timeout = 2.0)
+            else:
+                means, stds = Hardware_Timed_DC_Sweep(ao_chn_str, ai_chn_str, dev_name, ao_vals, settle_time = 0.02, measure_time = 0.1)
+                t_settle = numpy.full(interval.Nsteps, 0.02)
+
+            # Do some data processing
+            sweep = numpy.zeros(interval.Nsteps, dtype = [('Vset', 'f8'), ('daqVset', 'f8'), ('I', 'f8'), ('V', 'f8'), ('I_std', 'f8'), ('V_std', 'f8'), 
+                                                         ('t_settle', 'f8')])
+            sweep['Vset'] = Vset_vals
+            sweep['daqVset'] = means[0]
+            sweep['I'] = means[1] / Rs
+            sweep['V'] = means[2]
+            sweep['I_std'] = stds[1] / Rs
+            sweep['V_std'] = stds[2]
+            sweep['t_settle'] = t_settle
+
+            for row in sweep:
+                print("Desired Vset: %(v4)0.3f (V), Actual Vset: %(v3)0.3f (V), I_{diode}: %(v1)0.3f (mA), V_{diode}: %(v2)0.3f (V), t_settle: %(v5)0.3f (s)"%{"v4":row['Vset'], 
+                        "v3":row['daqVset'], "v1":row['I'], "v2":row['V'], "v5":row['t_settle']})
+
+            return sweep
+
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Hardware_Timed_DC_Sweep(ao_chn_str, ai_chn_str, device_name, ao_vals, settle_time = 0.01, measure_time = 0.05, loud = False):
+    """
+    Perform a DC sweep as one hardware-timed AO staircase and one AI acquisition covering every step
+    The sweep time is n_steps * (settle_time + measure_time) plus task set-up, there are no per-point sleeps or start / stop calls
+
+    Inputs
+    ao_chn_str(str) AO channels driven by the staircase, e.g. 'Dev2/ao0:1'
+    ai_chn_str(str) AI channels read on every step, differential read is assumed on all channels
+    device_name(str) e.g. 'Dev2'
+    ao_vals(numpy array) set-points of shape (n_ao_channels, n_steps), a 1D array is accepted for a single AO channel
+    settle_time(float) time at the start of each step whose samples are discarded, in units of second
+    measure_time(float) time over which each step is averaged, in units of second
+    loud(boolean) print the sweep timing
+
+    Output is a list [means, stds]
+    means(numpy array) of shape (n_ai_channels, n_steps) mean of each AI channel over the measurement window of each step
+    stds(numpy array) of shape (n_ai_channels, n_steps) standard deviation of each AI channel over the same window
+
+    The AO and AI tasks share no start trigger, the USB-6001 cannot route one to the other, they are started one after the other
+    in software with AI first so no step is missed. The steps are therefore only located in the AI record to within the start skew,
+    typically a few ms over USB, settle_time must be longer than that for the settle window to absorb it.
+    The output is returned to zero at the end of the staircase.
+    AI is read in blocks of at most 0.1 s and each step is reduced with NI_DAQ_Stats.Running_Stats, so the AI memory use
+    does not grow with the no. of steps or with measure_time and long averaging windows are practical.
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Hardware_Timed_DC_Sweep()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ao_vals = numpy.atleast_2d( numpy.asarray(ao_vals, dtype = numpy.float64) )
+
+        ao_SR, ao_no_ch = Extract_Sample_Rate(ao_chn_str, device_name)
+        ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+
+        c1 = True if ao_vals.shape[0] == ao_no_ch and ao_vals.shape[1] > 0 else False
+        c2 = True if numpy.all( numpy.fabs(ao_vals) <= 10 ) else False
+        c3 = True if settle_time >= 0 and measure_time > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            n_steps = ao_vals.shape[1]
+
+            # choose a step length that is a whole no. of samples on both the AO and AI clocks
+            # so each step maps onto a fixed block of AI samples and the reduction is a single reshape
+            g = math.gcd( int(ao_SR), int(ai_SR) )
+            # each step holds at least 2 AI samples, the settle window never leaves fewer than 2 in the measurement window
+            n_units = int( math.ceil( (settle_time + measure_time) * g ) )
+            n_units = max( n_units, -( -2 // ( int(ai_SR) // g ) ) )
+            ao_per_step = n_units * ( int(ao_SR) // g )
+            ai_per_step = n_units * ( int(ai_SR) // g )
+            ai_settle = max( 0, min( int( round( settle_time * ai_SR ) ), ai_per_step - 2 ) )
+
+            # staircase, each set-point repeated ao_per_step times, followed by a single sample at zero
+            staircase = numpy.zeros( (ao_no_ch, n_steps * ao_per_step + 1), dtype = numpy.float64 )
+            staircase[:, :-1] = numpy.repeat(ao_vals, ao_per_step, axis = 1)
+
+            ao_task = nidaqmx.Task()
+            ao_task.ao_channels.add_ao_voltage_chan(ao_chn_str, min_val = -10, max_val = +10)
+            ao_task.timing.cfg_samp_clk_timing(ao_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
+                                               samps_per_chan = staircase.shape[1], active_edge = nidaqmx.constants.Edge.RISING)
+
+            ai_task = nidaqmx.Task()
+            ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                    min_val = -10, max_val = +10)
+            # AI runs CONTINUOUS so that the driver buffer holds a few blocks rather than the whole sweep
+            block_size = min( ai_per_step, max(1, int(0.1 * ai_SR)) )
+            ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS, 
+                                               samps_per_chan = 8 * block_size, active_edge = nidaqmx.constants.Edge.RISING)
+
+            writer = nidaqmx.stream_writers.AnalogMultiChannelWriter(ao_task.out_stream, auto_start = False)
+            reader = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream)
+            writer.write_many_sample(staircase)
+
+            means = numpy.zeros( (ai_no_ch, n_steps), dtype = numpy.float64 )
+            stds = numpy.zeros( (ai_no_ch, n_steps), dtype = numpy.float64 )
+            step_stats = NI_DAQ_Stats.Running_Stats(ai_no_ch)
+            buffers = {} # reused read buffers keyed on no. of samples, the reader needs an array of exactly the size read
+            t_sweep = n_steps * ai_per_step / float(ai_SR)
+
+            def Read_Samples(n_total, stats):
+                # read n_total samples per channel in blocks, folding each block into stats, stats = None => discard
+                while n_total > 0:
+                    n = min(block_size, n_total)
+                    if n not in buffers: buffers[n] = numpy.zeros( (ai_no_ch, n), dtype = numpy.float64 )
+                    reader.read_many_sample(buffers[n], number_of_samples_per_channel = n, timeout = 10.0)
+                    if stats is not None:
+                        with NI_DAQ_Metrics.Span('sweep_reduce'): stats.update(buffers[n])
+                    n_total -= n
+
+            tstart = time.perf_counter()
+            ai_task.start()
             ao_task.start()
-            ao_task.write([0.0, 0.0])
+            for k in range(0, n_steps, 1):
+                # discard the settle window at the start of each step, then accumulate the measurement window
+                step_stats.reset()
+                Read_Samples(ai_settle, None)
+                Read_Samples(ai_per_step - ai_settle, step_stats)
+                means[:, k] = step_stats.mean
+                stds[:, k] = step_stats.std()
+            ao_task.wait_until_done(timeout = 10.0)
+            t_total = time.perf_counter() - tstart
+
             ao_task.stop()
+            ai_task.stop()
+            ao_task.close()
+            ai_task.close()
 
-            Vset = interval.start
-            count = 0
-            while count < interval.Nsteps:
-                # engage the analog output
-                ao_task.start()  
-                ao_task.write([Vset, 0.0])
-                time.sleep(1.0)
-                ao_task.stop()
+            if loud:
+                print("Steps: %(v1)d, step length: %(v2)0.1f (ms), sweep time: %(v3)0.3f (s), elapsed: %(v4)0.3f (s)"%{"v1":n_steps, 
+                        "v2":1000.0 * ai_per_step / float(ai_SR), "v3":t_sweep, "v4":t_total})
 
-                # read data using analog input
-                ai_task.start()
-                # no of smpls per channel must be the same as that declared when calling cfg_samp_clk_timing
-                # at this point you cannot read less samples than you've already declared
-                # needless to say that you also can't read more samples than you've previously declared
-                data = ai_task.read(ai_SR>>1) 
-                #data = ai_task.read(nidaqmx.constants.READ_ALL_AVAILABLE)
-                ai_task.stop()
+            return [means, stds]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_vals must have one row per AO channel'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_vals is out of range for NI-DAQ'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsettle_time or measure_time out of range'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+class Settle_Detector:
+    """
+    Rolling settle criterion for a multi-channel AI stream
 
-                # Do some data processing
-                daqVset = numpy.mean(data[0])
-                Ival = numpy.mean(data[1]) / Rs
-                Vval = numpy.mean(data[2])
-                #print("Samples per channel: %(v1)d, Samples Read: %(v2)d"%{"v1":ai_SR>>1, "v2":len(data[1])})
-                print("Desired Vset: %(v4)0.3f (V), Actual Vset: %(v3)0.3f (V), I_{diode}: %(v1)0.3f (mA), V_{diode}: %(v2)0.3f (V)"%{"v4":Vset, "v3":daqVset, "v1":Ival, "v2":Vval})
+    Blocks of shape (n_channels, n) are passed to update(), the latest window_size samples of each channel are kept
+    The set-point is declared settled once a full window has been seen and, on every watched channel,
+    the standard deviation over the window is <= std_tol and the magnitude of the least-squares slope is <= slope_tol
 
-                Vset += interval.delta
-                count += 1
+    n_channels(int) no. of channels in each block
+    sample_rate(float) sample rate per channel in units of Hz, used to express the slope in units of V / s
+    window_size(int) no. of samples over which the criterion is evaluated
+    std_tol(float) max standard deviation over the window in units of V
+    slope_tol(float) max |slope| over the window in units of V / s
+    channels(list of int) indices of the channels to watch, None => all channels
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_channels, sample_rate, window_size, std_tol = 2.0e-3, slope_tol = 5.0e-2, channels = None):
+        if n_channels < 1 or window_size < 3:
+            raise ValueError('n_channels must be positive and window_size must be at least 3')
+        self.window = numpy.zeros((n_channels, window_size), dtype = numpy.float64)
+        self.window_size = window_size
+        self.sample_rate = float(sample_rate)
+        self.std_tol = std_tol
+        self.slope_tol = slope_tol
+        self.channels = list(range(n_channels)) if channels is None else list(channels)
+        # centred sample index for the least-squares slope, computed once
+        self.xc = numpy.arange(window_size, dtype = numpy.float64) - 0.5 * (window_size - 1)
+        self.sxx = numpy.dot(self.xc, self.xc)
+        self.reset()
+
+    def reset(self):
+        """
+        forget all samples, call this after each new set-point is written
+        """
+        self.n_seen = 0
+        self.mean = numpy.zeros(self.window.shape[0])
+        self.std = numpy.zeros(self.window.shape[0])
+        self.slope = numpy.zeros(self.window.shape[0])
+
+    def update(self, block):
+        """
+        add a (n_channels, n) block, return True if the watched channels have settled
+        """
+        n = block.shape[-1]
+        if n >= self.window_size:
+            self.window[:, :] = block[:, -self.window_size:]
+        else:
+            self.window[:, :-n] = self.window[:, n:]
+            self.window[:, -n:] = block
+        self.n_seen += n
+
+        if self.n_seen < self.window_size:
+            return False
+
+        # statistics of every channel in one vectorised pass
+        self.mean = numpy.mean(self.window, axis = 1)
+        dev = self.window - self.mean[:, numpy.newaxis]
+        self.std = numpy.sqrt( numpy.sum(dev * dev, axis = 1) / (self.window_size - 1) )
+        self.slope = ( numpy.dot(dev, self.xc) / self.sxx ) * self.sample_rate
+
+        chans = self.channels
+        return bool( numpy.all( self.std[chans] <= self.std_tol ) and numpy.all( numpy.fabs(self.slope[chans]) <= self.slope_tol ) )
+
+def Wait_For_Settle(reader, detector, block_size, timeout = 2.0):
+    """
+    Read blocks from a running CONTINUOUS AI task until the Settle_Detector declares the set-point settled
+
+    Inputs
+    reader(AnalogMultiChannelReader) stream reader attached to the running AI task
+    detector(Settle_Detector) reset() is called before the first block is read
+    block_size(int) no. of samples per channel read on each pass
+    timeout(float) give up after this length of acquired time in units of second
+
+    Output is a list [settled, t_settle]
+    settled(boolean) False if the timeout expired first
+    t_settle(float) acquired time up to the point the criterion was met, in units of second
+    detector.mean, detector.std hold the statistics of the final window
+
+    18 - 10 - 2026
+    """
+
+    block = numpy.zeros((detector.window.shape[0], block_size), dtype = numpy.float64)
+    detector.reset()
+    n_max = int( timeout * detector.sample_rate )
+    settled = False
+    while not settled and detector.n_seen < n_max:
+        reader.read_many_sample(block, number_of_samples_per_channel = block_size, timeout = 10.0)
+        with NI_DAQ_Metrics.Span('settle_update'):
+            settled = detector.update(block)
+
+    return [settled, detector.n_seen / detector.sample_rate]
+
+def Adaptive_DC_Sweep(ao_chn_str, ai_chn_str, device_name, ao_vals, settle_chans = None, window_time = 0.05, block_time = 0.01, 
+                      std_tol = 2.0e-3, slope_tol = 5.0e-2, timeout = 2.0, loud = False):
+    """
+    Perform a DC sweep where each set-point is held only until the AI channels have settled
+    Replaces a fixed time.sleep after each AO write with Settle_Detector applied to a CONTINUOUS AI stream
+
+    Inputs
+    ao_chn_str(str), ai_chn_str(str), device_name(str), ao_vals(numpy array) as for Hardware_Timed_DC_Sweep
+    settle_chans(list of int) indices of the AI channels watched by the settle criterion, None => all channels
+    window_time(float) length of the settle window in units of second, the measurement is taken over the final window
+    block_time(float) length of each AI read in units of second, sets the granularity of the settle time
+    std_tol(float), slope_tol(float) settle criterion, see Settle_Detector
+    timeout(float) max time to wait at each set-point in units of second
+    loud(boolean) print the settle time of each point
+
+    Output is a list [means, stds, t_settle, settled]
+    means(numpy array), stds(numpy array) of shape (n_ai_channels, n_steps) statistics of the final settled window
+    t_settle(numpy array) settle time of each point in units of second, measured from just before the AO write
+    so it can exceed the true settle time by the duration of the write, but never falls short of it
+    settled(numpy array) boolean, False where the timeout expired before the criterion was met
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Adaptive_DC_Sweep()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ao_vals = numpy.atleast_2d( numpy.asarray(ao_vals, dtype = numpy.float64) )
+
+        ao_SR, ao_no_ch = Extract_Sample_Rate(ao_chn_str, device_name)
+        ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+
+        c1 = True if ao_vals.shape[0] == ao_no_ch and ao_vals.shape[1] > 0 else False
+        c2 = True if numpy.all( numpy.fabs(ao_vals) <= 10 ) else False
+        c3 = True if window_time > 0 and block_time > 0 and timeout > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            n_steps = ao_vals.shape[1]
+            block_size = max(1, int(block_time * ai_SR))
+            detector = Settle_Detector(ai_no_ch, ai_SR, max(3, int(window_time * ai_SR)), std_tol, slope_tol, settle_chans)
+
+            means = numpy.zeros((ai_no_ch, n_steps))
+            stds = numpy.zeros((ai_no_ch, n_steps))
+            t_settle = numpy.zeros(n_steps)
+            settled = numpy.zeros(n_steps, dtype = bool)
+
+            ao_task = nidaqmx.Task()
+            ao_task.ao_channels.add_ao_voltage_chan(ao_chn_str, min_val = -10, max_val = +10)
+
+            ai_task = nidaqmx.Task()
+            ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                    min_val = -10, max_val = +10)
+            ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS, 
+                                               samps_per_chan = 8 * block_size, active_edge = nidaqmx.constants.Edge.RISING)
+            reader = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream)
 
-            # reset the output voltage
             ao_task.start()
-            ao_task.write([0.0, 0.0])
+            ai_task.start()
+
+            for k in range(0, n_steps, 1):
+                # discard what was acquired at the previous set-point before the write, not after it, so no sample acquired
+                # after the AO update is dropped and the whole transient is seen by the settle detector
+                ai_task.read(nidaqmx.constants.READ_ALL_AVAILABLE)
+                ao_task.write( list(ao_vals[:, k]) if ao_no_ch > 1 else float(ao_vals[0, k]) )
+                settled[k], t_settle[k] = Wait_For_Settle(reader, detector, block_size, timeout)
+                means[:, k] = detector.mean
+                stds[:, k] = detector.std
+                if loud:
+                    print("Set-point %(v1)d: settled: %(v2)s, t_settle: %(v3)0.3f (s)"%{"v1":k, "v2":settled[k], "v3":t_settle[k]})
+
+            # reset the output voltage
+            ao_task.write( [0.0] * ao_no_ch if ao_no_ch > 1 else 0.0 )
+
             ao_task.stop()
-        
-        ao_task.close()
-        ai_task.close()
+            ai_task.stop()
+            ao_task.close()
+            ai_task.close()
 
+            return [means, stds, t_settle, settled]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_vals must have one row per AO channel'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_vals is out of range for NI-DAQ'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nwindow_time, block_time or timeout out of range'
+            raise Exception
     except Exception as e:
         print(ERR_STATEMENT)
         print(e)
@@ -530,15 +915,13 @@ def AO_AI_Waveform_Write_Read_Test():
         amp = 1.0 # wave amplitude
         phase = 0.0
         t0 = 0.0
-        timeInt, w_vals = Generate_Sine_Waveform(ao_SR, ao_SR, t0, nu, amp, phase)
+        timeInt, w_vals = Generate_Sine_Waveform(ao_SR, ao_SR, t0, nu, amp, phase, cached = True)
 
         # https://nitypes.readthedocs.io/en/latest/autoapi/nitypes/waveform/index.html
         # https://nitypes.readthedocs.io/en/latest/autoapi/nitypes/waveform/Timing.html
-        waveform = nitypes.waveform.AnalogWaveform(sample_count = ao_SR, 
-                                                   timing = nitypes.waveform.Timing.create_with_regular_interval(
-                                                       datetime.timedelta(seconds = timeInt.delta) 
-                                                       ) 
-                                                   )
+        # the sample interval is taken from the AO clock, a Time_Axis converts directly to a nitypes Timing
+        time_axis = NI_DAQ_Timing.Time_Axis(t0, 1.0 / float(ao_SR), ao_SR)
+        waveform = nitypes.waveform.AnalogWaveform(sample_count = ao_SR, timing = time_axis.to_timing())
         #waveform.raw_data[:] = w_vals
         waveform = waveform.from_array_1d(w_vals)
         waveform.units = "Volts"
@@ -572,6 +955,7 @@ def AO_AI_Waveform_Write_Read_Test():
         print(f"Units: {data.units}")
         print(f"t0: {data.timing.start_time}")
         print(f"dt: {data.timing.sample_interval}")
+        print(f"Time axis: {NI_DAQ_Timing.Time_Axis.from_timing(data.timing, len(data.scaled_data))}")
 
         # close all tasks
         ao_task.close()
@@ -619,7 +1003,7 @@ def AO_Waveform_Write_Test():
     t0 = 0.0
     #timeInt, data = Generate_Sine_Waveform(ao_SR, number_of_samples, t0, nu, amp, phase)
     #timeInt, data = Generate_Triangle_Waveform(ao_SR, number_of_samples, t0, nu, amp, phase, pulsed = True)
-    timeInt, data = Generate_Square_Waveform(ao_SR, number_of_samples, t0, nu, amp, phase, pulsed = False)
+    timeInt, data = Generate_Square_Waveform(ao_SR, number_of_samples, t0, nu, amp, phase, pulsed = False, cached = True)
 
     # Configure the analog input
     ai_chn_str = "Dev2/ai3"
@@ -643,23 +1027,21 @@ def AO_Waveform_Write_Test():
     ao_task.write(data)
     ao_task.start()
 
+    # each block is drawn into the same figure, decimated and blitted, rather than a new blocking plot per block
+    view = NI_DAQ_Live_Plot.Live_Plot(1, ai_SR, number_of_samples / float(ai_SR), channel_names = [ai_chn_str])
+
     count = 0
     while count < 5:
         # Read the waveform data into memory
         ai_task.start()
         waveform = ai_task.read(nidaqmx.constants.READ_ALL_AVAILABLE)
 
+        # lazy time axis, (t0, dT, n) only, its length always matches the no. of samples read
         t0 = time.time()
         dT = 1.0 / float(ai_SR)
-        tf = t0 + number_of_samples * dT
-        times = numpy.arange(t0, tf, dT)
+        times = NI_DAQ_Timing.Time_Axis(t0, dT, len(waveform))
         
-        plot.plot(times, waveform)
-        # plot.xlabel("Seconds")
-        # plot.ylabel(waveform.units)
-        # plot.title(waveform.channel_name)
-        plot.grid(True)
-        plot.show()
+        view.update(numpy.asarray(waveform), times)
 
         ai_task.stop()
 
@@ -667,6 +1049,8 @@ def AO_Waveform_Write_Test():
 
     input("Generating voltage continuously. Press Enter to stop.\n")
 
+    view.close()
+
     ao_task.stop()
 
     ao_task.close()
@@ -686,22 +1070,17 @@ def AI_Waveform_Read_Test():
 
         waveform = task.read(nidaqmx.constants.READ_ALL_AVAILABLE)
         t0 = 0.0
-        tf = t0 + n_samples * dT
-        times = numpy.arange(t0, tf, dT)
+        times = NI_DAQ_Timing.Time_Axis(t0, dT, len(waveform))
         
-        plot.plot(times, waveform)
-        # plot.xlabel("Seconds")
-        # plot.ylabel(waveform.units)
-        # plot.title(waveform.channel_name)
-        plot.grid(True)
-
-        plot.show()
+        view = NI_DAQ_Live_Plot.Live_Plot(1, SR, n_samples * dT, channel_names = ["Dev1/ai0"])
+        view.update(numpy.asarray(waveform), times)
+        view.show()
 
         task.stop()
 
 # Actual routines that you would want with a DAQ
 
-def Generate_Sine_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0):
+def Generate_Sine_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, out = None, dtype = numpy.float64, cached = False):
     """
     Generate a sine waveform
 
@@ -711,6 +1090,9 @@ def Generate_Sine_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0
     frequency(float) in units of Hz
     amplitude(float) in units of volt in range [-10, 10]
     phase(float) is dimensionless
+    out(numpy array) optional caller-supplied buffer of length no_smpls, waveform is written into it in place
+    dtype(numpy dtype) numpy.float64 or numpy.float32, ignored when out is supplied
+    cached(bool) True => w_vals is taken from the waveform cache, see Generate_Cached_Waveform, and is read-only, ignored when out is supplied
 
     Output is a tuple with the following items
     timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
@@ -730,23 +1112,10 @@ def Generate_Sine_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0
         c10 = c1 and c2 and c3 and c4
 
         if c10:
-            deltaT = ( 1.0 / float(sample_rate) )
-            t0 = t_start
-            two_pi_nu = 2.0 * math.pi * frequency
-            t_vals = numpy.array([]) # instantiate an empty numpy array
-            w_vals = numpy.array([]) # instantiate an empty numpy array
-            count = 0
-            while count < no_smpls:
-                sval = amplitude * math.sin(two_pi_nu * t0 + phase)
-                w_vals = numpy.append(w_vals, sval )
-                t0 += deltaT
-                count += 1
-
-            # instantiate a SweepSpace object to enable time samples to be generated later using 
-            # numpy.linspace(timeInterval.start, timeInterval.stop, timeInterval.Nsteps, endpoint=True, retstep=True)
-            timeInterval = Sweep_Interval.SweepSpace(no_smpls, t_start, t0)
-            
-            return (timeInterval, w_vals)
+            # whole buffer is computed in a single vectorised pass, see Waveform_Engine
+            if cached and out is None:
+                return Generate_Cached_Waveform('sine', sample_rate, no_smpls, t_start, frequency, amplitude, phase, False, dtype)
+            return Waveform_Engine('sine', sample_rate, no_smpls, t_start, frequency, amplitude, phase, False, out, dtype)
         else:
             if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate is negative'
             if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nno_smpls is negative'
@@ -757,7 +1126,7 @@ def Generate_Sine_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0
         print(ERR_STATEMENT)
         print(e)
 
-def Generate_Square_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False):
+def Generate_Square_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False, out = None, dtype = numpy.float64, cached = False):
     """
     Generate a square waveform
 
@@ -768,6 +1137,9 @@ def Generate_Square_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1
     amplitude(float) in units of volt in range [-10, 10]
     phase(float) is dimensionless
     pulsed(boolean) decides whether or not to output non-negative pulses
+    out(numpy array) optional caller-supplied buffer of length no_smpls, waveform is written into it in place
+    dtype(numpy dtype) numpy.float64 or numpy.float32, ignored when out is supplied
+    cached(bool) True => w_vals is taken from the waveform cache, see Generate_Cached_Waveform, and is read-only, ignored when out is supplied
 
     Output is a tuple with the following items
     timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
@@ -791,29 +1163,10 @@ def Generate_Square_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1
         c10 = c1 and c2 and c3 and c4
 
         if c10:
-            deltaT = ( 1.0 / float(sample_rate) )
-            t0 = t_start
-            two_pi_nu = 2.0 * math.pi * frequency
-            t_vals = numpy.array([]) # instantiate an empty numpy array
-            w_vals = numpy.array([]) # instantiate an empty numpy array
-            count = 0
-            while count < no_smpls:
-                sval = math.sin(two_pi_nu * t0 + phase)
-                # python does not have a built-in signum function, but it does have copysign which can be used
-                # copysign(x,y): Return x with the sign of y
-                val = math.copysign(amplitude, sval) # sq wave = signum (sine wave)
-                if pulsed:
-                    w_vals = numpy.append(w_vals, val if val > 0.0 else 0.0 ) # only want positive portion of sq wave
-                else:
-                    w_vals = numpy.append(w_vals, val)
-                t0 += deltaT
-                count += 1
-
-            # instantiate a SweepSpace object to enable time samples to be generated later using 
-            # numpy.linspace(timeInterval.start, timeInterval.stop, timeInterval.Nsteps, endpoint=True, retstep=True)
-            timeInterval = Sweep_Interval.SweepSpace(no_smpls, t_start, t0)
-            
-            return (timeInterval, w_vals)
+            # whole buffer is computed in a single vectorised pass, see Waveform_Engine
+            if cached and out is None:
+                return Generate_Cached_Waveform('square', sample_rate, no_smpls, t_start, frequency, amplitude, phase, pulsed, dtype)
+            return Waveform_Engine('square', sample_rate, no_smpls, t_start, frequency, amplitude, phase, pulsed, out, dtype)
         else:
             if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate is negative'
             if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nno_smpls is negative'
@@ -824,7 +1177,7 @@ def Generate_Square_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1
         print(ERR_STATEMENT)
         print(e)
 
-def Generate_Triangle_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False):
+def Generate_Triangle_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False, out = None, dtype = numpy.float64, cached = False):
     """
     Generate a triangle waveform
 
@@ -835,6 +1188,9 @@ def Generate_Triangle_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency =
     amplitude(float) in units of volt in range [-10, 10]
     phase(float) is dimensionless
     pulsed(boolean) decides whether or not to output non-negative pulses
+    out(numpy array) optional caller-supplied buffer of length no_smpls, waveform is written into it in place
+    dtype(numpy dtype) numpy.float64 or numpy.float32, ignored when out is supplied
+    cached(bool) True => w_vals is taken from the waveform cache, see Generate_Cached_Waveform, and is read-only, ignored when out is supplied
 
     Output is a tuple with the following items
     timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
@@ -858,28 +1214,10 @@ def Generate_Triangle_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency =
         c10 = c1 and c2 and c3 and c4
 
         if c10:
-            deltaT = ( 1.0 / float(sample_rate) )
-            t0 = t_start
-            two_pi_nu = 2.0 * math.pi * frequency
-            amp = (2.0 * amplitude) / math.pi
-            t_vals = numpy.array([]) # instantiate an empty numpy array
-            w_vals = numpy.array([]) # instantiate an empty numpy array
-            count = 0
-            while count < no_smpls:
-                sval = math.sin(two_pi_nu * t0 + phase)
-                val = amp * math.asin( sval )
-                if pulsed:
-                    w_vals = numpy.append(w_vals, math.fabs(val) ) # convert to triangular pulses by taking math.fabs(val)
-                else:
-                    w_vals = numpy.append(w_vals, val )
-                t0 += deltaT
-                count += 1
-
-            # instantiate a SweepSpace object to enable time samples to be generated later using 
-            # numpy.linspace(timeInterval.start, timeInterval.stop, timeInterval.Nsteps, endpoint=True, retstep=True)
-            timeInterval = Sweep_Interval.SweepSpace(no_smpls, t_start, t0)
-            
-            return (timeInterval, w_vals)
+            # whole buffer is computed in a single vectorised pass, see Waveform_Engine
+            if cached and out is None:
+                return Generate_Cached_Waveform('triangle', sample_rate, no_smpls, t_start, frequency, amplitude, phase, pulsed, dtype)
+            return Waveform_Engine('triangle', sample_rate, no_smpls, t_start, frequency, amplitude, phase, pulsed, out, dtype)
         else:
             if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate is negative'
             if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nno_smpls is negative'
@@ -890,135 +1228,1921 @@ def Generate_Triangle_Waveform(sample_rate, no_smpls, t_start = 0.0, frequency =
         print(ERR_STATEMENT)
         print(e)
 
-def Extract_Sample_Rate(physical_channel_str, device_name, loud = False):
+def Generate_Chirp_Waveform(sample_rate, no_smpls, t_start = 0.0, f_start = 10.0, f_stop = 1000.0, amplitude = 1.0, taper = 0.01, out = None, dtype = numpy.float64):
     """
-    Extract the AI / AO sample rate based on the data contained in the physical_channel string descriptor
-    Always want to set sample rate to be at its maximum
-    
-    Methods aims to process physical_channel string descriptors of the form
-    'device_name/a<x><v1>', single channel operation
-    'device_name/a<x><v1>:<v2>', multiple sequential channel operation
-    'device_name/axv1, device_name/axv2, ..., device_name/axvn', multiple channel operation
-    'device_name/a<x><v1>:<v2>, device_name/axv3, ..., device_name/axvn', multiple channel operation
-    'device_name/a<x><v1>:<v2>, device_name/a<x><v3>:<v4>', multiple channel operation
-    
-    <x> = i or o
-    <v1>, <v2> indicate the sequential channel numbers on the DAQ
-    
-    If a user inputs physical_channel_str with mix of ao and ai channels an exception will be thrown by nidaqmx
-    
-    R. Sheehan 27 - 11 - 2025
+    Generate a logarithmic (exponential) chirp sweeping from f_start to f_stop over no_smpls samples
+
+    The instantaneous frequency is f_start * exp(t / L), L = T / ln(f_stop / f_start), so every decade gets the same time
+    and the excitation energy per octave is constant, which suits a Bode plot on a log frequency axis
+    Both ends are faded in / out with a raised cosine over taper * no_smpls samples to limit the spectral splatter of the step
+
+    Inputs
+    sample_rate(int) and no_smpls(int) to be determined by NI-DAQ AO
+    t_start(float) time of the first sample in units of second, the sweep starts at f_start at t = t_start
+    f_start(float), f_stop(float) in units of Hz, f_stop must not exceed sample_rate / 2
+    amplitude(float) in units of volt in range [-10, 10]
+    taper(float) fraction of the sweep faded at each end, in [0, 0.5)
+    out(numpy array), dtype(numpy dtype) as for Generate_Sine_Waveform
+
+    Output is a tuple with the following items
+    timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
+    w_vals(float numpy array) contains chirp waveform values
+
+    18 - 10 - 2026
     """
 
-    FUNC_NAME = ".Extract_Sample_Rate()" # use this in exception handling messages
+    FUNC_NAME = ".Generate_Chirp_Waveform()" # use this in exception handling messages
     ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
 
     try:
-        c1 = True if physical_channel_str != '' else False
-        c2 = True if device_name != '' else False
-        c10 = c1 and c2
+        c1 = True if sample_rate > 0 and no_smpls > 1 else False
+        c2 = True if f_start > 0 and f_stop > f_start and f_stop <= 0.5 * sample_rate else False
+        c3 = True if math.fabs(amplitude) <= 10 else False
+        c4 = True if taper >= 0 and taper < 0.5 else False
+        c10 = c1 and c2 and c3 and c4
 
         if c10:
-            SR_MAX = AI_SR_MAX if 'i' in physical_channel_str else AO_SR_MAX
-            
-            reduced_str = physical_channel_str.replace( device_name+'/', '' ) # strip out the device_name from the physical_channel_str
-            if loud: print("Physical Channels: ",reduced_str)
-
-            if ',' in physical_channel_str and ':' not in physical_channel_str:
-                # physical_channel_str is of the form 'device_name/axv1, device_name/axv2, ..., device_name/axvn'
-                ch_nums = list ( set ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", reduced_str ) ) ) ) # set removes duplicates from the list if they exist
-                no_ch = len(ch_nums)
-                SR = int(SR_MAX / no_ch)
-            elif ':' in physical_channel_str and ',' not in physical_channel_str:
-                # physical_channel_str is of the form 'device_name/axv1:v2'
-                # <x> = i or o
-                # <v1>, <v2> indicate the sequential channel numbers on the DAQ
-                ch_nums = list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", reduced_str ) ) )
-                no_ch = 1 + ( max(ch_nums) - min(ch_nums) ) # use this in case v1 != 0
-                SR = int(SR_MAX / no_ch)
-            elif ':' in physical_channel_str and ',' in physical_channel_str:
-                # physical_channel_str is of the form 'device_name/a<x><v1>:<v2>, device_name/axv3, ..., device_name/axvn'
-                # physical_channel_str is of the form 'device_name/a<x><v1>:<v2>, device_name/a<x><v3>:<v4>'
-                # <x> = i or o
-                # <v1>, ..., <vn> indicate the channel numbers on the DAQ, not necessarily sequential
-                ch_nums = []
-                for item in reduced_str.split(','):
-                    if ":" in item:
-                        nums = list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", item) ) )
-                        ch_nums.extend( range( nums[0], 1+nums[1], 1 ) )
-                    else:
-                        ch_nums.extend(list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", item) ) ) )
-                ch_nums = list( set( ch_nums ) ) # set removes duplicates from the list if they exist
-                no_ch = len(ch_nums)
-                SR = SR_MAX / no_ch
-            else:
-                # physical_channel_str is of the form 'device_name/a<x><v1>'
-                # indicating a single channel is being used
-                # <x> = i or o
-                # <v1> indicates the channel number on the DAQ
-                ch_nums = list ( map ( int, re.findall(r"[-+]?\d+[\.]?\d*", reduced_str ) ) )
-                no_ch = 1
-                SR = SR_MAX
+            deltaT = 1.0 / float(sample_rate)
+            L = (no_smpls * deltaT) / math.log(f_stop / f_start)
+
+            w_vals = numpy.empty(no_smpls, dtype = dtype) if out is None else out
+            arg = w_vals if w_vals.dtype == numpy.float64 else numpy.empty(no_smpls, dtype = numpy.float64)
+            arg[:] = numpy.arange(no_smpls, dtype = numpy.float64)
+            arg *= deltaT / L
+            numpy.expm1(arg, out = arg)
+            arg *= 2.0 * math.pi * f_start * L # phase = 2 pi f_start L ( exp(t / L) - 1 )
+            numpy.sin(arg, out = w_vals)
+            w_vals *= amplitude
+
+            n_taper = int(taper * no_smpls)
+            if n_taper > 0:
+                fade = 0.5 - 0.5 * numpy.cos( numpy.pi * numpy.arange(n_taper) / n_taper )
+                w_vals[:n_taper] *= fade
+                w_vals[no_smpls - n_taper:] *= fade[::-1]
+
+            timeInterval = Sweep_Interval.SweepSpace(no_smpls, t_start, t_start + no_smpls * deltaT)
 
-            if loud: 
-                print("Channels:", ch_nums)
-                print("No. Channels:",no_ch)
-                print("Sample Rate:", SR)
-                print()
+            return (timeInterval, w_vals)
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate or no_smpls out of range'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nneed 0 < f_start < f_stop <= sample_rate / 2'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\namplitude is out of range for NI-DAQ'
+            if c4 is False: ERR_STATEMENT = ERR_STATEMENT + '\ntaper must be in [0, 0.5)'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Multisine_Bins(sample_rate, no_smpls, f_start, f_stop, n_tones = None):
+    """
+    DFT bins, of a period of no_smpls samples, excited by Generate_Multisine_Waveform
 
-            return [SR, no_ch]
+    Bins are spaced logarithmically from f_start to f_stop, duplicates after rounding to whole bins are removed
+    n_tones = None => every bin from f_start to f_stop
+
+    Output is an int numpy array of bin numbers, bin k is at frequency k * sample_rate / no_smpls
+
+    18 - 10 - 2026
+    """
+
+    df = float(sample_rate) / no_smpls
+    k_lo = max(1, int(math.ceil(f_start / df)))
+    k_hi = min(no_smpls // 2 - 1, int(math.floor(f_stop / df)))
+    if k_hi < k_lo: return numpy.zeros(0, dtype = numpy.int64)
+    if n_tones is None or n_tones >= k_hi - k_lo + 1:
+        return numpy.arange(k_lo, k_hi + 1)
+    return numpy.unique( numpy.round( numpy.geomspace(k_lo, k_hi, n_tones) ).astype(numpy.int64) )
+
+def Generate_Multisine_Waveform(sample_rate, no_smpls, f_start = 10.0, f_stop = 1000.0, n_tones = 50, amplitude = 1.0, n_iter = 100, 
+                                out = None, dtype = numpy.float64):
+    """
+    Generate one period of a crest factor optimised multisine, equal amplitude tones on the bins given by Multisine_Bins
+
+    Every tone completes a whole no. of cycles in no_smpls samples, so repeating the waveform gives a periodic excitation
+    that is measured without leakage on a one period rectangular window
+    The phases start from Schroeder's low crest factor formula and are improved by n_iter rounds of clipping the peaks
+    and restoring the tone amplitudes, the lowest crest factor found is kept and scaled so that its peak equals amplitude
+    Typical crest factors are about 2.5 for 50 log spaced tones and 1.4 for a full band, against 1.41 for a single sine
+
+    Inputs
+    sample_rate(int) and no_smpls(int) to be determined by NI-DAQ AO, no_smpls is the length of one period
+    f_start(float), f_stop(float) in units of Hz, band of the excitation
+    n_tones(int) no. of tones, None => every bin in the band
+    amplitude(float) peak value in units of volt in range [-10, 10]
+    n_iter(int) no. of crest factor improvement rounds
+    out(numpy array), dtype(numpy dtype) as for Generate_Sine_Waveform
+
+    Output is a tuple with the following items
+    timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
+    w_vals(float numpy array) contains one period of the multisine
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Generate_Multisine_Waveform()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        bins = Multisine_Bins(sample_rate, no_smpls, f_start, f_stop, n_tones) if sample_rate > 0 and no_smpls > 3 else []
+
+        c1 = True if sample_rate > 0 and no_smpls > 3 else False
+        c2 = True if len(bins) > 0 else False
+        c3 = True if math.fabs(amplitude) <= 10 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            n_bins = no_smpls // 2 + 1
+            m = numpy.arange(len(bins))
+            phases = -math.pi * m * (m + 1) / len(bins) # Schroeder phases
+
+            spec = numpy.zeros(n_bins, dtype = numpy.complex128)
+            spec[bins] = numpy.exp(1j * phases)
+            x = numpy.fft.irfft(spec, no_smpls)
+            best = x # every iterate has the same rms, so the lowest peak is the lowest crest factor
+            for i in range(n_iter):
+                # clip the peaks, keep only the phases of the excited bins
+                limit = 0.8 * numpy.max(numpy.fabs(x))
+                X = numpy.fft.rfft( numpy.clip(x, -limit, limit) )
+                spec[:] = 0.0
+                spec[bins] = numpy.exp( 1j * numpy.angle(X[bins]) )
+                x = numpy.fft.irfft(spec, no_smpls)
+                if numpy.max(numpy.fabs(x)) < numpy.max(numpy.fabs(best)): best = x
+
+            w_vals = numpy.empty(no_smpls, dtype = dtype) if out is None else out
+            w_vals[:] = best * ( amplitude / numpy.max(numpy.fabs(best)) )
+
+            timeInterval = Sweep_Interval.SweepSpace(no_smpls, 0.0, no_smpls / float(sample_rate))
+
+            return (timeInterval, w_vals)
         else:
-            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
-            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in device_name'
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate or no_smpls out of range'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nno DFT bins between f_start and f_stop, lengthen the period'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\namplitude is out of range for NI-DAQ'
             raise Exception
     except Exception as e:
         print(ERR_STATEMENT)
         print(e)
 
-def AI_Monitor(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', loud = False):
+def Waveform_Engine(shape, sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False, out = None, dtype = numpy.float64):
     """
-    Use NI-DAQ to measure multiple real-time AI
+    Vectorised waveform generator used by Generate_Sine_Waveform, Generate_Square_Waveform and Generate_Triangle_Waveform
+    The time axis and the waveform are each computed in a single numpy operation, no per-sample python loop
 
-    differential read is assumed on all channels
+    Inputs
+    shape(str) one of 'sine', 'square', 'triangle'
+    sample_rate(int), no_smpls(int), t_start(float), frequency(float), amplitude(float), phase(float), pulsed(boolean)
+    have the same meaning as in Generate_*_Waveform, inputs are assumed to have been validated by the caller
+    out(numpy array) optional caller-supplied float buffer of length no_smpls, waveform is written into it in place
+    dtype(numpy dtype) numpy.float64 or numpy.float32, ignored when out is supplied
 
-    R. Sheehan 3 - 12 - 2025
+    Output is a tuple with the following items
+    timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
+    w_vals(float numpy array) contains waveform values, this is out when out is supplied
+
+    18 - 10 - 2026
     """
 
-    FUNC_NAME = ".AI_Monitor()" # use this in exception handling messages
+    FUNC_NAME = ".Waveform_Engine()" # use this in exception handling messages
     ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
 
     try:
-        c1 = True if physical_channel_str != '' else False
-        c2 = True if device_name != '' else False
-        c10 = c1 and c2
+        c1 = True if shape in ('sine', 'square', 'triangle') else False
+        c2 = True if out is None or ( out.ndim == 1 and out.shape[0] == no_smpls ) else False
+        c3 = True if out is None or out.dtype.kind == 'f' else False
+        c10 = c1 and c2 and c3
 
         if c10:
-            # Extract the sample rate per channel
-            ai_chn_str = physical_channel_str
+            deltaT = ( 1.0 / float(sample_rate) )
+            two_pi_nu = 2.0 * math.pi * frequency
 
-            ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+            w_vals = numpy.empty(no_smpls, dtype = dtype) if out is None else out
+
+            # the argument of the sine is always formed in float64 so that float32 output keeps its phase accuracy over long buffers
+            # when the output is float64 the argument is formed directly in the output buffer, no temporary is allocated
+            arg = w_vals if w_vals.dtype == numpy.float64 else numpy.empty(no_smpls, dtype = numpy.float64)
+            arg[:] = numpy.arange(no_smpls, dtype = numpy.float64)
+            arg *= two_pi_nu * deltaT
+            arg += two_pi_nu * t_start + phase
+            numpy.sin(arg, out = w_vals)
+
+            if shape == 'sine':
+                w_vals *= amplitude
+            elif shape == 'square':
+                # sq wave = signum (sine wave), copysign(x,y) returns x with the sign of y
+                numpy.copysign(amplitude, w_vals, out = w_vals)
+                if pulsed: numpy.maximum(w_vals, 0.0, out = w_vals) # only want positive portion of sq wave
+            else:
+                numpy.arcsin(w_vals, out = w_vals)
+                w_vals *= (2.0 * amplitude) / math.pi
+                if pulsed: numpy.fabs(w_vals, out = w_vals) # convert to triangular pulses by taking fabs(val)
 
-            # Configure Analog Input
-            ai_task = nidaqmx.Task()        
+            # instantiate a SweepSpace object to enable time samples to be generated later using
+            # numpy.linspace(timeInterval.start, timeInterval.stop, timeInterval.Nsteps, endpoint=True, retstep=True)
+            timeInterval = Sweep_Interval.SweepSpace(no_smpls, t_start, t_start + no_smpls * deltaT)
 
-            # If ai_chn_str is not correctly defined an exception will be thrown by nidaqmx
-            ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
-                                                    min_val = -10, max_val = +10)
-            
-            # Configure the sampling timing
-            # Note that when reading data later no. samples to be read must equal samps_per_chan as defined
-            # Otherwise an exception will be thrown by nidaqmx
-            ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
-                                               samps_per_chan = ai_SR>>1, active_edge = nidaqmx.constants.Edge.RISING)
+            return (timeInterval, w_vals)
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nshape must be one of sine, square, triangle'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nout must be a 1D array of length no_smpls'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nout must be a float array'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
 
-            # AI Channel Monitoring
+def Waveform_Stream(shape, sample_rate, chunk_size, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False, n_chunks = None, dtype = numpy.float64):
+    """
+    Return a generator that yields a waveform in fixed-size chunks with the phase carried across chunk boundaries
+    Use this to feed a non-regenerating CONTINUOUS AO task, output can run indefinitely in constant memory
+    The arguments are checked when Waveform_Stream is called, not on the first next(), None is returned if they are out of range
 
+    Inputs
+    shape(str) one of 'sine', 'square', 'triangle'
+    sample_rate(int) AO sample rate in units of Hz
+    chunk_size(int) no. of samples in each chunk
+    frequency(float) in units of Hz
+    amplitude(float) in units of volt in range [-10, 10]
+    phase(float) is dimensionless, phase of the first sample of the first chunk
+    pulsed(boolean) decides whether or not to output non-negative pulses
+    n_chunks(int) no. of chunks to yield, None => yield forever
+    dtype(numpy dtype) numpy.float64 or numpy.float32
 
-            # Close off the ai_task
+    Output is the generator, each iteration yields a numpy array of length chunk_size
+    two buffers are used alternately, a yielded chunk remains valid until the next-but-one chunk is requested
+    a dict of the form {'frequency':f, 'amplitude':a} may be passed in with send() to change the output on the next chunk
+    the change is phase continuous so slowly varying outputs can be produced without glitches
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Waveform_Stream()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    def Chunks(frequency, amplitude, phase):
+        # the generator itself, only a frequency or amplitude passed in with send() is checked here
+        bufs = [numpy.empty(chunk_size, dtype = dtype), numpy.empty(chunk_size, dtype = dtype)]
+        count = 0
+        while n_chunks is None or count < n_chunks:
+            # each chunk is generated with t_start = 0 and the accumulated phase
+            # this keeps the argument of the sine small however long the output runs
+            Waveform_Engine(shape, sample_rate, chunk_size, 0.0, frequency, amplitude, phase, pulsed, bufs[count % 2])
+            update = yield bufs[count % 2]
+
+            # advance the phase by one chunk, reduce modulo 2 pi to avoid loss of precision
+            phase = math.fmod(phase + 2.0 * math.pi * frequency * chunk_size / float(sample_rate), 2.0 * math.pi)
+
+            if update is not None:
+                frequency = update.get('frequency', frequency)
+                amplitude = update.get('amplitude', amplitude)
+                if frequency <= 0 or math.fabs(amplitude) > 10:
+                    print(ERR_STATEMENT)
+                    print('frequency or amplitude update is out of range')
+                    return
+            count += 1
+
+    try:
+        c1 = True if shape in ('sine', 'square', 'triangle') else False
+        c2 = True if sample_rate > 0 else False
+        c3 = True if chunk_size > 0 else False
+        c4 = True if frequency > 0 else False
+        c5 = True if math.fabs(amplitude) <= 10 else False
+        c10 = c1 and c2 and c3 and c4 and c5
+
+        if c10:
+            return Chunks(frequency, amplitude, phase)
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nshape must be one of sine, square, triangle'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate is negative'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nchunk_size is negative'
+            if c4 is False: ERR_STATEMENT = ERR_STATEMENT + '\nfrequency is negative'
+            if c5 is False: ERR_STATEMENT = ERR_STATEMENT + '\namplitude is out of range for NI-DAQ'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Generate_Cached_Waveform(shape, sample_rate, no_smpls, t_start = 0.0, frequency = 1.0, amplitude = 1.0, phase = 0.0, pulsed = False, dtype = numpy.float64):
+    """
+    Return a waveform from the LRU waveform cache, generating it with Waveform_Engine on the first request
+    Repeated stimulus set-ups with identical parameters cost a dictionary lookup after the first call
+
+    Inputs are the same as for Generate_*_Waveform, shape(str) is one of 'sine', 'square', 'triangle'
+
+    Output is a tuple with the following items
+    timeInterval(SweepSpace object) that contains the data needed to generate time samples using numpy.linspace
+    w_vals(float numpy array) contains waveform values, the array is read-only since it is shared by every caller
+    use w_vals.copy() if the buffer needs to be modified
+
+    Least recently used entries are evicted when the total no. of bytes cached exceeds WAVEFORM_CACHE_STATS['max_bytes']
+    Use Waveform_Cache_Info to monitor the cache effectiveness
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Generate_Cached_Waveform()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if shape in ('sine', 'square', 'triangle') else False
+        c2 = True if sample_rate > 0 else False
+        c3 = True if no_smpls > 0 else False
+        c4 = True if frequency > 0 else False
+        c5 = True if math.fabs(amplitude) <= 10 else False
+        c10 = c1 and c2 and c3 and c4 and c5
+
+        if c10:
+            # pulsed has no effect on a sine wave, normalise it so that both spellings share an entry
+            key = (shape, float(sample_rate), int(no_smpls), float(t_start), float(frequency), float(amplitude), float(phase), 
+                   bool(pulsed) if shape != 'sine' else False, numpy.dtype(dtype).str)
+
+            with WAVEFORM_CACHE_LOCK:
+                if key in WAVEFORM_CACHE:
+                    WAVEFORM_CACHE.move_to_end(key)
+                    WAVEFORM_CACHE_STATS['hits'] += 1
+                    return WAVEFORM_CACHE[key]
+                WAVEFORM_CACHE_STATS['misses'] += 1
+
+            # generate outside the lock so that other threads are not held up by a large buffer
+            timeInterval, w_vals = Waveform_Engine(shape, sample_rate, no_smpls, t_start, frequency, amplitude, phase, pulsed, None, dtype)
+            w_vals.flags.writeable = False
+
+            with WAVEFORM_CACHE_LOCK:
+                if key not in WAVEFORM_CACHE and w_vals.nbytes <= WAVEFORM_CACHE_STATS['max_bytes']:
+                    WAVEFORM_CACHE[key] = (timeInterval, w_vals)
+                    WAVEFORM_CACHE_STATS['n_bytes'] += w_vals.nbytes
+                    while WAVEFORM_CACHE_STATS['n_bytes'] > WAVEFORM_CACHE_STATS['max_bytes']:
+                        old_key, old_val = WAVEFORM_CACHE.popitem(last = False)
+                        WAVEFORM_CACHE_STATS['n_bytes'] -= old_val[1].nbytes
+                        WAVEFORM_CACHE_STATS['evictions'] += 1
+
+            return (timeInterval, w_vals)
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nshape must be one of sine, square, triangle'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nsample_rate is negative'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nno_smpls is negative'
+            if c4 is False: ERR_STATEMENT = ERR_STATEMENT + '\nfrequency is negative'
+            if c5 is False: ERR_STATEMENT = ERR_STATEMENT + '\namplitude is out of range for NI-DAQ'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Waveform_Cache_Info(loud = False):
+    """
+    Return a snapshot of the waveform cache counters as a dict
+    keys are hits, misses, evictions, n_entries, n_bytes, max_bytes, hit_rate
+
+    18 - 10 - 2026
+    """
+
+    with WAVEFORM_CACHE_LOCK:
+        info = dict(WAVEFORM_CACHE_STATS)
+        info['n_entries'] = len(WAVEFORM_CACHE)
+
+    n_calls = info['hits'] + info['misses']
+    info['hit_rate'] = float(info['hits']) / float(n_calls) if n_calls > 0 else 0.0
+
+    if loud:
+        print("Waveform cache: %(v1)d entries, %(v2)0.2f of %(v3)0.2f (MB), hits: %(v4)d, misses: %(v5)d, evictions: %(v6)d, hit rate: %(v7)0.3f"%{"v1":info['n_entries'], 
+                "v2":info['n_bytes'] / 1048576.0, "v3":info['max_bytes'] / 1048576.0, "v4":info['hits'], "v5":info['misses'], "v6":info['evictions'], "v7":info['hit_rate']})
+
+    return info
+
+def Waveform_Cache_Clear(max_bytes = None):
+    """
+    Empty the waveform cache and reset its counters
+    max_bytes(int) optionally set a new bound on the total no. of bytes held in the cache
+
+    18 - 10 - 2026
+    """
+
+    with WAVEFORM_CACHE_LOCK:
+        WAVEFORM_CACHE.clear()
+        WAVEFORM_CACHE_STATS['hits'] = 0
+        WAVEFORM_CACHE_STATS['misses'] = 0
+        WAVEFORM_CACHE_STATS['evictions'] = 0
+        WAVEFORM_CACHE_STATS['n_bytes'] = 0
+        if max_bytes is not None: WAVEFORM_CACHE_STATS['max_bytes'] = int(max_bytes)
+
+# Channel descriptor returned by Parse_Channel_Spec
+# physical_channel_str(str) the string that was parsed
+# channels(tuple of str) ordered physical channel names with duplicates removed, e.g. ('Dev2/ai1', 'Dev2/ai2')
+# channel_numbers(tuple of int) channel numbers in the same order as channels
+# no_ch(int) no. of channels
+# kind(str) 'ai' or 'ao'
+# devices(tuple of str) device names in order of first appearance
+# sample_rate(int) max sample rate per channel in units of Hz, AI_SR_MAX or AO_SR_MAX shared across the channels on each device
+ChannelSpec = collections.namedtuple('ChannelSpec', ['physical_channel_str', 'channels', 'channel_numbers', 'no_ch', 'kind', 'devices', 'sample_rate'])
+
+# single compiled pattern for one comma separated item of a physical_channel string, e.g. 'Dev2/ai0' or 'Dev2/ai1:3'
+CHANNEL_ITEM_PATTERN = re.compile(r"^\s*([^/,\s]+)/(ai|ao)(\d+)(?::(\d+))?\s*$")
+
+@functools.lru_cache(maxsize = 256)
+def Parse_Channel_Spec(physical_channel_str):
+    """
+    Parse a physical_channel string descriptor into an immutable ChannelSpec
+    Results are memoized so task set-up code can call this repeatedly at no cost
+
+    Accepts descriptors of the forms listed in Extract_Sample_Rate, items may refer to more than one device
+    'device_name/a<x><v1>', 'device_name/a<x><v1>:<v2>' and comma separated lists of these
+    <x> = i or o, channel kind is taken from the a<x> token and not from the device name
+    Descending ranges 'device_name/a<x>3:1' are expanded in the order given
+    Duplicate channels are removed while preserving the order of first appearance
+
+    A descriptor mixing ai and ao channels or containing an unrecognised item raises a ValueError
+
+    18 - 10 - 2026
+    """
+
+    channels = []
+    numbers = []
+    devices = []
+    kinds = set()
+    for item in physical_channel_str.split(','):
+        match = CHANNEL_ITEM_PATTERN.match(item)
+        if match is None:
+            raise ValueError('Cannot parse physical channel item "' + item.strip() + '" in "' + physical_channel_str + '"')
+        dev, kind, v1, v2 = match.groups()
+        kinds.add(kind)
+        if dev not in devices: devices.append(dev)
+        v1 = int(v1)
+        v2 = v1 if v2 is None else int(v2)
+        step = 1 if v2 >= v1 else -1
+        for num in range(v1, v2 + step, step):
+            name = dev + '/' + kind + str(num)
+            if name not in channels:
+                channels.append(name)
+                numbers.append(num)
+
+    if len(kinds) > 1:
+        raise ValueError('physical_channel_str mixes ai and ao channels: "' + physical_channel_str + '"')
+
+    kind = kinds.pop()
+    SR_MAX = AI_SR_MAX if kind == 'ai' else AO_SR_MAX
+
+    # each device has its own converter, the per-channel rate is set by the device with the most channels
+    no_ch_dev = max( [ sum( [ 1 for name in channels if name.startswith(dev + '/') ] ) for dev in devices ] )
+
+    return ChannelSpec(physical_channel_str, tuple(channels), tuple(numbers), len(channels), kind, tuple(devices), SR_MAX // no_ch_dev)
+
+def Extract_Sample_Rate(physical_channel_str, device_name, loud = False):
+    """
+    Extract the AI / AO sample rate based on the data contained in the physical_channel string descriptor
+    Always want to set sample rate to be at its maximum
+    
+    Methods aims to process physical_channel string descriptors of the form
+    'device_name/a<x><v1>', single channel operation
+    'device_name/a<x><v1>:<v2>', multiple sequential channel operation
+    'device_name/axv1, device_name/axv2, ..., device_name/axvn', multiple channel operation
+    'device_name/a<x><v1>:<v2>, device_name/axv3, ..., device_name/axvn', multiple channel operation
+    'device_name/a<x><v1>:<v2>, device_name/a<x><v3>:<v4>', multiple channel operation
+    
+    <x> = i or o
+    <v1>, <v2> indicate the sequential channel numbers on the DAQ
+    
+    If a user inputs physical_channel_str with mix of ao and ai channels an exception will be thrown
+    
+    The string is parsed by Parse_Channel_Spec, the returned SR is always an int
+    physical_channel_str may also be a ChannelSpec that has already been parsed
+    device_name must be one of the devices named in physical_channel_str, otherwise an exception will be thrown
+
+    R. Sheehan 27 - 11 - 2025
+    """
+
+    FUNC_NAME = ".Extract_Sample_Rate()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if device_name != '' else False
+        spec = None
+        if c1 and c2:
+            spec = physical_channel_str if isinstance(physical_channel_str, ChannelSpec) else Parse_Channel_Spec(physical_channel_str)
+        c3 = True if spec is not None and device_name in spec.devices else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            if loud: 
+                print("Physical Channels: ",spec.physical_channel_str)
+                print("Channels:", list(spec.channel_numbers))
+                print("No. Channels:",spec.no_ch)
+                print("Sample Rate:", spec.sample_rate)
+                print()
+
+            return [spec.sample_rate, spec.no_ch]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in device_name'
+            if c1 and c2 and c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\n' + device_name + ' is not one of the devices in physical_channel_str'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Session_Task(physical_channel_str, device_name, sample_mode = None, samps_per_chan = None, rate = None):
+    """
+    Return a persistent, committed task for the given channels and timing config, building it on first use
+
+    The task is committed with TaskMode.TASK_COMMIT so the verify / reserve / commit transitions are paid once
+    Afterwards start() and stop() only move between the running and committed states, which is much cheaper
+    AI channels are configured for a differential read, all channels use the [-10, 10] V range
+
+    A device holds one AI and one AO session, as it can only run one task of each kind, asking for a different
+    channel spec or timing config closes the existing session of that kind first, as does a change of backend
+    A committed task keeps the device resources reserved, call Close_Sessions before building other tasks on the device
+
+    Inputs
+    physical_channel_str(str) AI or AO channels, e.g. 'Dev2/ai0:3'
+    device_name(str) e.g. 'Dev2'
+    sample_mode(AcquisitionType) FINITE or CONTINUOUS, None => on-demand task with no sample clock
+    samps_per_chan(int) as for cfg_samp_clk_timing
+    rate(float) sample rate in units of Hz, None => max rate from Extract_Sample_Rate
+
+    Output is a list [task, key]
+    key(tuple) identifies the session in SESSION_STATS
+
+    18 - 10 - 2026
+    """
+
+    key = (physical_channel_str, device_name, sample_mode, samps_per_chan, rate)
+    spec = Parse_Channel_Spec(physical_channel_str)
+    slot = (device_name, spec.kind)
+
+    with SESSION_LOCK:
+        entry = SESSION_TASKS.get(slot)
+        if entry is not None:
+            if entry[0] is nidaqmx and entry[1] == key:
+                return [entry[2], key]
+            del SESSION_TASKS[slot]
+            entry[2].close()
+
+        tstart = time.perf_counter()
+
+        task = nidaqmx.Task()
+        if spec.kind == 'ai':
+            task.ai_channels.add_ai_voltage_chan(physical_channel_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                 min_val = -10, max_val = +10)
+        else:
+            task.ao_channels.add_ao_voltage_chan(physical_channel_str, min_val = -10, max_val = +10)
+
+        if sample_mode is not None:
+            task.timing.cfg_samp_clk_timing(spec.sample_rate if rate is None else rate, sample_mode = sample_mode, 
+                                            samps_per_chan = samps_per_chan, active_edge = nidaqmx.constants.Edge.RISING)
+
+        task.control(nidaqmx.constants.TaskMode.TASK_COMMIT)
+
+        SESSION_TASKS[slot] = [nidaqmx, key, task]
+        if key not in SESSION_STATS:
+            SESSION_STATS[key] = {'setup_time':0.0, 'n_setups':0, 'n_calls':0, 'call_time':0.0, 'max_call_time':0.0}
+        SESSION_STATS[key]['setup_time'] += time.perf_counter() - tstart
+        SESSION_STATS[key]['n_setups'] += 1
+
+        return [task, key]
+
+def Session_Record(key, call_time):
+    """
+    add one call of duration call_time, in units of second, to the statistics of the session key
+
+    18 - 10 - 2026
+    """
+
+    with SESSION_LOCK:
+        entry = SESSION_STATS[key]
+        entry['n_calls'] += 1
+        entry['call_time'] += call_time
+        entry['max_call_time'] = max(entry['max_call_time'], call_time)
+
+def Session_Read(physical_channel_str, device_name, n_samples = None):
+    """
+    Read from a persistent committed AI task
+
+    n_samples(int) no. of samples per channel read with a FINITE sample clock at the max rate
+    n_samples = None => single on-demand read of each channel
+
+    Output is the data returned by task.read
+
+    18 - 10 - 2026
+    """
+
+    if n_samples is None:
+        task, key = Session_Task(physical_channel_str, device_name)
+        tstart = time.perf_counter()
+        data = task.read()
+    else:
+        task, key = Session_Task(physical_channel_str, device_name, nidaqmx.constants.AcquisitionType.FINITE, n_samples)
+        tstart = time.perf_counter()
+        task.start()
+        data = task.read(n_samples)
+        task.stop() # returns the task to the committed state, not to verified
+    Session_Record(key, time.perf_counter() - tstart)
+
+    return data
+
+def Session_Write(physical_channel_str, device_name, values):
+    """
+    Write a set-point to a persistent committed on-demand AO task
+    values(float or list of float) one value per AO channel
+
+    18 - 10 - 2026
+    """
+
+    task, key = Session_Task(physical_channel_str, device_name)
+    tstart = time.perf_counter()
+    task.write(values, auto_start = True)
+    Session_Record(key, time.perf_counter() - tstart)
+
+def Session_Stats(loud = False):
+    """
+    Return a copy of the session statistics, a dict keyed on session key with entries
+    setup_time, n_setups, n_calls, call_time, max_call_time, mean_call_time, all times in units of second
+    n_setups > 1 means the session was replaced by another of the same kind on the device and rebuilt
+
+    18 - 10 - 2026
+    """
+
+    with SESSION_LOCK:
+        stats = dict( [ (key, dict(entry)) for key, entry in SESSION_STATS.items() ] )
+
+    for key, entry in stats.items():
+        entry['mean_call_time'] = entry['call_time'] / entry['n_calls'] if entry['n_calls'] > 0 else 0.0
+        if loud:
+            print("%(v1)s: set-up: %(v2)0.3f (ms) x %(v6)d, calls: %(v3)d, mean call: %(v4)0.3f (ms), max call: %(v5)0.3f (ms)"%{"v1":key[0], 
+                    "v2":1000.0 * entry['setup_time'], "v3":entry['n_calls'], "v4":1000.0 * entry['mean_call_time'], "v5":1000.0 * entry['max_call_time'], 
+                    "v6":entry['n_setups']})
+
+    return stats
+
+def Close_Sessions():
+    """
+    Close every persistent task and clear the session statistics
+
+    18 - 10 - 2026
+    """
+
+    with SESSION_LOCK:
+        for backend, key, task in SESSION_TASKS.values():
+            task.close()
+        SESSION_TASKS.clear()
+        SESSION_STATS.clear()
+
+def Session_Latency_Test(ai_chn_str = 'Dev2/ai0:3', ao_chn_str = 'Dev2/ao0', device_name = 'Dev2', n_calls = 20, n_samples = 100):
+    """
+    Compare per-call task creation against persistent committed sessions
+    Each call writes a set-point on AO and reads n_samples per channel on AI
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Session_Latency_Test()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+
+        # build, configure, start, stop and close the tasks on every call
+        tstart = time.perf_counter()
+        for i in range(0, n_calls, 1):
+            with nidaqmx.Task() as ao_task:
+                ao_task.ao_channels.add_ao_voltage_chan(ao_chn_str, min_val = -10, max_val = +10)
+                ao_task.write(0.0, auto_start = True)
+            with nidaqmx.Task() as ai_task:
+                ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                        min_val = -10, max_val = +10)
+                ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, samps_per_chan = n_samples)
+                ai_task.start()
+                ai_task.read(n_samples)
+                ai_task.stop()
+        t_per_call = ( time.perf_counter() - tstart ) / n_calls
+
+        # persistent committed tasks
+        Close_Sessions()
+        for i in range(0, n_calls, 1):
+            Session_Write(ao_chn_str, device_name, 0.0)
+            Session_Read(ai_chn_str, device_name, n_samples)
+
+        print("Per-call tasks: %(v1)0.3f (ms) per write + read"%{"v1":1000.0 * t_per_call})
+        Session_Stats(loud = True)
+
+        Close_Sessions()
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Scaling_Coefficients(task):
+    """
+    Return the polynomial coefficients the driver uses to convert raw ADC codes into volts for each AI channel in task
+
+    Output is a numpy array of shape (n_channels, n_coeffs), lowest order first, so that
+    volts[i] = sum_k coeffs[i, k] * code[i]**k
+    Trailing orders that are zero on every channel are dropped, on the USB-6001 this normally leaves offset and gain
+
+    18 - 10 - 2026
+    """
+
+    rows = [ list(chan.ai_dev_scaling_coeff) for chan in task.ai_channels ]
+    n_coeffs = max( [ len(row) for row in rows ] )
+    coeffs = numpy.zeros( (len(rows), n_coeffs), dtype = numpy.float64 )
+    for i, row in enumerate(rows):
+        coeffs[i, :len(row)] = row
+
+    while coeffs.shape[1] > 1 and not numpy.any(coeffs[:, -1]):
+        coeffs = coeffs[:, :-1]
+
+    return coeffs
+
+# Convert raw ADC codes into volts, the implementation shared with the recorder, pipeline and bus lives in NI_DAQ_Scaling
+Scale_Raw = NI_DAQ_Scaling.Scale_Raw
+
+class Raw_Block:
+    """
+    Block of unscaled AI samples, stored as int16 codes together with the scaling coefficients of each channel
+    Uses a quarter of the memory of the equivalent float64 voltages, conversion happens only when volts() is called
+
+    codes(numpy array) int16 of shape (n_channels, n_samples)
+    coeffs(numpy array) of shape (n_channels, n_coeffs), see AI_Scaling_Coefficients
+    sample_rate(float) sample rate per channel in units of Hz
+    channel_names(list of str) physical channel of each row
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, codes, coeffs, sample_rate, channel_names):
+        self.codes = codes
+        self.coeffs = coeffs
+        self.sample_rate = sample_rate
+        self.channel_names = channel_names
+
+    def __len__(self):
+        return self.codes.shape[1]
+
+    def time_axis(self, t0 = 0.0):
+        """
+        NI_DAQ_Timing.Time_Axis of the samples, the first at t0
+        """
+        return NI_DAQ_Timing.Time_Axis(t0, 1.0 / self.sample_rate, self.codes.shape[1])
+
+    def volts(self, channels = None, start = 0, stop = None, out = None):
+        """
+        return the voltages of the selected channels over samples [start, stop)
+        channels(list of int) rows to convert, None => all channels
+        out(numpy array) optional float64 destination of the right shape
+        """
+        rows = slice(None) if channels is None else channels
+        return Scale_Raw(self.codes[rows, start:stop], self.coeffs[rows], out)
+
+def AI_Read_Raw(physical_channel_str, device_name, n_samples, codes = None, loud = False):
+    """
+    Read a finite block of unscaled AI samples straight into a preallocated int16 array
+
+    Uses the driver's unscaled stream reader so no Python float is created per sample and no scaling is applied
+    differential read is assumed on all channels, the [-10, 10] V range is used
+
+    Inputs
+    physical_channel_str(str) AI channels, e.g. 'Dev2/ai0:3'
+    device_name(str) e.g. 'Dev2'
+    n_samples(int) no. of samples per channel, read at the max rate from Extract_Sample_Rate
+    codes(numpy array) optional int16 array of shape (n_channels, n_samples) to read into, reuse it across calls to avoid allocation
+    loud(boolean) print the memory held by the block
+
+    Output is a Raw_Block, call .volts() to obtain the voltages
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Read_Raw()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ai_SR, ai_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+
+        c1 = True if n_samples > 0 else False
+        c2 = True if codes is None or ( codes.dtype == numpy.int16 and codes.shape == (ai_no_ch, n_samples) and codes.flags['C_CONTIGUOUS'] ) else False
+        c10 = c1 and c2
+
+        if c10:
+            if codes is None:
+                codes = numpy.zeros( (ai_no_ch, n_samples), dtype = numpy.int16 )
+
+            with nidaqmx.Task() as ai_task:
+                ai_task.ai_channels.add_ai_voltage_chan(physical_channel_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                        min_val = -10, max_val = +10)
+                ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
+                                                   samps_per_chan = n_samples, active_edge = nidaqmx.constants.Edge.RISING)
+                coeffs = AI_Scaling_Coefficients(ai_task)
+                channel_names = list(ai_task.ai_channels.channel_names)
+
+                reader = nidaqmx.stream_readers.AnalogUnscaledReader(ai_task.in_stream)
+                ai_task.start()
+                reader.read_int16(codes, number_of_samples_per_channel = n_samples, timeout = n_samples / float(ai_SR) + 10.0)
+                ai_task.stop()
+
+            if loud:
+                print("Raw block: %(v1)d x %(v2)d samples, %(v3)0.1f kB as int16, %(v4)0.1f kB as float64"%{"v1":ai_no_ch, "v2":n_samples, 
+                        "v3":codes.nbytes / 1024.0, "v4":4 * codes.nbytes / 1024.0})
+
+            return Raw_Block(codes, coeffs, ai_SR, channel_names)
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_samples must be positive'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\ncodes must be a C-contiguous int16 array of shape (n_channels, n_samples)'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+class AI_Ring_Buffer:
+    """
+    Preallocated multi-channel ring buffer for continuous AI acquisition
+
+    Data is held in a (n_channels, 2*capacity) array, each block is written twice, once in each half
+    This means the latest n samples are always contiguous in memory and latest(n) can return a view instead of a copy
+    The view returned by latest(n) is only valid until capacity - n further samples have been written, copy it if it must be kept
+
+    capacity must be a whole number of blocks so that a block never wraps around the end of the buffer
+
+    dtype = numpy.int16 with coeffs from AI_Scaling_Coefficients holds raw ADC codes at a quarter of the memory,
+    latest_volts(n) converts only the samples asked for
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_channels, capacity, block_size, dtype = numpy.float64, coeffs = None):
+        if n_channels < 1 or block_size < 1 or capacity < block_size or capacity % block_size != 0:
+            raise ValueError('capacity must be a positive multiple of block_size')
+        self.n_channels = n_channels
+        self.capacity = capacity
+        self.block_size = block_size
+        self.data = numpy.zeros((n_channels, 2 * capacity), dtype = dtype)
+        self.coeffs = coeffs # scaling of raw codes to volts, None => data is already in volts
+        self.pos = 0 # index in [0, capacity) at which the next block will be written
+        self.total = 0 # total no. of samples per channel written since the buffer was created
+        self.lock = threading.Lock()
+
+    def write(self, block):
+        """
+        copy a (n_channels, block_size) block into the buffer, no memory is allocated
+        """
+        n = block.shape[-1]
+        with self.lock:
+            self.data[:, self.pos:self.pos + n] = block
+            self.data[:, self.pos + self.capacity:self.pos + self.capacity + n] = block
+            self.pos = (self.pos + n) % self.capacity
+            self.total += n
+
+    def latest(self, n = None):
+        """
+        return a zero-copy (n_channels, n) view of the latest n samples, n = None => all valid samples
+        """
+        with self.lock:
+            n_valid = min(self.total, self.capacity)
+            n = n_valid if n is None else min(n, n_valid)
+            end = self.pos + self.capacity
+            return self.data[:, end - n:end]
+
+    def latest_volts(self, n = None, out = None):
+        """
+        latest(n) converted to volts, a view of the buffer itself when it already holds volts
+        """
+        view = self.latest(n)
+        return view if self.coeffs is None else Scale_Raw(view, self.coeffs, out)
+
+def AI_Monitor(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', loud = False, duration = 10.0, block_time = 0.1, capacity_time = 10.0, 
+               consumer = None, raw = False, stop_event = None):
+    """
+    Use NI-DAQ to measure multiple real-time AI
+
+    differential read is assumed on all channels
+
+    The AI task runs with a CONTINUOUS sample clock, the driver's every-N-samples-acquired callback reads each block
+    into a preallocated array using the stream reader and copies it into an AI_Ring_Buffer
+    Memory use is fixed by capacity_time, so the monitor can run at the full 20 kS/s aggregate rate indefinitely
+
+    Inputs
+    physical_channel_str(str) AI channels to monitor
+    device_name(str) e.g. 'Dev2'
+    loud(boolean) print the latest mean of each channel once per second
+    duration(float) length of time to monitor in units of second
+    block_time(float) length of time covered by each block read from the driver in units of second
+    capacity_time(float) length of time held in the ring buffer in units of second
+    consumer(function) optional, called as consumer(ring) from the driver thread after each block is stored
+    it must return quickly, slow processing belongs on another thread reading ring.latest()
+    raw(boolean) True => read unscaled int16 codes with the unscaled stream reader and keep them in the ring,
+    a quarter of the memory of float64, use ring.latest_volts() to obtain voltages
+    stop_event(threading.Event) optional, setting it ends the monitoring before duration has elapsed
+
+    Output is a list [ring, stats]
+    ring(AI_Ring_Buffer) contains the most recent capacity_time of data
+    stats(dict) with keys blocks, errors
+
+    R. Sheehan 3 - 12 - 2025
+    """
+
+    FUNC_NAME = ".AI_Monitor()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if device_name != '' else False
+        c3 = True if duration > 0 and block_time > 0 and capacity_time >= block_time else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            # Extract the sample rate per channel
+            ai_chn_str = physical_channel_str
+
+            ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+
+            block_size = max(1, int(ai_SR * block_time))
+            capacity = block_size * int(math.ceil(capacity_time / block_time))
+
+            dtype = numpy.int16 if raw else numpy.float64
+            block = numpy.zeros((ai_no_ch, block_size), dtype = dtype) # reused for every read
+            stats = {'blocks':0, 'errors':0}
+
+            # Configure Analog Input
+            ai_task = nidaqmx.Task()        
+
+            # If ai_chn_str is not correctly defined an exception will be thrown by nidaqmx
+            ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                    min_val = -10, max_val = +10)
+            
+            # Configure the sampling timing
+            # In CONTINUOUS mode samps_per_chan sets the size of the driver buffer, allow several blocks of slack
+            ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS, 
+                                               samps_per_chan = 8 * block_size, active_edge = nidaqmx.constants.Edge.RISING)
+
+            if raw:
+                ring = AI_Ring_Buffer(ai_no_ch, capacity, block_size, numpy.int16, AI_Scaling_Coefficients(ai_task))
+                read_block = nidaqmx.stream_readers.AnalogUnscaledReader(ai_task.in_stream).read_int16
+            else:
+                ring = AI_Ring_Buffer(ai_no_ch, capacity, block_size)
+                read_block = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream).read_many_sample
+
+            def Read_Block(task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+                # called by the driver each time block_size samples per channel have been acquired
+                # exceptions must not propagate back into the driver, record them instead
+                try:
+                    read_block(block, number_of_samples_per_channel = block_size)
+                    ring.write(block)
+                    stats['blocks'] += 1
+                    if consumer is not None:
+                        with NI_DAQ_Metrics.Span('consumer'): consumer(ring)
+                except Exception:
+                    stats['errors'] += 1
+                return 0
+
+            ai_task.register_every_n_samples_acquired_into_buffer_event(block_size, Read_Block)
+
+            # AI Channel Monitoring
+            ai_task.start()
+            t_end = time.perf_counter() + duration
+            while time.perf_counter() < t_end and ( stop_event is None or not stop_event.is_set() ):
+                if stop_event is None: time.sleep( min(1.0, max(0.0, t_end - time.perf_counter())) )
+                else: stop_event.wait( min(1.0, max(0.0, t_end - time.perf_counter())) )
+                if loud:
+                    latest = ring.latest_volts(block_size)
+                    print("t = %(v1)0.1f (s): "%{"v1":ring.total / float(ai_SR)}, numpy.round(numpy.mean(latest, axis = 1), 4) )
+            ai_task.stop()
+
+            # Close off the ai_task
+            ai_task.close()
+
+            if loud:
+                print("Blocks read:", stats['blocks'])
+                print("Callback errors:", stats['errors'])
+                print()
+
+            return [ring, stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in device_name'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration, block_time, capacity_time out of range'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Record(physical_channel_str, device_name, file_path, duration = 60.0, block_time = 0.1, raw = True, loud = False, metadata = None):
+    """
+    Record continuous AI to disk for long runs
+
+    AI_Monitor supplies the blocks, each block is handed to an NI_DAQ_Recorder.Recorder which writes it on a background thread
+    into an append-only memory-mapped file, RAM use is fixed by the monitor ring buffer and the recorder queue
+    Open the file with NI_DAQ_Recorder.Recording, during or after the run, to obtain zero-copy views of any time range
+
+    Inputs
+    physical_channel_str(str) AI channels to record
+    device_name(str) e.g. 'Dev2'
+    file_path(str) recording to create when the first block arrives, the block index is written alongside as file_path + '.idx'
+    duration(float) length of the recording in units of second
+    block_time(float) length of time covered by each block in units of second
+    raw(boolean) True => store int16 codes and the per-channel scaling coefficients, False => store float64 volts
+    loud(boolean) print the recorder statistics at the end of the run
+    metadata(dict) optional extra entries stored in the recording header
+
+    Output is the recorder statistics, a dict with keys blocks, samples, dropped, errors
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Record()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if file_path != '' else False
+        c3 = True if duration > 0 and block_time > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            spec = Parse_Channel_Spec(physical_channel_str)
+            ai_SR, ai_no_ch = Extract_Sample_Rate(spec, device_name)
+
+            recorder = []
+
+            def Store_Block(ring):
+                # the recorder is opened on the first block, the ring already holds the dtype and scaling coefficients of the monitor task
+                if len(recorder) == 0:
+                    recorder.append( NI_DAQ_Recorder.Recorder(file_path, spec.channels, ai_SR, ring.data.dtype, ring.coeffs, metadata = metadata) )
+                recorder[0].write( ring.latest(ring.block_size) )
+
+            try:
+                # the ring only has to cover the time the recorder needs to pick up a block
+                AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 8 * block_time, Store_Block, raw)
+            finally:
+                if len(recorder) > 0: recorder[0].close()
+
+            if len(recorder) == 0:
+                ERR_STATEMENT = ERR_STATEMENT + '\nNo blocks were acquired, ' + file_path + ' was not created'
+                raise Exception
+            recorder = recorder[0]
+
+            if loud:
+                print("Recorded %(v1)d blocks, %(v2)d samples per channel, %(v3)d dropped, %(v4)d errors to %(v5)s"%{"v1":recorder.stats['blocks'], 
+                        "v2":recorder.stats['samples'], "v3":recorder.stats['dropped'], "v4":recorder.stats['errors'], "v5":file_path})
+
+            return recorder.stats
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in file_path'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration or block_time out of range'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Live_View(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', duration = 10.0, window_time = 2.0, block_time = 0.05, 
+                 method = 'minmax', headless = False, raw = False, loud = False):
+    """
+    Live plot of continuous AI
+
+    AI_Monitor acquires on a background thread into its ring buffer while this thread renders the latest window_time seconds
+    with NI_DAQ_Live_Plot, so a slow frame delays the next frame and never the acquisition
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    duration(float) length of time to view in units of second
+    window_time(float) length of time shown in units of second
+    method(str) decimation, 'minmax' or 'lttb'
+    headless(boolean) render to an Agg canvas without a display, for benchmarking
+    loud(boolean) print the frame rate and acquisition statistics
+
+    Output is a list [plot_stats, monitor_stats]
+    plot_stats(dict) see NI_DAQ_Live_Plot.Live_Plot, with frame_rate added
+    monitor_stats(dict) with keys blocks, errors, samples as returned by AI_Monitor
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Live_View()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and window_time > 0 and block_time > 0 else False
+        c10 = c1 and c2
+
+        if c10:
+            spec = Parse_Channel_Spec(physical_channel_str)
+            ai_SR, ai_no_ch = Extract_Sample_Rate(spec, device_name)
+
+            view = NI_DAQ_Live_Plot.Live_Plot(ai_no_ch, ai_SR, window_time, method, headless = headless, channel_names = list(spec.channels))
+
+            holder = {}
+            def Keep_Ring(ring):
+                holder['ring'] = ring
+
+            def Acquire():
+                holder['result'] = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 2.0 * window_time, Keep_Ring, raw)
+
+            monitor = threading.Thread(target = Acquire, name = 'AI_Live_View', daemon = True)
+            monitor.start()
+            while 'ring' not in holder and monitor.is_alive():
+                time.sleep(block_time)
+
+            if 'ring' in holder:
+                ring = holder['ring']
+                done = threading.Event()
+                watcher = threading.Thread(target = lambda: (monitor.join(), done.set()), daemon = True)
+                watcher.start()
+                view.run(ring.latest_volts, duration, done)
+            monitor.join()
+
+            ring, monitor_stats = holder['result']
+            monitor_stats = dict(monitor_stats)
+            monitor_stats['samples'] = ring.total
+            plot_stats = dict(view.stats)
+            plot_stats['frame_rate'] = view.frame_rate()
+
+            if loud:
+                print("Frames: %(v1)d, mean render: %(v2)0.2f (ms), max render: %(v3)0.2f (ms), sustainable rate: %(v4)0.1f (fps)"%{"v1":plot_stats['frames'], 
+                        "v2":1000.0 * plot_stats['render_time'] / max(1, plot_stats['frames']), "v3":1000.0 * plot_stats['max_render_time'], "v4":plot_stats['frame_rate']})
+                print("Blocks: %(v1)d, callback errors: %(v2)d, samples per channel: %(v3)d"%{"v1":monitor_stats['blocks'], "v2":monitor_stats['errors'], 
+                        "v3":monitor_stats['samples']})
+
+            view.close()
+
+            return [plot_stats, monitor_stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration, window_time or block_time out of range'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Triggered_Capture(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', channel = 0, mode = 'edge', level = 0.0, slope = 'rising', 
+                         hysteresis = 0.0, window = None, pre_time = 0.01, post_time = 0.04, holdoff_time = 0.0, n_captures = 10, duration = 10.0, 
+                         block_time = 0.01, raw = False, loud = False):
+    """
+    Capture the AI around software trigger events on a continuous acquisition
+
+    AI_Monitor acquires continuously, a NI_DAQ_Trigger.Software_Trigger tests each block as it arrives and copies
+    pre_time before to post_time after each trigger out of the ring buffer, re-arming after each capture
+    A trigger is detected at most one block after it occurs, so block_time sets the detection latency
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    channel(int) position of the trigger channel in physical_channel_str
+    mode(str), level(float), slope(str), hysteresis(float), window(tuple) trigger condition, see NI_DAQ_Trigger
+    pre_time(float), post_time(float), holdoff_time(float) in units of second, see NI_DAQ_Trigger.Software_Trigger
+    n_captures(int) stop once this many captures have been made
+    duration(float) max length of the acquisition in units of second
+    loud(boolean) print a line per capture and the trigger statistics
+
+    Output is a list [captures, stats]
+    captures(list) of capture dicts with keys data, time_axis, index, time, latency, see NI_DAQ_Trigger.Software_Trigger
+    stats(dict) trigger statistics with the monitor keys blocks, errors added as monitor_blocks, monitor_errors
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Triggered_Capture()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and block_time > 0 else False
+        c3 = True if n_captures > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            ai_SR, ai_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+            c4 = True if channel >= 0 and channel < ai_no_ch else False
+            if c4 is False:
+                raise ValueError('channel must be in [0, ' + str(ai_no_ch) + ')')
+
+            finished = threading.Event()
+            def Report(capture):
+                if loud: print("Trigger at t = %(v1)0.4f (s), detected %(v2)d samples later"%{"v1":capture['time'], "v2":capture['latency']})
+                trigger.captures.append(capture)
+                if trigger.done(): finished.set()
+
+            trigger = NI_DAQ_Trigger.Software_Trigger(ai_SR, channel, mode, level, slope, hysteresis, window, pre_time, post_time, holdoff_time, 
+                                                      max_captures = n_captures, on_capture = Report)
+
+            # the ring must still hold the pre-trigger samples when the last post-trigger block arrives
+            capacity_time = 2.0 * (pre_time + post_time) + 4.0 * block_time
+            ring, monitor_stats = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, capacity_time, trigger.process, raw, finished)
+
+            stats = dict(trigger.stats)
+            stats['monitor_blocks'] = monitor_stats['blocks']
+            stats['monitor_errors'] = monitor_stats['errors']
+
+            if loud:
+                print("Captures: %(v1)d, dropped: %(v2)d, max detection latency: %(v3)d samples, trigger cost: %(v4)0.2f (us) per block"%{"v1":stats['captures'], 
+                        "v2":stats['dropped'], "v3":stats['max_latency'], "v4":1.0e6 * stats['process_time'] / max(1, stats['blocks'])})
+                print()
+
+            return [trigger.captures, stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration or block_time out of range'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_captures must be positive'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Spectrum(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', duration = 10.0, block_time = 0.1, n_per_seg = 4096, overlap = 0.5, 
+                window = 'hann', fundamental = None, raw = False, loud = False):
+    """
+    Welch averaged power spectral density of continuous AI, with tone and distortion figures for each channel
+
+    AI_Monitor acquires continuously and each block is folded into a NI_DAQ_Spectrum.Welch_PSD as it arrives,
+    so memory use is fixed by n_per_seg whatever the duration, and the spectrum is available as soon as the run ends
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    duration(float) length of the acquisition in units of second
+    n_per_seg(int) FFT length, the resolution is sample_rate / n_per_seg
+    overlap(float) fraction of overlap of successive segments
+    window(str) one of 'rect', 'hann', 'hamming', 'blackman', 'flattop', use blackman or flattop for THD below about -60 dB
+    fundamental(float) frequency of the test tone in units of Hz, None => the largest peak on each channel
+    loud(boolean) print the figures for each channel
+
+    Output is a list [frequencies, psd, metrics]
+    frequencies(numpy array) in units of Hz
+    psd(numpy array) (n_channels, n_bins) one-sided PSD in units of V^2 / Hz
+    metrics(list) of dicts, one per channel, see NI_DAQ_Spectrum.Spectrum_Metrics
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Spectrum()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and block_time > 0 else False
+        c3 = True if n_per_seg >= 16 else False
+        rate = Extract_Sample_Rate(physical_channel_str, device_name) if c1 else None
+        c4 = True if rate is not None and duration * rate[0] >= n_per_seg else False
+        c10 = c1 and c2 and c3 and c4
+
+        if c10:
+            spec = Parse_Channel_Spec(physical_channel_str)
+            ai_SR, ai_no_ch = rate
+
+            welch = NI_DAQ_Spectrum.Welch_PSD(ai_no_ch, ai_SR, n_per_seg, overlap, window)
+            scaled = numpy.zeros( (ai_no_ch, max(1, int(ai_SR * block_time))) ) # reused for every raw block
+
+            def Update(ring):
+                welch.update( ring.latest_volts(ring.block_size, scaled if raw else None) )
+
+            ring, monitor_stats = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 4.0 * block_time, Update, raw)
+
+            if welch.n_segments == 0:
+                ERR_STATEMENT = ERR_STATEMENT + '\nNo complete segment of n_per_seg samples was acquired, blocks: %(v1)d'%{"v1":monitor_stats['blocks']}
+                raise Exception
+            psd = welch.psd()
+            metrics = [ NI_DAQ_Spectrum.Spectrum_Metrics(welch.frequencies, psd[i], welch.mainlobe, fundamental) for i in range(ai_no_ch) ]
+
+            if loud:
+                print("Segments averaged: %(v1)d, resolution: %(v2)0.3f (Hz), blocks: %(v3)d, callback errors: %(v4)d"%{"v1":welch.n_segments, 
+                        "v2":welch.frequencies[1], "v3":monitor_stats['blocks'], "v4":monitor_stats['errors']})
+                for name, m in zip(spec.channels, metrics):
+                    print("%(v1)s: f = %(v2)0.3f (Hz), A = %(v3)0.4f (V), THD = %(v4)0.1f (dB), SNR = %(v5)0.1f (dB), SINAD = %(v6)0.1f (dB), ENOB = %(v7)0.2f"%{"v1":name, 
+                            "v2":m['frequency'], "v3":m['amplitude'], "v4":m['thd_db'], "v5":m['snr_db'], "v6":m['sinad_db'], "v7":m['enob']})
+                print()
+
+            return [welch.frequencies, psd, metrics]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration or block_time out of range'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_per_seg must be at least 16'
+            if c4 is False and rate is not None:
+                ERR_STATEMENT = ERR_STATEMENT + '\nduration must cover at least one segment, n_per_seg / sample rate = %(v1)0.3f (s)'%{"v1":n_per_seg / float(rate[0])}
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Lock_In(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', frequencies = [10.0], phases = None, out_rate = 10.0, order = 4, 
+               duration = 10.0, block_time = 0.1, raw = False, loud = False):
+    """
+    Lock-in detection of one or more reference frequencies on every AI channel of a continuous acquisition
+
+    The excitation is generated separately, e.g. by AO_Stream_Waveform with the same frequency and phase, and the reference
+    is rebuilt from those parameters by the phase continuous NCO of NI_DAQ_Lockin.Lock_In, which demodulates each block
+    as it arrives, only the decimated X, Y, R, theta are kept
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    frequencies(list of float) reference frequencies in units of Hz
+    phases(list of float) reference phases in units of radian, None => zero
+    out_rate(float) output rate in units of Hz
+    order(int) order of the sinc low-pass filter
+    duration(float) length of the acquisition in units of second
+    loud(boolean) print the mean R and theta of each channel at each reference
+
+    Output is a dict with keys
+    time_axis(Time_Axis) time of each output in units of second from the first AI sample
+    X, Y, R, theta(numpy array) each (n_references, n_channels, n_out), X, Y, R in units of V, theta in units of radian
+    time_constant, delay(float) of the low-pass filter in units of second
+    monitor_stats(dict) as returned by AI_Monitor
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Lock_In()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and block_time > 0 and out_rate > 0 else False
+        c3 = True if len(frequencies) > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            spec = Parse_Channel_Spec(physical_channel_str)
+            ai_SR, ai_no_ch = Extract_Sample_Rate(spec, device_name)
+
+            lock_in = NI_DAQ_Lockin.Lock_In(ai_SR, ai_no_ch, frequencies, phases, out_rate, order)
+            outputs = []
+            scaled = numpy.zeros( (ai_no_ch, max(1, int(ai_SR * block_time))) ) # reused for every raw block
+
+            def Demodulate(ring):
+                out = lock_in.process( ring.latest_volts(ring.block_size, scaled if raw else None) )
+                if out['time_axis'].n > 0: outputs.append(out)
+
+            ring, monitor_stats = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 4.0 * block_time, Demodulate, raw)
+
+            result = {'time_constant':lock_in.time_constant, 'delay':lock_in.delay, 'monitor_stats':monitor_stats}
+            for key in ('X', 'Y', 'R', 'theta'):
+                result[key] = numpy.concatenate( [ out[key] for out in outputs ], axis = -1 ) if len(outputs) > 0 else numpy.zeros( (len(lock_in.frequencies), ai_no_ch, 0) )
+            result['time_axis'] = NI_DAQ_Timing.Time_Axis(0.0, 1.0 / lock_in.out_rate, result['R'].shape[-1])
+
+            if loud:
+                # skip the outputs that still contain the start of the filter response
+                skip = min( result['R'].shape[-1] - 1, int(math.ceil(2.0 * lock_in.delay * lock_in.out_rate)) )
+                print("Output rate: %(v1)0.2f (Hz), time constant: %(v2)0.3f (s), outputs: %(v3)d, callback errors: %(v4)d"%{"v1":lock_in.out_rate, 
+                        "v2":lock_in.time_constant, "v3":result['R'].shape[-1], "v4":monitor_stats['errors']})
+                for i, f in enumerate(lock_in.frequencies):
+                    for j, name in enumerate(spec.channels):
+                        # theta wraps at +/- pi, so the phase is taken from the averaged X and Y rather than the mean of theta
+                        theta_mean = math.atan2(numpy.mean(result['Y'][i, j, skip:]), numpy.mean(result['X'][i, j, skip:]))
+                        print("f = %(v1)0.3f (Hz), %(v2)s: R = %(v3)0.6f (V), theta = %(v4)0.2f (deg)"%{"v1":f, "v2":name, 
+                                "v3":numpy.mean(result['R'][i, j, skip:]), "v4":math.degrees(theta_mean)})
+                print()
+
+            return result
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration, block_time or out_rate out of range'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo reference frequencies given'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Read_Decimated(physical_channel_str = 'Dev2/ai0', device_name = 'Dev2', n_out = 10, out_rate = 10.0, method = 'cic', order = 4, 
+                      n_taps = None, raw = True, loud = False):
+    """
+    Low-noise DC readings by oversampling at the max AI rate and decimating to out_rate
+
+    Replaces the average of a handful of polled reads, each reading is the filtered average of sample_rate / out_rate samples,
+    so the white noise is reduced by about sqrt(ratio) and the readings are evenly spaced in time
+    The acquisition is FINITE and read in blocks of at most 0.1 s into the decimator, whose state is kept across blocks,
+    the outputs whose kernel reaches back before the first sample are acquired and discarded
+
+    Inputs
+    physical_channel_str(str) AI channels, e.g. 'Dev2/ai0:3'
+    device_name(str) e.g. 'Dev2'
+    n_out(int) no. of readings per channel
+    out_rate(float) reading rate in units of Hz, the decimation ratio is round(sample_rate / out_rate)
+    method(str) 'boxcar', 'cic' or 'fir', see NI_DAQ_Decimate
+    order(int) order of the cic filter, n_taps(int) length of the fir filter, None => 8 * ratio + 1
+    raw(boolean) True => decimate the unscaled int16 codes and scale the readings, which is exact for boxcar and cic since the
+    calibration polynomial is linear to within a fraction of a code over the span of the noise, False => decimate the voltages
+    loud(boolean) print the mean and standard deviation of the readings on each channel
+
+    Output is a list [readings, time_axis]
+    readings(numpy array) (n_channels, n_out) in units of V
+    time_axis(Time_Axis) time at the centre of the kernel of each reading in units of second from the first sample
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Read_Decimated()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if n_out > 0 and out_rate > 0 else False
+        c3 = True if method in NI_DAQ_Decimate.DECIMATOR_METHODS else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            ai_SR, ai_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+            ratio = max(1, int(round(ai_SR / out_rate)))
+            decimator = NI_DAQ_Decimate.Make_Decimator(method, ratio, order, n_taps, integer = raw)
+            skip = decimator.n_warmup
+            n_samples = (skip + n_out) * ratio
+            block_size = min( n_samples, max(ratio, int(0.1 * ai_SR)) )
+
+            readings = numpy.zeros( (ai_no_ch, n_out) )
+            block = numpy.zeros( (ai_no_ch, block_size), dtype = numpy.int16 if raw else numpy.float64 )
+            count = 0 # no. of readings kept
+            with nidaqmx.Task() as ai_task:
+                ai_task.ai_channels.add_ai_voltage_chan(physical_channel_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                        min_val = -10, max_val = +10)
+                ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
+                                                   samps_per_chan = n_samples, active_edge = nidaqmx.constants.Edge.RISING)
+                coeffs = AI_Scaling_Coefficients(ai_task) if raw else None
+                if raw:
+                    reader = nidaqmx.stream_readers.AnalogUnscaledReader(ai_task.in_stream)
+                    read = reader.read_int16
+                else:
+                    reader = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream)
+                    read = reader.read_many_sample
+
+                ai_task.start()
+                n_read = 0
+                while n_read < n_samples:
+                    n = min(block_size, n_samples - n_read)
+                    buf = block if n == block_size else numpy.zeros( (ai_no_ch, n), dtype = block.dtype )
+                    read(buf, number_of_samples_per_channel = n, timeout = n / float(ai_SR) + 10.0)
+                    n_read += n
+                    y = decimator.process(buf)
+                    first = decimator.n_out - y.shape[-1] # output no. of y[:, 0]
+                    y = y[:, max(0, skip - first):]
+                    m = min(y.shape[-1], n_out - count)
+                    readings[:, count:count + m] = y[:, :m]
+                    count += m
+                ai_task.stop()
+
+            if raw: readings = Scale_Raw(readings, coeffs)
+            time_axis = NI_DAQ_Timing.Time_Axis(decimator.centre(skip) / ai_SR, ratio / ai_SR, n_out)
+
+            if loud:
+                print("Decimated read: %(v1)s, ratio %(v2)d, %(v3)d readings at %(v4)0.2f (Hz)"%{"v1":method, "v2":ratio, "v3":n_out, "v4":ai_SR / ratio})
+                for i in range(ai_no_ch):
+                    print("ch %(v1)d: %(v2)0.6f +/- %(v3)0.6f (V)"%{"v1":i, "v2":numpy.mean(readings[i]), "v3":numpy.std(readings[i])})
+                print()
+
+            return [readings, time_axis]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_out and out_rate must be positive'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nmethod must be one of ' + str(NI_DAQ_Decimate.DECIMATOR_METHODS)
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Decimated_Stream(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', out_rate = 10.0, method = 'cic', order = 4, n_taps = None, 
+                        duration = 10.0, block_time = 0.1, raw = True, consumer = None, loud = False):
+    """
+    Continuous low-rate stream of decimated AI readings
+
+    Each block from AI_Monitor is passed through the decimator as it arrives, the filter state is carried across blocks
+    so the stream is free of block edge artefacts, and only the low-rate readings are kept or passed on
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    out_rate(float), method(str), order(int), n_taps(int) as for AI_Read_Decimated
+    duration(float) length of the acquisition in units of second
+    consumer(function) optional, called as consumer(readings, time_axis) from the acquisition thread for each block of readings,
+    readings in units of V, the readings are then not kept
+    loud(boolean) print the mean and standard deviation of the readings on each channel
+
+    Output is a list [readings, time_axis, monitor_stats], readings is (n_channels, 0) when consumer is given
+    the outputs whose kernel reaches back before the first sample are included, see decimator.n_warmup
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Decimated_Stream()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and block_time > 0 and out_rate > 0 else False
+        c3 = True if method in NI_DAQ_Decimate.DECIMATOR_METHODS else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            ai_SR, ai_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+            ratio = max(1, int(round(ai_SR / out_rate)))
+            decimator = NI_DAQ_Decimate.Make_Decimator(method, ratio, order, n_taps, integer = raw)
+            outputs = []
+
+            def Decimate(ring):
+                y = decimator.process( ring.latest(ring.block_size) )
+                if y.shape[-1] == 0: return
+                if raw: y = Scale_Raw(y, ring.coeffs)
+                if consumer is not None:
+                    first = decimator.n_out - y.shape[-1]
+                    consumer(y, NI_DAQ_Timing.Time_Axis(decimator.centre(first) / ai_SR, ratio / ai_SR, y.shape[-1]))
+                else:
+                    outputs.append(y)
+
+            ring, monitor_stats = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 4.0 * block_time, Decimate, raw)
+
+            readings = numpy.concatenate(outputs, axis = -1) if len(outputs) > 0 else numpy.zeros( (ai_no_ch, 0) )
+            time_axis = NI_DAQ_Timing.Time_Axis(decimator.centre(0) / ai_SR, ratio / ai_SR, decimator.n_out)
+
+            if loud:
+                skip = min(decimator.n_warmup, max(0, readings.shape[-1] - 1))
+                print("Decimated stream: %(v1)s, ratio %(v2)d, %(v3)d readings at %(v4)0.2f (Hz), callback errors: %(v5)d"%{"v1":method, "v2":ratio, 
+                        "v3":decimator.n_out, "v4":ai_SR / ratio, "v5":monitor_stats['errors']})
+                for i in range(readings.shape[0]):
+                    print("ch %(v1)d: %(v2)0.6f +/- %(v3)0.6f (V)"%{"v1":i, "v2":numpy.mean(readings[i, skip:]), "v3":numpy.std(readings[i, skip:])})
+                print()
+
+            return [readings, time_axis, monitor_stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration, block_time or out_rate out of range'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nmethod must be one of ' + str(NI_DAQ_Decimate.DECIMATOR_METHODS)
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Pipeline(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', stages = None, duration = 10.0, block_time = 0.1, raw = True, 
+                n_buffers = 8, loud = False):
+    """
+    Continuous AI through an NI_DAQ_Pipeline.Pipeline, acquisition on one thread overlapped with each processing stage on its own
+
+    The producer only reads each block from the driver into a pooled buffer, the stages reduce, filter, record or plot it,
+    so slow processing no longer leaves gaps between reads as in a read / process loop on one thread
+    The driver buffer holds at least 2 s, which absorbs short stalls of the stages, see the backlog in the output
+
+    Inputs
+    physical_channel_str(str) AI channels, e.g. 'Dev2/ai0:3'
+    device_name(str) e.g. 'Dev2'
+    stages(list of NI_DAQ_Pipeline.Stage) consumer stages in order, None => a single 'reduce' stage keeping NI_DAQ_Stats.Running_Stats
+    duration(float) length of the acquisition in units of second
+    block_time(float) length of time covered by each block in units of second
+    raw(boolean) True => the buffers hold int16 codes, use block.volts() in a stage to obtain voltages, False => float64 volts
+    n_buffers(int) no. of pooled buffers
+    loud(boolean) print the producer and stage metrics and the bottleneck stage
+
+    Output is a list [stats, running_stats]
+    stats(dict) as returned by Pipeline.stats(), the producer entry also has backlog_max, the max no. of samples per channel
+    left in the driver buffer after a read, which approaches the driver buffer size before an overflow
+    running_stats(NI_DAQ_Stats.Running_Stats) of the default reduce stage, None when stages are given
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Pipeline()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if duration > 0 and block_time > 0 else False
+        c3 = True if n_buffers >= 2 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            ai_SR, ai_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+            block_size = max(1, int(ai_SR * block_time))
+            n_blocks = int(math.ceil(duration / block_time))
+
+            running_stats = None
+            if stages is None:
+                running_stats = NI_DAQ_Stats.Running_Stats(ai_no_ch)
+                scaled = numpy.zeros( (ai_no_ch, block_size) ) # reused for every block, only the reduce stage writes it
+                stages = [ NI_DAQ_Pipeline.Stage('reduce', lambda block: running_stats.update( block.volts(scaled[:, :block.data.shape[1]]) )) ]
+
+            with nidaqmx.Task() as ai_task:
+                ai_task.ai_channels.add_ai_voltage_chan(physical_channel_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                        min_val = -10, max_val = +10)
+                ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS, 
+                                                   samps_per_chan = max(8 * block_size, int(2.0 * ai_SR)), active_edge = nidaqmx.constants.Edge.RISING)
+                if raw:
+                    coeffs = AI_Scaling_Coefficients(ai_task)
+                    read_block = nidaqmx.stream_readers.AnalogUnscaledReader(ai_task.in_stream).read_int16
+                else:
+                    coeffs = None
+                    read_block = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream).read_many_sample
+
+                backlog = [0]
+                def Read_Block(buf):
+                    # producer thread, one driver read per pooled buffer, 0 ends the run
+                    if pipe.producer['blocks'] >= n_blocks: return 0
+                    read_block(buf, number_of_samples_per_channel = block_size, timeout = block_time + 10.0)
+                    backlog[0] = max(backlog[0], ai_task.in_stream.avail_samp_per_chan)
+                    return block_size
+
+                pipe = NI_DAQ_Pipeline.Pipeline(Read_Block, stages, (ai_no_ch, block_size), numpy.int16 if raw else numpy.float64, n_buffers, coeffs)
+                ai_task.start()
+                stats = pipe.run()
+                ai_task.stop()
+            stats['producer']['backlog_max'] = backlog[0]
+
+            if loud:
+                producer = stats['producer']
+                print("Pipeline: %(v1)d blocks in %(v2)0.2f (s), producer pool wait %(v3)0.3f (s), stalled %(v4)0.3f (s), max driver backlog %(v5)d samples"%{
+                        "v1":producer['blocks'], "v2":stats['elapsed'], "v3":producer['pool_wait'], "v4":producer['stalled'], "v5":producer['backlog_max']})
+                if producer['exception'] is not None: print("Producer stopped by:", producer['exception'])
+                for name, s in stats['stages'].items():
+                    print("%(v1)-12s blocks: %(v2)d, skipped: %(v3)d, errors: %(v4)d, utilisation: %(v5)0.3f, stalled: %(v6)0.3f (s), depth max / mean: %(v7)d / %(v8)0.2f"%{
+                            "v1":name, "v2":s['blocks'], "v3":s['skipped'], "v4":s['errors'], "v5":s['utilisation'], "v6":s['stalled'], 
+                            "v7":s['depth_max'], "v8":s['depth_mean']})
+                print("Bottleneck:", pipe.bottleneck())
+                if running_stats is not None:
+                    for i in range(ai_no_ch):
+                        print("ch %(v1)d: %(v2)0.5f +/- %(v3)0.5f (V)"%{"v1":i, "v2":running_stats.mean[i], "v3":running_stats.std()[i]})
+                print()
+
+            return [stats, running_stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration and block_time must be positive'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_buffers must be >= 2 to overlap acquisition with processing'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AI_Publish(physical_channel_str = 'Dev2/ai0:3', device_name = 'Dev2', bus_name = 'NI_DAQ_Bus', duration = 60.0, block_time = 0.1, 
+               bus_time = 10.0, raw = True, replace = True, loud = False, metadata = None):
+    """
+    Publish continuous AI on a shared-memory bus so any no. of local processes can use the live signal
+
+    AI_Monitor acquires the stream and every block is copied into an NI_DAQ_Bus.Bus_Publisher, other processes attach with
+    NI_DAQ_Bus.Bus_Subscriber(bus_name) and read the latest samples zero-copy, or every sample in order, while this process keeps the task
+    The bus is created when the scaling of the task is known, i.e. when the first block arrives, and removed at the end of the run
+
+    Inputs
+    physical_channel_str(str), device_name(str), block_time(float), raw(boolean) as for AI_Monitor
+    bus_name(str) shared memory name of the bus
+    duration(float) length of the acquisition in units of second
+    bus_time(float) length of time held on the bus in units of second, a subscriber must read at least this often to see every sample
+    replace(boolean) True => remove a bus of the same name left behind by an earlier run that did not end cleanly
+    loud(boolean) print the publishing statistics
+    metadata(dict) optional extra entries stored in the bus header
+
+    Output is the AI_Monitor stats dict with the extra key published, the no. of blocks published
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AI_Publish()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if bus_name != '' else False
+        c3 = True if duration > 0 and block_time > 0 and bus_time >= block_time else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            spec = Parse_Channel_Spec(physical_channel_str)
+            ai_SR, ai_no_ch = Extract_Sample_Rate(spec, device_name)
+            block_size = max(1, int(ai_SR * block_time))
+            capacity = block_size * max(1, int(round(bus_time / block_time)))
+            bus = []
+
+            def Publish(ring):
+                if len(bus) == 0:
+                    bus.append( NI_DAQ_Bus.Bus_Publisher(bus_name, spec.channels, ai_SR, ring.block_size, capacity, ring.data.dtype, ring.coeffs, 
+                                                         metadata, replace) )
+                bus[0].publish( ring.latest(ring.block_size) )
+
+            try:
+                ring, stats = AI_Monitor(physical_channel_str, device_name, False, duration, block_time, 4.0 * block_time, Publish, raw)
+            finally:
+                if len(bus) > 0: bus[0].close()
+            stats['published'] = bus[0].total // block_size if len(bus) > 0 else 0
+
+            if loud:
+                print("Bus %(v1)s: %(v2)d blocks published, %(v3)0.1f s held, callback errors: %(v4)d"%{"v1":bus_name, "v2":stats['published'], 
+                        "v3":capacity / float(ai_SR), "v4":stats['errors']})
+                print()
+
+            return stats
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo bus_name given'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration, block_time must be positive and bus_time >= block_time'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Frequency_Response(ao_chn_str = 'Dev2/ao0', ai_chn_str = 'Dev2/ai0:1', device_name = 'Dev2', excitation = 'multisine', f_start = 10.0, 
+                       f_stop = 2000.0, amplitude = 1.0, duration = 1.0, n_periods = 5, n_tones = 50, ref_channel = 0, n_per_seg = None, loud = False):
+    """
+    Broadband frequency response of a device under test from a single AO / AI acquisition
+
+    AO plays a log chirp or a multisine, AI records the reference, normally the ai0 loopback of the AO output,
+    and the response channels in the same task, so both are sampled on one clock and the AO start latency cancels
+    The transfer function from the reference to each response channel and its coherence come from NI_DAQ_Spectrum.Transfer_Function
+
+    multisine: the period is duration / n_periods rounded to a whole no. of samples on both clocks, the first period is
+    discarded as the settling transient and each remaining period is one leakage-free segment, H is given at the excited tones
+    chirp: a single log sweep over duration, segments of n_per_seg samples with a Hann window, H is given at every bin in the band
+
+    Inputs
+    ao_chn_str(str) single AO channel driving the device under test
+    ai_chn_str(str) AI channels, including the reference
+    device_name(str) e.g. 'Dev2'
+    excitation(str) 'multisine' or 'chirp'
+    f_start(float), f_stop(float) band of the measurement in units of Hz, f_stop is limited to half the lower of the AO and AI sample rates
+    amplitude(float) peak value of the excitation in units of V
+    duration(float) length of the excitation in units of second
+    n_periods(int) no. of multisine periods, at least 3 so that the coherence is averaged over 2 or more periods
+    n_tones(int) no. of log spaced multisine tones, None => every bin in the band
+    ref_channel(int) position of the reference in ai_chn_str
+    n_per_seg(int) chirp segment length in AI samples, None => a quarter of the AI samples in duration
+    loud(boolean) print the response at a few frequencies and the timing
+
+    Output is a list [frequencies, H, coherence]
+    frequencies(numpy array) in units of Hz
+    H(numpy array) complex (n_responses, n_frequencies), response channels in the order of ai_chn_str without the reference
+    coherence(numpy array) (n_responses, n_frequencies) in [0, 1]
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Frequency_Response()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        ao_SR, ao_no_ch = Extract_Sample_Rate(ao_chn_str, device_name)
+        ai_SR, ai_no_ch = Extract_Sample_Rate(ai_chn_str, device_name)
+        f_stop = min(f_stop, 0.5 * min(ao_SR, ai_SR)) # neither the excitation nor the response can be resolved above either Nyquist frequency
+
+        c1 = True if ao_no_ch == 1 else False
+        c2 = True if ai_no_ch >= 2 and ref_channel >= 0 and ref_channel < ai_no_ch else False
+        c3 = True if excitation in ('multisine', 'chirp') else False
+        c4 = True if f_start > 0 and f_stop > f_start and duration > 0 and math.fabs(amplitude) <= 10 else False
+        c5 = True if excitation == 'chirp' or n_periods >= 3 else False
+        c10 = c1 and c2 and c3 and c4 and c5
+
+        if c10:
+            if excitation == 'multisine':
+                # one period must be a whole no. of samples on both the AO and AI clocks
+                g = math.gcd( int(ao_SR), int(ai_SR) )
+                n_units = max( 1, int( round( duration / n_periods * g ) ) )
+                ao_period = n_units * ( int(ao_SR) // g )
+                ai_period = n_units * ( int(ai_SR) // g )
+                timeInt, period = Generate_Multisine_Waveform(ao_SR, ao_period, f_start, f_stop, n_tones, amplitude)
+                ao_vals = numpy.tile(period, n_periods)
+                n_ai = n_periods * ai_period
+            else:
+                timeInt, ao_vals = Generate_Chirp_Waveform(ao_SR, int(ao_SR * duration), 0.0, f_start, f_stop, amplitude)
+                n_ai = int( math.ceil( len(ao_vals) * float(ai_SR) / ao_SR ) ) + int(0.05 * ai_SR) # allow for the AO start latency
+
+            # finish at zero so the output does not hold the last sample of the excitation
+            ao_vals = numpy.append(ao_vals, 0.0)
+
+            ao_task = nidaqmx.Task()
+            ao_task.ao_channels.add_ao_voltage_chan(ao_chn_str, min_val = -10, max_val = +10)
+            ao_task.timing.cfg_samp_clk_timing(ao_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
+                                               samps_per_chan = len(ao_vals), active_edge = nidaqmx.constants.Edge.RISING)
+
+            ai_task = nidaqmx.Task()
+            ai_task.ai_channels.add_ai_voltage_chan(ai_chn_str, terminal_config = nidaqmx.constants.TerminalConfiguration.DIFF, 
+                                                    min_val = -10, max_val = +10)
+            ai_task.timing.cfg_samp_clk_timing(ai_SR, sample_mode = nidaqmx.constants.AcquisitionType.FINITE, 
+                                               samps_per_chan = n_ai, active_edge = nidaqmx.constants.Edge.RISING)
+
+            writer = nidaqmx.stream_writers.AnalogSingleChannelWriter(ao_task.out_stream, auto_start = False)
+            reader = nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream)
+            writer.write_many_sample(ao_vals)
+            data = numpy.zeros( (ai_no_ch, n_ai), dtype = numpy.float64 )
+
+            tstart = time.perf_counter()
+            ai_task.start()
+            ao_task.start()
+            reader.read_many_sample(data, number_of_samples_per_channel = n_ai, timeout = duration + 10.0)
+            ao_task.wait_until_done(timeout = 10.0)
+            t_total = time.perf_counter() - tstart
+
+            ao_task.stop()
+            ai_task.stop()
+            ao_task.close()
             ai_task.close()
+
+            ref = data[ref_channel]
+            resp = numpy.delete(data, ref_channel, axis = 0)
+            if excitation == 'multisine':
+                freqs, H, coh, pxx = NI_DAQ_Spectrum.Transfer_Function(ref[ai_period:], resp[:, ai_period:], ai_SR, ai_period, 0.0, 'rect')
+                keep = Multisine_Bins(ao_SR, ao_period, f_start, f_stop, n_tones)
+            else:
+                seg = int(n_ai // 4) if n_per_seg is None else int(n_per_seg)
+                freqs, H, coh, pxx = NI_DAQ_Spectrum.Transfer_Function(ref, resp, ai_SR, seg, 0.5, 'hann')
+                keep = numpy.flatnonzero( (freqs >= f_start) & (freqs <= f_stop) )
+            freqs, H, coh = freqs[keep], H[:, keep], coh[:, keep]
+
+            if loud:
+                print("%(v1)s excitation, %(v2)d frequencies from %(v3)0.1f to %(v4)0.1f (Hz), measured in %(v5)0.3f (s)"%{"v1":excitation, 
+                        "v2":len(freqs), "v3":freqs[0], "v4":freqs[-1], "v5":t_total})
+                for j in range(H.shape[0]):
+                    print("Response", j)
+                    for i in numpy.unique( numpy.linspace(0, len(freqs) - 1, 6).astype(int) ):
+                        print("f = %(v1)0.1f (Hz), |H| = %(v2)0.2f (dB), phase = %(v3)0.1f (deg), coherence = %(v4)0.3f"%{"v1":freqs[i], 
+                                "v2":20.0 * math.log10(max(abs(H[j, i]), 1.0e-12)), "v3":math.degrees(numpy.angle(H[j, i])), "v4":coh[j, i]})
+                print()
+
+            return [freqs, H, coh]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nao_chn_str must be a single AO channel'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nai_chn_str needs the reference and at least one response channel'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nexcitation must be multisine or chirp'
+            if c4 is False: ERR_STATEMENT = ERR_STATEMENT + '\nf_start, f_stop, duration or amplitude out of range, f_stop is limited to %(v1)0.1f (Hz)'%{"v1":f_stop}
+            if c5 is False: ERR_STATEMENT = ERR_STATEMENT + '\nmultisine needs n_periods >= 3'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def AO_Stream_Waveform(physical_channel_str = 'Dev2/ao0', device_name = 'Dev2', shape = 'sine', frequency = 10.0, amplitude = 1.0, phase = 0.0, pulsed = False, 
+                       chunk_size = None, n_buffered_chunks = 4, duration = 10.0, loud = False):
+    """
+    Stream a phase continuous waveform to a single AO channel using a non-regenerating CONTINUOUS task
+    Chunks are produced by Waveform_Stream and written from the driver's every-N-samples-transferred callback
+    so the frequency does not need to divide evenly into the buffer and the output can run for any length of time
+
+    Inputs
+    physical_channel_str(str) single AO channel, e.g. 'Dev2/ao0'
+    device_name(str) e.g. 'Dev2'
+    shape(str) one of 'sine', 'square', 'triangle'
+    frequency(float), amplitude(float), phase(float), pulsed(boolean) as for Generate_*_Waveform
+    chunk_size(int) no. of samples written per callback, None => 0.1 s of samples
+    n_buffered_chunks(int) no. of chunks held in the driver buffer, sets the latency available to each callback
+    duration(float) length of time to generate the output in units of second
+    loud(boolean) print a summary when the output is stopped
+
+    Output is a list [n_written, n_late]
+    n_written(int) total no. of samples written to the task
+    n_late(int) no. of callbacks that found less than one chunk of data queued ahead of the generation point
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".AO_Stream_Waveform()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if physical_channel_str != '' else False
+        c2 = True if device_name != '' else False
+        c3 = True if n_buffered_chunks > 1 else False
+        c4 = True if duration > 0 else False
+        c10 = c1 and c2 and c3 and c4
+
+        if c10:
+            ao_SR, ao_no_ch = Extract_Sample_Rate(physical_channel_str, device_name)
+            if chunk_size is None: chunk_size = max(1, int(ao_SR) // 10)
+
+            # stream is always generated in float64, which is what the stream writer expects
+            stream = Waveform_Stream(shape, ao_SR, chunk_size, frequency, amplitude, phase, pulsed)
+            if stream is None:
+                ERR_STATEMENT = ERR_STATEMENT + '\nwaveform parameters out of range, see Waveform_Stream'
+                raise Exception
+
+            ao_task = nidaqmx.Task()
+            ao_task.ao_channels.add_ao_voltage_chan(physical_channel_str, min_val = -10, max_val = +10)
+            ao_task.timing.cfg_samp_clk_timing(rate = ao_SR, sample_mode = nidaqmx.constants.AcquisitionType.CONTINUOUS, 
+                                               samps_per_chan = n_buffered_chunks * chunk_size)
+            # the driver must not replay old data, every sample is supplied by the stream
+            ao_task.out_stream.regen_mode = nidaqmx.constants.RegenerationMode.DONT_ALLOW_REGENERATION
+
+            writer = nidaqmx.stream_writers.AnalogSingleChannelWriter(ao_task.out_stream, auto_start = False)
+
+            counters = {'written':0, 'late':0}
+
+            def Write_Next_Chunk(task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+                # called by the driver each time chunk_size samples have been transferred out of the buffer
+                backlog = counters['written'] - ao_task.out_stream.total_samp_per_chan_generated
+                if backlog < chunk_size: counters['late'] += 1
+                counters['written'] += writer.write_many_sample(next(stream))
+                return 0
+
+            # prime the buffer before starting so the generation point never catches up with the write point
+            for i in range(0, n_buffered_chunks, 1):
+                counters['written'] += writer.write_many_sample(next(stream))
+
+            ao_task.register_every_n_samples_transferred_from_buffer_event(chunk_size, Write_Next_Chunk)
+
+            ao_task.start()
+            time.sleep(duration)
+            ao_task.stop()
+
+            ao_task.close()
+            stream.close()
+
+            # leave the output at zero, this needs an on-demand task since the streaming task has no data left to generate
+            with nidaqmx.Task() as zero_task:
+                zero_task.ao_channels.add_ao_voltage_chan(physical_channel_str, min_val = -10, max_val = +10)
+                zero_task.write(0.0)
+
+            if loud:
+                print("Samples written:", counters['written'])
+                print("Late callbacks:", counters['late'])
+                print()
+
+            return [counters['written'], counters['late']]
         else:
             if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in physical_channel_str'
             if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo data contained in device_name'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nn_buffered_chunks must be at least 2'
+            if c4 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration must be positive'
             raise Exception
     except Exception as e:
         print(ERR_STATEMENT)
@@ -0,0 +1,246 @@
+"""
+Decimating live plot for streamed AI data
+
+Each frame is decimated to the pixel width of the axes, with a min / max envelope or LTTB, and drawn by updating
+the existing line artists in place and blitting them over a cached background, so a 20 kS/s trace redraws in a few ms
+Rendering pulls the latest data from a source such as AI_Ring_Buffer.latest_volts, so it never runs on the acquisition thread
+
+18 - 10 - 2026
+"""
+
+# Usage
+# view = Live_Plot(4, 5000.0, window_time = 2.0)
+# view.update(block)                      draw one frame from a (n_channels, n_samples) block, non-blocking
+# view.run(ring.latest_volts, duration)   redraw at up to fps frames per second from a source until duration has elapsed
+# headless = True renders with the Agg canvas and no display, use it to benchmark frame rate against acquisition throughput
+
+# import required libraries
+import time
+import numpy
+
+MOD_NAME_STR = "NI_DAQ_Live_Plot"
+
+def Decimate_Min_Max(data, n_bins):
+    """
+    Indices of the min / max envelope of each channel of data
+
+    data is split into n_bins bins of equal length, the indices of the min and the max of every bin are kept in time order
+    so the decimated trace keeps every peak and glitch, a trailing partial bin is kept as one more bin
+
+    Inputs
+    data(numpy array) of shape (n_channels, n_samples)
+    n_bins(int) no. of bins, normally the pixel width of the axes
+
+    Output is an int array of shape (n_channels, n_kept), all of the indices when n_samples <= 2 * n_bins
+
+    18 - 10 - 2026
+    """
+
+    n_ch, n = data.shape
+    if n <= 2 * n_bins:
+        return numpy.tile( numpy.arange(n), (n_ch, 1) )
+
+    bin_len = n // n_bins
+    m = n_bins * bin_len
+    blocks = data[:, :m].reshape(n_ch, n_bins, bin_len)
+    offsets = numpy.arange(n_bins) * bin_len
+    i_min = numpy.argmin(blocks, axis = 2) + offsets
+    i_max = numpy.argmax(blocks, axis = 2) + offsets
+    if m < n:
+        i_min = numpy.hstack( [i_min, numpy.argmin(data[:, m:], axis = 1)[:, None] + m] )
+        i_max = numpy.hstack( [i_max, numpy.argmax(data[:, m:], axis = 1)[:, None] + m] )
+
+    idx = numpy.empty( (n_ch, 2 * i_min.shape[1]), dtype = numpy.intp )
+    idx[:, 0::2] = numpy.minimum(i_min, i_max)
+    idx[:, 1::2] = numpy.maximum(i_min, i_max)
+    return idx
+
+def Decimate_LTTB(y, n_out, x = None):
+    """
+    Indices of the points of y kept by Largest-Triangle-Three-Buckets decimation
+
+    LTTB keeps the visual shape of a trace better than min / max for smooth signals at the same no. of points,
+    it costs one vectorised pass per output bucket
+
+    Inputs
+    y(numpy array) 1D samples
+    n_out(int) no. of points to keep
+    x(numpy array) optional sample times, None => uniform sampling
+
+    Output is an int array of n_out indices, all of the indices when len(y) <= n_out
+
+    18 - 10 - 2026
+    """
+
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return numpy.arange(n)
+    if x is None:
+        x = numpy.arange(n, dtype = numpy.float64)
+
+    idx = numpy.empty(n_out, dtype = numpy.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+    edges = numpy.floor( numpy.linspace(1, n - 1, n_out - 1) ).astype(numpy.intp) # n_out - 2 buckets between the end points
+
+    # average of every bucket in one pass, the last point stands in for the bucket after the final one
+    counts = numpy.diff( numpy.append(edges, n - 1) )
+    avg_x = numpy.append( numpy.add.reduceat(x[:n - 1], edges[:-1]) / counts[:-1], x[n - 1] )
+    avg_y = numpy.append( numpy.add.reduceat(y[:n - 1], edges[:-1]) / counts[:-1], y[n - 1] )
+
+    a = 0
+    for i in range(0, n_out - 2, 1):
+        lo, hi = edges[i], edges[i + 1]
+        xa = x[a]
+        ya = y[a]
+        area = numpy.fabs( (xa - avg_x[i + 1]) * (y[lo:hi] - ya) - (xa - x[lo:hi]) * (avg_y[i + 1] - ya) )
+        a = lo + int( area.argmax() )
+        idx[i + 1] = a
+
+    return idx
+
+class Live_Plot:
+    """
+    Live view of n_channels channels sampled at sample_rate, showing the latest window_time seconds
+
+    Inputs
+    n_channels(int), sample_rate(float) in units of Hz, window_time(float) in units of second
+    method(str) 'minmax' or 'lttb'
+    width_px(int) no. of points per channel after decimation is about 2 * width_px for minmax, width_px for lttb
+    headless(boolean) render to an Agg canvas without a display
+    channel_names(list of str) legend entries, None => no legend
+    fps(float) max frame rate of run()
+
+    stats(dict) with keys frames, render_time, max_render_time, decimate_time, all times in units of second
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_channels, sample_rate, window_time = 2.0, method = 'minmax', width_px = 1000, headless = False,
+                 channel_names = None, fps = 30.0, ylim = (-10.0, 10.0)):
+        if method not in ('minmax', 'lttb'):
+            raise ValueError('method must be minmax or lttb')
+        self.n_channels = n_channels
+        self.sample_rate = float(sample_rate)
+        self.window_time = window_time
+        self.method = method
+        self.width_px = width_px
+        self.headless = headless
+        self.fps = fps
+        self.stats = {'frames':0, 'render_time':0.0, 'max_render_time':0.0, 'decimate_time':0.0}
+
+        if headless:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.fig = Figure(figsize = (width_px / 100.0, 4.0), dpi = 100)
+            FigureCanvasAgg(self.fig)
+        else:
+            import matplotlib.pyplot as plot
+            plot.ion()
+            self.fig = plot.figure(figsize = (width_px / 100.0, 4.0), dpi = 100)
+        self.ax = self.fig.add_subplot(1, 1, 1)
+        self.ax.set_xlim(-window_time, 0.0)
+        self.ax.set_ylim(*ylim)
+        self.ax.set_xlabel('Time (s)')
+        self.ax.set_ylabel('Voltage (V)')
+        self.ax.grid(True)
+        self.lines = [ self.ax.plot([], [], animated = True, lw = 1, antialiased = False, label = None if channel_names is None else channel_names[i])[0]
+                      for i in range(n_channels) ]
+        if channel_names is not None: self.ax.legend(loc = 'upper left')
+
+        if not headless:
+            self.fig.show()
+        self.background = None
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.fig.canvas.draw()
+
+    def _on_draw(self, event):
+        # the background is re-captured after every full redraw, e.g. when the window is resized
+        self.background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+
+    def decimate(self, data):
+        """
+        Output is a list of index arrays, one per channel, selecting the points to draw
+        """
+        if self.method == 'minmax':
+            return list( Decimate_Min_Max(data, self.width_px) )
+        return [ Decimate_LTTB(data[i], self.width_px) for i in range(data.shape[0]) ]
+
+    def update(self, data, x = None):
+        """
+        draw one frame showing data, shape (n_channels, n_samples) or (n_samples,) for one channel
+
+        x(array) optional time of each sample, None => the last sample is drawn at t = 0 and earlier samples at negative times
+        When x is given the x-axis follows it, so successive blocks scroll
+        """
+        t_frame = time.perf_counter()
+        data = numpy.atleast_2d(data)
+        n = data.shape[1]
+
+        idx = self.decimate(data)
+        t_dec = time.perf_counter()
+
+        for line, row, keep in zip(self.lines, data, idx):
+            if x is None:
+                line.set_data( (keep - (n - 1)) / self.sample_rate, row[keep] )
+            else:
+                line.set_data( numpy.asarray(x[keep]), row[keep] )
+
+        canvas = self.fig.canvas
+        if x is not None and n > 0:
+            x_lo, x_hi = float(x[0]), float(x[n - 1])
+            if (x_lo, x_hi) != tuple(self.ax.get_xlim()) and x_hi > x_lo:
+                self.ax.set_xlim(x_lo, x_hi)
+                canvas.draw() # axis change, full redraw re-captures the background
+
+        if self.background is None: canvas.draw()
+        canvas.restore_region(self.background)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+        canvas.blit(self.ax.bbox)
+        if not self.headless: canvas.flush_events()
+
+        dt = time.perf_counter() - t_frame
+        self.stats['frames'] += 1
+        self.stats['render_time'] += dt
+        self.stats['decimate_time'] += t_dec - t_frame
+        if dt > self.stats['max_render_time']: self.stats['max_render_time'] = dt
+
+    def run(self, source, duration = 10.0, stop_event = None):
+        """
+        redraw from source() at up to fps frames per second for duration seconds, or until stop_event is set
+        source(function) returns the latest (n_channels, n_samples) data, e.g. ring.latest_volts
+        must be called from the thread that owns the figure, normally the main thread
+        """
+        n_window = max(2, int(self.window_time * self.sample_rate))
+        frame_time = 1.0 / self.fps
+        t_end = time.perf_counter() + duration
+        while time.perf_counter() < t_end and ( stop_event is None or not stop_event.is_set() ):
+            t_next = time.perf_counter() + frame_time
+            data = source(n_window)
+            if data.shape[-1] > 1: self.update(data)
+            wait = t_next - time.perf_counter()
+            if wait > 0: time.sleep(wait)
+
+    def show(self):
+        """
+        block until the window is closed, does nothing when headless
+        """
+        if not self.headless:
+            import matplotlib.pyplot as plot
+            plot.ioff()
+            for line in self.lines:
+                line.set_animated(False)
+            self.fig.canvas.draw()
+            plot.show()
+
+    def close(self):
+        if not self.headless:
+            import matplotlib.pyplot as plot
+            plot.close(self.fig)
+
+    def frame_rate(self):
+        """
+        mean frames per second the renderer could sustain, from the time spent inside update
+        """
+        return self.stats['frames'] / self.stats['render_time'] if self.stats['render_time'] > 0 else 0.0
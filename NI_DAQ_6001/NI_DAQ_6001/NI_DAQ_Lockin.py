@@ -0,0 +1,108 @@
+"""
+Digital lock-in demodulation of streamed AI blocks
+
+Each block is mixed with a phase continuous numerically controlled oscillator at every reference frequency, all channels
+and references in one broadcast multiply, then low-pass filtered and decimated by a sinc^order FIR_Decimator
+X, Y, R and theta are produced at the output rate, which is typically a few Hz to a few hundred Hz
+
+18 - 10 - 2026
+"""
+
+# Usage
+# lia = Lock_In(10000.0, 2, frequencies = [137.0, 211.0], out_rate = 10.0)
+# out = lia.process(block)    (n_channels, n) block, out['X'] etc. have shape (n_references, n_channels, n_out)
+
+# Conventions
+# the reference is sin(2 pi f t + phase), the same form as Generate_Sine_Waveform, t = sample no. / sample_rate from the first sample
+# an input R sin(2 pi f t + phase + theta) gives X = R cos(theta), Y = R sin(theta), so R is the peak amplitude and theta the phase lead
+# The AO and AI clocks do not start together, so theta contains a fixed offset, measure it on the ai0 loopback of the AO drive
+# and subtract it, or take phases relative to the loopback channel
+
+# The NCO keeps its phase in cycles modulo 1 and advances it by f / sample_rate per sample, so there is no phase jump between blocks
+# and no loss of precision however long the demodulator runs
+
+# import required libraries
+import numpy
+import NI_DAQ_Timing
+import NI_DAQ_Decimate
+
+MOD_NAME_STR = "NI_DAQ_Lockin"
+
+class Lock_In:
+    """
+    Multi-channel, multi-reference lock-in amplifier
+
+    Inputs
+    sample_rate(float) per channel in units of Hz
+    n_channels(int) no. of input channels
+    frequencies(list of float) reference frequencies in units of Hz
+    phases(list of float) reference phases in units of radian, None => zero
+    out_rate(float) output rate in units of Hz, the decimation ratio is round(sample_rate / out_rate)
+    order(int) no. of cascaded moving averages in the low-pass filter, see NI_DAQ_Decimate.Boxcar_Kernel
+    the filter has nulls at every multiple of the output rate, so choose out_rate to divide 2 f to remove the 2f ripple exactly
+
+    Attributes
+    ratio(int) decimation ratio, out_rate(float) actual output rate
+    time_constant(float) equivalent noise bandwidth time constant 1 / (4 ENBW) in units of second
+    delay(float) filter delay in units of second, output m describes the input around m / out_rate - delay
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, sample_rate, n_channels, frequencies, phases = None, out_rate = 10.0, order = 4):
+        frequencies = numpy.atleast_1d( numpy.asarray(frequencies, dtype = numpy.float64) )
+        if numpy.any(frequencies <= 0) or numpy.any(frequencies >= 0.5 * sample_rate):
+            raise ValueError('reference frequencies must be in (0, sample_rate / 2)')
+        if out_rate <= 0 or out_rate > sample_rate:
+            raise ValueError('out_rate must be in (0, sample_rate]')
+        self.sample_rate = float(sample_rate)
+        self.n_channels = n_channels
+        self.frequencies = frequencies
+        self.phases = numpy.zeros(len(frequencies)) if phases is None else numpy.asarray(phases, dtype = numpy.float64)
+        self.ratio = max(1, int(round(sample_rate / out_rate)))
+        self.out_rate = self.sample_rate / self.ratio
+
+        h = NI_DAQ_Decimate.Boxcar_Kernel(self.ratio, order)
+        self.filter = NI_DAQ_Decimate.FIR_Decimator(h, self.ratio)
+        self.delay = self.filter.delay / self.sample_rate
+        self.time_constant = 0.25 / ( self.sample_rate * numpy.sum(h * h) )
+        self.step = self.frequencies / self.sample_rate # NCO increment in cycles per sample
+        self.reset()
+
+    def reset(self):
+        self.filter.reset()
+        self.cycles = numpy.mod(self.phases / (2.0 * numpy.pi), 1.0) # NCO phase in cycles at the next sample
+        self.n_in = 0
+
+    def reference(self, n):
+        """
+        Output is the complex NCO, (n_references, n), sin(psi) + j cos(psi) for the next n samples, the NCO is advanced by n samples
+        """
+        psi = numpy.arange(n, dtype = numpy.float64) * self.step[:, None]
+        psi += self.cycles[:, None]
+        psi *= 2.0 * numpy.pi
+        self.cycles = numpy.mod(self.cycles + n * self.step, 1.0)
+        ref = numpy.empty(psi.shape, dtype = numpy.complex128)
+        numpy.sin(psi, out = ref.real)
+        numpy.cos(psi, out = ref.imag)
+        return ref
+
+    def process(self, block):
+        """
+        demodulate a (n_channels, n) block, or (n,) for one channel
+
+        Output is a dict with keys X, Y, R, theta, each (n_references, n_channels, n_out), and time_axis,
+        the time of each output in units of second from the first input sample
+        """
+        block = numpy.asarray(block, dtype = numpy.float64).reshape(self.n_channels, -1)
+        n = block.shape[1]
+        ref = self.reference(n)
+
+        # (n_references, n_channels, n) mixer output, filtered along the last axis
+        mixed = ref[:, None, :] * block[None, :, :]
+        first = self.filter.n_out
+        z = 2.0 * self.filter.process(mixed)
+        self.n_in += n
+
+        time_axis = NI_DAQ_Timing.Time_Axis(first / self.out_rate, 1.0 / self.out_rate, z.shape[-1])
+        return {'X':z.real, 'Y':z.imag, 'R':numpy.abs(z), 'theta':numpy.angle(z), 'time_axis':time_axis}
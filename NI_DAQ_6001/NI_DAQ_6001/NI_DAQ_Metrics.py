@@ -0,0 +1,492 @@
+"""
+Opt-in instrumentation of the driver calls made by NI_DAQ_Lib
+
+Records a latency histogram for each operation type, samples transferred, effective sample rate
+and buffer backlog / overflow / underflow counters, snapshots can be exported as JSON or Prometheus text
+
+18 - 10 - 2026
+"""
+
+# Usage
+# NI_DAQ_Lib.Instrumentation(True) wraps the active backend, nidaqmx or NI_DAQ_Sim, in an Instrumented_Backend
+# every routine in NI_DAQ_Lib is then measured without modification, NI_DAQ_Lib.Instrumentation(False) removes the wrapper
+# When instrumentation is disabled the library talks to the backend directly, so the only remaining cost is
+# the Span() calls around post-processing, each of which returns a shared no-op context
+
+# Operation names
+# task_create, channel_add, timing, commit (control), start, stop, close, wait, done (is_task_done)
+# read, write for task.read / task.write, stream_read, stream_write for the stream readers / writers, stream_read_raw for read_int16
+# callback for the time spent inside every-N-samples callbacks, any name passed to Span() for post-processing
+
+# import required libraries
+import json
+import time
+import bisect
+import threading
+import contextlib
+
+MOD_NAME_STR = "NI_DAQ_Metrics"
+
+# Histogram bucket upper edges in units of second, four per decade from 1 us to 100 s
+BUCKET_EDGES = [ 10.0**(k / 4.0) for k in range(-24, 9, 1) ]
+
+# NI-DAQmx status codes counted as buffer overflow on input and underflow on output
+OVERFLOW_CODES = frozenset( [-200279, -200361, -200621] )
+UNDERFLOW_CODES = frozenset( [-200290, -200016, -200018] )
+
+ENABLED = False
+TRACK_BACKLOG = True
+METRICS_LOCK = threading.Lock()
+METRICS_OPS = {}
+METRICS_COUNTERS = {'errors':0, 'overflow':0, 'underflow':0, 'backlog_last':0, 'backlog_max':0, 'backlog_fraction_max':0.0}
+METRICS_START = [time.time()]
+
+NULL_SPAN = contextlib.nullcontext()
+
+class Op_Stats:
+    """
+    Latency histogram and sample counters for one operation type
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES) + 1) # final bucket is +Inf
+        self.n = 0
+        self.errors = 0
+        self.total = 0.0
+        self.t_min = float('inf')
+        self.t_max = 0.0
+        self.samples = 0
+        self.t_first = None # start of the first call, end of the last call, for the effective rate
+        self.t_last = None
+
+    def record(self, t_call, dt, samples = 0, error = False):
+        self.counts[ bisect.bisect_left(BUCKET_EDGES, dt) ] += 1
+        self.n += 1
+        self.total += dt
+        if dt < self.t_min: self.t_min = dt
+        if dt > self.t_max: self.t_max = dt
+        if error: self.errors += 1
+        if samples:
+            self.samples += samples
+            if self.t_first is None: self.t_first = t_call
+            self.t_last = t_call + dt
+
+    def percentile(self, q):
+        """
+        estimate of the q-th percentile, 0 < q <= 100, as the upper edge of the bucket in which it falls
+        """
+
+        if self.n == 0: return 0.0
+        target = q * self.n / 100.0
+        running = 0
+        for i, c in enumerate(self.counts):
+            running += c
+            if running >= target:
+                return min(BUCKET_EDGES[i], self.t_max) if i < len(BUCKET_EDGES) else self.t_max
+        return self.t_max
+
+    def summary(self):
+        span = (self.t_last - self.t_first) if self.t_first is not None else 0.0
+        return {'count':self.n, 'errors':self.errors, 'total':self.total, 'mean':self.total / self.n if self.n > 0 else 0.0,
+                'min':self.t_min if self.n > 0 else 0.0, 'max':self.t_max, 'p50':self.percentile(50), 'p90':self.percentile(90), 'p99':self.percentile(99),
+                'samples':self.samples, 'call_rate':self.samples / self.total if self.total > 0 and self.samples > 0 else 0.0,
+                'effective_rate':self.samples / span if span > 0 else 0.0, 'buckets':list(self.counts)}
+
+def Enable(backlog = True):
+    """
+    Start recording, backlog = True => query the AI backlog after every read, one extra driver call per read
+
+    18 - 10 - 2026
+    """
+
+    global ENABLED, TRACK_BACKLOG
+    TRACK_BACKLOG = backlog
+    ENABLED = True
+
+def Disable():
+    global ENABLED
+    ENABLED = False
+
+def Reset():
+    """
+    Clear every histogram and counter
+
+    18 - 10 - 2026
+    """
+
+    with METRICS_LOCK:
+        METRICS_OPS.clear()
+        for key in METRICS_COUNTERS: METRICS_COUNTERS[key] = 0
+        METRICS_COUNTERS['backlog_fraction_max'] = 0.0
+        METRICS_START[0] = time.time()
+
+def Record(op, t_call, dt, samples = 0, exc = None):
+    """
+    Add one call of operation op, started at t_call and lasting dt seconds, to the metrics
+    exc(Exception) the exception raised by the call, if any, DaqError codes are sorted into overflow / underflow
+
+    18 - 10 - 2026
+    """
+
+    with METRICS_LOCK:
+        stats = METRICS_OPS.get(op)
+        if stats is None:
+            stats = METRICS_OPS[op] = Op_Stats()
+        stats.record(t_call, dt, samples, exc is not None)
+        if exc is not None:
+            METRICS_COUNTERS['errors'] += 1
+            code = getattr(exc, 'error_code', None)
+            if code in OVERFLOW_CODES: METRICS_COUNTERS['overflow'] += 1
+            elif code in UNDERFLOW_CODES: METRICS_COUNTERS['underflow'] += 1
+
+def Record_Backlog(in_stream):
+    """
+    Sample the no. of acquired but unread samples per channel left in the driver buffer
+
+    18 - 10 - 2026
+    """
+
+    try:
+        backlog = in_stream.avail_samp_per_chan
+        buf_size = in_stream.input_buf_size
+    except Exception:
+        return
+    with METRICS_LOCK:
+        METRICS_COUNTERS['backlog_last'] = backlog
+        if backlog > METRICS_COUNTERS['backlog_max']: METRICS_COUNTERS['backlog_max'] = backlog
+        if buf_size > 0 and backlog / float(buf_size) > METRICS_COUNTERS['backlog_fraction_max']:
+            METRICS_COUNTERS['backlog_fraction_max'] = backlog / float(buf_size)
+
+class _Span:
+
+    def __init__(self, op):
+        self.op = op
+
+    def __enter__(self):
+        self.t_call = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Record(self.op, self.t_call, time.perf_counter() - self.t_call, 0, exc_value)
+        return False
+
+def Span(op):
+    """
+    Context manager timing a block of Python code, e.g. post-processing, under the operation name op
+    Returns a shared no-op context when instrumentation is disabled
+
+    18 - 10 - 2026
+    """
+
+    return _Span(op) if ENABLED else NULL_SPAN
+
+def Count_Samples(data):
+    """
+    Total no. of samples, over all channels, in the value returned by task.read or passed to task.write
+
+    18 - 10 - 2026
+    """
+
+    if hasattr(data, 'size'): return int(data.size)
+    if isinstance(data, (list, tuple)):
+        if len(data) > 0 and isinstance(data[0], (list, tuple)):
+            return sum( [ len(row) for row in data ] )
+        return len(data)
+    return 1
+
+def Timed_Call(op, func, args, kwargs, samples = None):
+    """
+    Call func(*args, **kwargs) and record it under op
+    samples(function) optional, maps the return value onto the no. of samples transferred
+
+    18 - 10 - 2026
+    """
+
+    if not ENABLED: return func(*args, **kwargs)
+
+    t_call = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        Record(op, t_call, time.perf_counter() - t_call, 0, e)
+        raise
+    dt = time.perf_counter() - t_call
+    Record(op, t_call, dt, samples(result) if samples is not None else 0)
+    return result
+
+class _Timed_Proxy:
+    """
+    Pass every attribute through to target, except the methods named in ops which are timed under the given op
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, target, ops):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_ops', ops)
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        op = self._ops.get(name)
+        if op is None: return attr
+        return lambda *args, **kwargs: Timed_Call(op, attr, args, kwargs)
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __iter__(self):
+        return iter(self._target)
+
+class Instrumented_Task:
+    """
+    Wrapper around a backend Task that times every driver call and counts samples read and written
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, task):
+        object.__setattr__(self, '_task', task)
+        object.__setattr__(self, 'ai_channels', _Timed_Proxy(task.ai_channels, {'add_ai_voltage_chan':'channel_add'}))
+        object.__setattr__(self, 'ao_channels', _Timed_Proxy(task.ao_channels, {'add_ao_voltage_chan':'channel_add'}))
+        object.__setattr__(self, 'timing', _Timed_Proxy(task.timing, {'cfg_samp_clk_timing':'timing'}))
+
+    def __getattr__(self, name):
+        return getattr(self._task, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._task, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def start(self):
+        return Timed_Call('start', self._task.start, (), {})
+
+    def stop(self):
+        return Timed_Call('stop', self._task.stop, (), {})
+
+    def close(self):
+        return Timed_Call('close', self._task.close, (), {})
+
+    def control(self, action):
+        return Timed_Call('commit', self._task.control, (action,), {})
+
+    def wait_until_done(self, *args, **kwargs):
+        return Timed_Call('wait', self._task.wait_until_done, args, kwargs)
+
+    def is_task_done(self):
+        return Timed_Call('done', self._task.is_task_done, (), {})
+
+    def read(self, *args, **kwargs):
+        data = Timed_Call('read', self._task.read, args, kwargs, Count_Samples)
+        if ENABLED and TRACK_BACKLOG: Record_Backlog(self._task.in_stream)
+        return data
+
+    def write(self, data, *args, **kwargs):
+        n_samples = Count_Samples(data) if ENABLED else 0
+        return Timed_Call('write', self._task.write, (data,) + args, kwargs, lambda result: n_samples)
+
+    def register_every_n_samples_acquired_into_buffer_event(self, sample_interval, callback_method):
+        return self._task.register_every_n_samples_acquired_into_buffer_event(sample_interval, Timed_Callback(callback_method))
+
+    def register_every_n_samples_transferred_from_buffer_event(self, sample_interval, callback_method):
+        return self._task.register_every_n_samples_transferred_from_buffer_event(sample_interval, Timed_Callback(callback_method))
+
+def Timed_Callback(callback_method):
+    """
+    Wrap an every-N-samples callback so the time spent inside it is recorded under callback
+    callback_method = None unregisters the event and is passed through unchanged
+
+    18 - 10 - 2026
+    """
+
+    if callback_method is None: return None
+
+    def Callback(task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+        return Timed_Call('callback', callback_method, (task_handle, every_n_samples_event_type, number_of_samples, callback_data), {})
+
+    return Callback
+
+class _Timed_Reader:
+
+    def __init__(self, reader, in_stream):
+        self._reader = reader
+        self._in_stream = in_stream
+
+    def __getattr__(self, name):
+        return getattr(self._reader, name)
+
+    def read_many_sample(self, data, *args, **kwargs):
+        rows = data.shape[0] if data.ndim == 2 else 1
+        n = Timed_Call('stream_read', self._reader.read_many_sample, (data,) + args, kwargs, lambda result: rows * result)
+        if ENABLED and TRACK_BACKLOG: Record_Backlog(self._in_stream)
+        return n
+
+    def read_one_sample(self, *args, **kwargs):
+        return Timed_Call('stream_read', self._reader.read_one_sample, args, kwargs, lambda result: 1)
+
+    def read_int16(self, data, *args, **kwargs):
+        rows = data.shape[0] if data.ndim == 2 else 1
+        n = Timed_Call('stream_read_raw', self._reader.read_int16, (data,) + args, kwargs, lambda result: rows * result)
+        if ENABLED and TRACK_BACKLOG: Record_Backlog(self._in_stream)
+        return n
+
+class _Timed_Writer:
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def __getattr__(self, name):
+        return getattr(self._writer, name)
+
+    def write_many_sample(self, data, *args, **kwargs):
+        rows = data.shape[0] if getattr(data, 'ndim', 1) == 2 else 1
+        return Timed_Call('stream_write', self._writer.write_many_sample, (data,) + args, kwargs, lambda result: rows * result)
+
+    def write_one_sample(self, *args, **kwargs):
+        return Timed_Call('stream_write', self._writer.write_one_sample, args, kwargs, lambda result: 1)
+
+class _Stream_Namespace:
+    """
+    Mirror of nidaqmx.stream_readers / nidaqmx.stream_writers whose classes return timed readers / writers
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, namespace, reading):
+        self._namespace = namespace
+        self._reading = reading
+
+    def __getattr__(self, name):
+        cls = getattr(self._namespace, name)
+        if self._reading:
+            return lambda task_in_stream, *args, **kwargs: _Timed_Reader(cls(task_in_stream, *args, **kwargs), task_in_stream)
+        return lambda task_out_stream, *args, **kwargs: _Timed_Writer(cls(task_out_stream, *args, **kwargs))
+
+class Instrumented_Backend:
+    """
+    Stand-in for the nidaqmx module that hands out Instrumented_Task objects
+    Everything other than Task, stream_readers and stream_writers is taken from the wrapped backend
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stream_readers = _Stream_Namespace(backend.stream_readers, True)
+        self.stream_writers = _Stream_Namespace(backend.stream_writers, False)
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def Task(self, *args, **kwargs):
+        return Instrumented_Task( Timed_Call('task_create', self.backend.Task, args, kwargs) )
+
+def Snapshot():
+    """
+    Return the current metrics as a dict with keys start, elapsed, enabled, bucket_edges, ops, counters
+    ops maps each operation name onto a dict with keys count, errors, total, mean, min, max, p50, p90, p99,
+    samples, call_rate, effective_rate, buckets, times in units of second and rates in samples per second
+
+    18 - 10 - 2026
+    """
+
+    with METRICS_LOCK:
+        ops = dict( [ (op, stats.summary()) for op, stats in METRICS_OPS.items() ] )
+        counters = dict(METRICS_COUNTERS)
+        start = METRICS_START[0]
+
+    return {'start':start, 'elapsed':time.time() - start, 'enabled':ENABLED, 'bucket_edges':list(BUCKET_EDGES), 'ops':ops, 'counters':counters}
+
+def Export_JSON(file_path = None):
+    """
+    Snapshot as a JSON string, also written to file_path if given
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Export_JSON()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        text = json.dumps(Snapshot(), indent = 2)
+        if file_path is not None:
+            with open(file_path, 'w') as f:
+                f.write(text)
+        return text
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Export_Prometheus(file_path = None, prefix = 'nidaq'):
+    """
+    Snapshot in the Prometheus text exposition format, also written to file_path if given
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Export_Prometheus()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        snap = Snapshot()
+        lines = []
+
+        lines.append('# HELP %(p)s_op_latency_seconds Latency of each DAQ operation'%{'p':prefix})
+        lines.append('# TYPE %(p)s_op_latency_seconds histogram'%{'p':prefix})
+        for op in sorted(snap['ops']):
+            entry = snap['ops'][op]
+            running = 0
+            for i, c in enumerate(entry['buckets']):
+                running += c
+                le = '%g'%(BUCKET_EDGES[i]) if i < len(BUCKET_EDGES) else '+Inf'
+                lines.append('%(p)s_op_latency_seconds_bucket{op="%(op)s",le="%(le)s"} %(n)d'%{'p':prefix, 'op':op, 'le':le, 'n':running})
+            lines.append('%(p)s_op_latency_seconds_sum{op="%(op)s"} %(v)r'%{'p':prefix, 'op':op, 'v':entry['total']})
+            lines.append('%(p)s_op_latency_seconds_count{op="%(op)s"} %(n)d'%{'p':prefix, 'op':op, 'n':entry['count']})
+
+        for name, key, kind, help_str in (('op_errors_total', 'errors', 'counter', 'Exceptions raised by each DAQ operation'),
+                                          ('op_samples_total', 'samples', 'counter', 'Samples transferred by each DAQ operation'),
+                                          ('op_effective_rate', 'effective_rate', 'gauge', 'Samples per second between the first and last transfer')):
+            lines.append('# HELP %(p)s_%(n)s %(h)s'%{'p':prefix, 'n':name, 'h':help_str})
+            lines.append('# TYPE %(p)s_%(n)s %(k)s'%{'p':prefix, 'n':name, 'k':kind})
+            for op in sorted(snap['ops']):
+                lines.append('%(p)s_%(n)s{op="%(op)s"} %(v)r'%{'p':prefix, 'n':name, 'op':op, 'v':snap['ops'][op][key]})
+
+        for key, kind in (('errors', 'counter'), ('overflow', 'counter'), ('underflow', 'counter'),
+                          ('backlog_last', 'gauge'), ('backlog_max', 'gauge'), ('backlog_fraction_max', 'gauge')):
+            name = key + '_total' if kind == 'counter' else key
+            lines.append('# TYPE %(p)s_%(n)s %(k)s'%{'p':prefix, 'n':name, 'k':kind})
+            lines.append('%(p)s_%(n)s %(v)r'%{'p':prefix, 'n':name, 'v':snap['counters'][key]})
+
+        text = '\n'.join(lines) + '\n'
+        if file_path is not None:
+            with open(file_path, 'w') as f:
+                f.write(text)
+        return text
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
+
+def Report():
+    """
+    Print a one line summary of each operation and the buffer counters
+
+    18 - 10 - 2026
+    """
+
+    snap = Snapshot()
+    for op in sorted(snap['ops']):
+        entry = snap['ops'][op]
+        print("%(v1)-16s n: %(v2)6d, mean: %(v3)9.3f (ms), p50: %(v4)9.3f (ms), p99: %(v5)9.3f (ms), max: %(v6)9.3f (ms), errors: %(v7)d, rate: %(v8)0.1f (S/s)"%{
+                "v1":op, "v2":entry['count'], "v3":1000.0 * entry['mean'], "v4":1000.0 * entry['p50'], "v5":1000.0 * entry['p99'],
+                "v6":1000.0 * entry['max'], "v7":entry['errors'], "v8":entry['effective_rate']})
+    print("errors: %(errors)d, overflow: %(overflow)d, underflow: %(underflow)d, backlog max: %(backlog_max)d, backlog fraction max: %(backlog_fraction_max)0.3f"%snap['counters'])
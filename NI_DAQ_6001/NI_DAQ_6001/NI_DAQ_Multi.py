@@ -0,0 +1,277 @@
+"""
+Concurrent acquisition from several NI-DAQ devices with a time-aligned merged output
+
+Each device runs a CONTINUOUS AI task on its own worker thread, every block is timestamped on arrival with the host
+monotonic clock (time.perf_counter). A least-squares fit of arrival time against sample index gives each device's
+actual sample period in host seconds, which absorbs the timebase error of the device. The streams are then
+resampled by linear interpolation onto one common time grid and merged into a single multi-channel output.
+
+18 - 10 - 2026
+"""
+
+# Usage
+# data, time_axis, stats = Multi_Device_Acquire([('Dev1/ai0:1', 'Dev1'), ('Dev2/ai0:1', 'Dev2')], duration = 10.0, loud = True)
+# data has one row per channel, in the order the devices are listed, time_axis is an NI_DAQ_Timing.Time_Axis in units of
+# second from the start of the merged output, stats holds the per-device sample rate and drift estimates
+# For hardware-free testing add simulated devices with different timebase errors, e.g.
+# NI_DAQ_Sim.Add_Device('Dev1', drift_ppm = 50.0), NI_DAQ_Sim.Add_Device('Dev2', drift_ppm = -30.0), NI_DAQ_Lib.Use_Backend(NI_DAQ_Sim)
+
+# The USB-6001 has no shared timebase or trigger lines, so alignment is limited by the latency of the USB transfers
+# Latency only ever delays an arrival, so after a first least-squares fit the clock is refitted to the blocks that arrived
+# earliest relative to it, this lower envelope is far less biased by scheduling hiccups than a plain fit
+# The remaining common offset between devices is the difference of their minimum transfer latencies
+
+# import required libraries
+import math
+import time
+import numpy
+import threading
+import NI_DAQ_Lib
+import NI_DAQ_Timing
+
+MOD_NAME_STR = "NI_DAQ_Multi"
+
+FIT_BLOCKS = 1000 # the clock of each device is fitted to the arrival times of at most this many of its latest blocks
+FIT_PASSES = 2 # no. of refits to the blocks at or below the median residual
+
+class Device_Worker:
+    """
+    Acquire one device on a worker thread and keep the samples not yet merged
+
+    Inputs
+    physical_channel_str(str) AI channels on this device, differential read is assumed
+    device_name(str) e.g. 'Dev2'
+    block_time(float) length of each read in units of second
+    t_ref(float) time.perf_counter() value used as the origin of the fit
+
+    Attributes
+    buffer(numpy array) (n_channels, n) samples not yet merged, buffer[:, 0] is sample no. buf_start
+    n_acquired(int) total no. of samples per channel read
+    arrivals(list) of (k, t) pairs, sample no. k of the last sample of each block and its arrival time t
+    stats(dict) with keys blocks, errors, samples
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, physical_channel_str, device_name, block_time, t_ref):
+        self.physical_channel_str = physical_channel_str
+        self.device_name = device_name
+        self.spec = NI_DAQ_Lib.Parse_Channel_Spec(physical_channel_str)
+        self.sample_rate, self.n_channels = NI_DAQ_Lib.Extract_Sample_Rate(self.spec, device_name)
+        self.block_size = max(1, int(self.sample_rate * block_time))
+        self.t_ref = t_ref
+
+        self.lock = threading.Lock()
+        self.buffer = numpy.zeros( (self.n_channels, 0), dtype = numpy.float64 )
+        self.buf_start = 0
+        self.n_acquired = 0
+        self.arrivals = []
+        self.fit = None # [a, b, no. of arrivals fitted]
+        self.stats = {'blocks':0, 'errors':0, 'samples':0}
+
+        self.ready = threading.Event()
+        self.go = None
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target = self._run, name = 'Device_Worker ' + device_name, daemon = True)
+
+    def _run(self):
+        try:
+            with NI_DAQ_Lib.nidaqmx.Task() as ai_task:
+                ai_task.ai_channels.add_ai_voltage_chan(self.physical_channel_str,
+                                                        terminal_config = NI_DAQ_Lib.nidaqmx.constants.TerminalConfiguration.DIFF,
+                                                        min_val = -10, max_val = +10)
+                ai_task.timing.cfg_samp_clk_timing(self.sample_rate, sample_mode = NI_DAQ_Lib.nidaqmx.constants.AcquisitionType.CONTINUOUS,
+                                                   samps_per_chan = 8 * self.block_size, active_edge = NI_DAQ_Lib.nidaqmx.constants.Edge.RISING)
+                ai_task.control(NI_DAQ_Lib.nidaqmx.constants.TaskMode.TASK_COMMIT)
+                reader = NI_DAQ_Lib.nidaqmx.stream_readers.AnalogMultiChannelReader(ai_task.in_stream)
+                block = numpy.zeros( (self.n_channels, self.block_size), dtype = numpy.float64 )
+
+                # wait until every device is committed so that the start calls are as close together as possible
+                self.ready.set()
+                self.go.wait()
+                ai_task.start()
+
+                while not self.stop_event.is_set():
+                    reader.read_many_sample(block, number_of_samples_per_channel = self.block_size, timeout = 10.0)
+                    t_arrival = time.perf_counter() - self.t_ref
+                    with self.lock:
+                        self.buffer = numpy.hstack( [self.buffer, block] )
+                        self.n_acquired += self.block_size
+                        self.arrivals.append( (self.n_acquired - 1, t_arrival) ) # arrival of the block is the arrival of its last sample
+                        if len(self.arrivals) > FIT_BLOCKS: del self.arrivals[0]
+                        self.stats['blocks'] += 1
+                        self.stats['samples'] += self.block_size
+
+                ai_task.stop()
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.error = e
+            self.ready.set()
+
+    def clock(self):
+        """
+        Output is [a, b], the host time of sample k is a + b * k, in units of second from t_ref
+        Until three blocks have arrived b is the nominal sample period
+        """
+        with self.lock:
+            n_fit = self.stats['blocks']
+            if self.fit is not None and self.fit[2] == n_fit: return self.fit[:2]
+            k, t = numpy.array(self.arrivals, dtype = numpy.float64).reshape(-1, 2).T
+
+        b = 1.0 / self.sample_rate
+        a = numpy.mean(t - b * k) if len(k) > 0 else 0.0
+        if len(k) >= 3:
+            k0 = k[0] # fit about the first point to keep the normal equations well conditioned
+            b, a = numpy.polyfit(k - k0, t, 1)
+            for i in range(FIT_PASSES):
+                resid = t - ( a + b * (k - k0) )
+                keep = resid <= numpy.median(resid)
+                if numpy.count_nonzero(keep) < 3: break
+                b, a = numpy.polyfit(k[keep] - k0, t[keep], 1)
+            a -= b * k0
+        self.fit = [a, b, n_fit]
+        return [a, b]
+
+    def drift_ppm(self):
+        """
+        estimated timebase error of the device relative to the host clock in parts per million
+        """
+        a, b = self.clock()
+        return 1.0e6 * ( 1.0 / (b * self.sample_rate) - 1.0 )
+
+    def resample(self, times, a, b, out):
+        """
+        linearly interpolate this device's samples at host times, writing (n_channels, len(times)) into out
+        samples that can no longer be needed are dropped from the buffer
+        """
+        k = (times - a) / b
+        with self.lock:
+            i = numpy.floor(k).astype(numpy.int64) - self.buf_start
+            i = numpy.clip(i, 0, self.buffer.shape[1] - 2)
+            f = numpy.clip(k - self.buf_start - i, 0.0, 1.0)
+            out[:] = self.buffer[:, i] * (1.0 - f) + self.buffer[:, i + 1] * f
+            keep = max(0, int(i[-1]) - 1)
+            self.buffer = self.buffer[:, keep:]
+            self.buf_start += keep
+
+def Multi_Device_Acquire(device_list, duration = 10.0, block_time = 0.1, out_rate = None, consumer = None, loud = False):
+    """
+    Acquire AI from several devices at once and merge the streams onto one common time grid
+
+    Inputs
+    device_list(list) of (physical_channel_str, device_name) pairs, one per device
+    duration(float) length of the acquisition in units of second
+    block_time(float) length of each read, and of each merged block, in units of second
+    out_rate(float) sample rate of the merged output in units of Hz, None => the lowest device rate
+    consumer(function) optional, called as consumer(block, time_axis) with each merged block, nothing is accumulated
+    loud(boolean) print the per-device rate and drift estimates
+
+    Output is a list [data, time_axis, stats]
+    data(numpy array) (total no. of channels, n) merged samples, None when a consumer is given
+    time_axis(Time_Axis) times of the merged samples in units of second from the first merged sample
+    stats(dict) with keys devices, merged_samples, throughput, channel_names
+    devices maps device_name onto a dict with keys blocks, errors, samples, sample_rate, measured_rate, drift_ppm
+    throughput is the total no. of samples, over every channel of every device, acquired per second
+
+    18 - 10 - 2026
+    """
+
+    FUNC_NAME = ".Multi_Device_Acquire()" # use this in exception handling messages
+    ERR_STATEMENT = "Error: " + MOD_NAME_STR + FUNC_NAME
+
+    try:
+        c1 = True if len(device_list) > 0 else False
+        c2 = True if len( set( [ dev for chn, dev in device_list ] ) ) == len(device_list) else False
+        c3 = True if duration > 0 and block_time > 0 else False
+        c10 = c1 and c2 and c3
+
+        if c10:
+            t_ref = time.perf_counter()
+            workers = [ Device_Worker(chn, dev, block_time, t_ref) for chn, dev in device_list ]
+            go = threading.Event()
+            for w in workers:
+                w.go = go
+                w.thread.start()
+            for w in workers:
+                w.ready.wait()
+            go.set()
+            t_end = time.perf_counter() + duration
+
+            if out_rate is None: out_rate = min( [ w.sample_rate for w in workers ] )
+            dt = 1.0 / out_rate
+            out_block = max(1, int(out_rate * block_time))
+            n_out_ch = sum( [ w.n_channels for w in workers ] )
+            rows = numpy.cumsum( [0] + [ w.n_channels for w in workers ] )
+
+            blocks = []
+            t_first = None # host time of the first merged sample
+            n_merged = 0
+
+            def Merge(final):
+                # emit every whole block covered by all of the devices, and any remainder when final
+                nonlocal t_first, n_merged
+                if min( [ w.stats['blocks'] for w in workers ] ) < 3: return
+                clocks = [ w.clock() for w in workers ]
+                if t_first is None:
+                    # first time at which every device has data
+                    t_first = max( [ a + b * w.buf_start for w, (a, b) in zip(workers, clocks) ] )
+                # last time at which every device has a sample on either side
+                t_last = min( [ a + b * (w.n_acquired - 2) for w, (a, b) in zip(workers, clocks) ] )
+                n_avail = int( math.floor( (t_last - t_first) / dt ) ) + 1 - n_merged
+                while n_avail >= out_block or ( final and n_avail > 0 ):
+                    m = min(n_avail, out_block)
+                    times = t_first + (n_merged + numpy.arange(m)) * dt
+                    merged = numpy.empty( (n_out_ch, m), dtype = numpy.float64 )
+                    for j, (w, (a, b)) in enumerate(zip(workers, clocks)):
+                        w.resample(times, a, b, merged[rows[j]:rows[j + 1]])
+                    time_axis = NI_DAQ_Timing.Time_Axis(n_merged * dt, dt, m)
+                    if consumer is None: blocks.append(merged)
+                    else: consumer(merged, time_axis)
+                    n_merged += m
+                    n_avail -= m
+
+            while time.perf_counter() < t_end and all( [ w.thread.is_alive() for w in workers ] ):
+                time.sleep(0.5 * block_time)
+                Merge(False)
+
+            for w in workers:
+                w.stop_event.set()
+            for w in workers:
+                w.thread.join()
+            Merge(True)
+            t_elapsed = time.perf_counter() - t_ref
+
+            stats = {'devices':{}, 'merged_samples':n_merged, 'channel_names':[]}
+            total = 0
+            for w in workers:
+                a, b = w.clock()
+                entry = dict(w.stats)
+                entry['sample_rate'] = w.sample_rate
+                entry['measured_rate'] = 1.0 / b
+                entry['drift_ppm'] = w.drift_ppm()
+                stats['devices'][w.device_name] = entry
+                stats['channel_names'].extend(w.spec.channels)
+                total += w.stats['samples'] * w.n_channels
+                if w.stats['errors'] > 0:
+                    print(ERR_STATEMENT)
+                    print(w.device_name, w.error)
+            stats['throughput'] = total / t_elapsed
+
+            if loud:
+                for name, entry in stats['devices'].items():
+                    print("%(v1)s: blocks: %(v2)d, errors: %(v3)d, nominal rate: %(v4)0.1f (Hz), measured rate: %(v5)0.3f (Hz), drift: %(v6)0.1f (ppm)"%{"v1":name,
+                            "v2":entry['blocks'], "v3":entry['errors'], "v4":entry['sample_rate'], "v5":entry['measured_rate'], "v6":entry['drift_ppm']})
+                print("Merged samples per channel: %(v1)d, aggregate throughput: %(v2)0.1f (S/s)"%{"v1":n_merged, "v2":stats['throughput']})
+
+            data = None
+            if consumer is None:
+                data = numpy.hstack(blocks) if len(blocks) > 0 else numpy.zeros( (n_out_ch, 0) )
+            return [data, NI_DAQ_Timing.Time_Axis(0.0, dt, n_merged), stats]
+        else:
+            if c1 is False: ERR_STATEMENT = ERR_STATEMENT + '\nNo devices in device_list'
+            if c2 is False: ERR_STATEMENT = ERR_STATEMENT + '\nEach device may appear only once in device_list'
+            if c3 is False: ERR_STATEMENT = ERR_STATEMENT + '\nduration or block_time out of range'
+            raise Exception
+    except Exception as e:
+        print(ERR_STATEMENT)
+        print(e)
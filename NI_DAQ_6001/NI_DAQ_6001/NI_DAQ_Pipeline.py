@@ -0,0 +1,319 @@
+"""
+Double-buffered producer / consumer pipeline for continuous AI acquisition
+
+A producer thread does nothing but fill preallocated buffers from the driver, each filled buffer travels through a chain
+of consumer stages, each on its own thread, e.g. reduce => filter => record => plot, and is returned to the pool by the last stage
+Acquisition therefore overlaps with processing, and with n_buffers >= 2 the driver is read into one buffer while
+the stages work on the others, no block memory is allocated once the pipeline is running
+
+18 - 10 - 2026
+"""
+
+# Usage
+# pipe = Pipeline(source, [Stage('reduce', Reduce), Stage('plot', Plot, lossy = True)], shape = (4, 1000), dtype = numpy.int16)
+# pipe.run(duration)   or pipe.start(), ..., pipe.stop()
+# source(buf) fills the (n_channels, n_samples) buffer buf and returns the no. of samples per channel written, 0 ends the run
+# each stage function is called as func(block) with a Pipeline_Block, block.data is only valid until func returns,
+# copy anything that must be kept, see NI_DAQ_Lib.AI_Pipeline for a source reading the AI stream
+
+# Backpressure
+# every stage has a bounded input queue, a stage that cannot keep up fills its queue, which blocks the stage before it,
+# and eventually the producer waits for a free buffer, the producer's pool_wait then grows and the driver buffer starts to fill
+# A lossy stage, e.g. plotting, instead skips all but the most recent block waiting in its queue, so it never holds up the chain
+
+# Metrics, see Pipeline.stats()
+# for each stage: blocks processed, skipped and errors, busy (time in func), starved (time waiting for input)
+# and stalled (time waiting for room in the next queue), queue depth max and mean as seen by each block on arrival
+# utilisation = busy / elapsed, the lossless stage with the highest utilisation is the bottleneck, see Pipeline.bottleneck()
+# a lossy stage always takes the newest block so it runs near full utilisation by design and never holds up the chain, it is not ranked
+
+# import required libraries
+import time
+import queue
+import numpy
+import threading
+import NI_DAQ_Scaling
+
+MOD_NAME_STR = "NI_DAQ_Pipeline"
+
+class Buffer_Pool:
+    """
+    Fixed set of preallocated buffers handed out and returned by index
+
+    Inputs
+    n_buffers(int) no. of buffers
+    shape(tuple) shape of each buffer, (n_channels, n_samples)
+    dtype(numpy dtype) e.g. numpy.int16 for raw codes or numpy.float64 for volts
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_buffers, shape, dtype = numpy.float64):
+        if n_buffers < 1:
+            raise ValueError('n_buffers must be >= 1')
+        self.buffers = [ numpy.zeros(shape, dtype = dtype) for i in range(n_buffers) ]
+        self.free = queue.Queue()
+        for i in range(n_buffers): self.free.put(i)
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def acquire(self, timeout = None):
+        """
+        index of a free buffer, waits until one is released, raises queue.Empty after timeout
+        """
+        return self.free.get(timeout = timeout)
+
+    def release(self, index):
+        self.free.put(index)
+
+    def n_free(self):
+        return self.free.qsize()
+
+class Pipeline_Block:
+    """
+    One filled buffer on its way through the pipeline
+
+    Attributes
+    data(numpy array) (n_channels, n) view of the pool buffer
+    seq(int) block no. from 0
+    first(int) sample no. of data[:, 0] since the start of the run
+    t_wall(float) time.time() when the producer finished filling the buffer
+    coeffs(numpy array) optional (n_channels, n_coeffs) scaling of raw codes to volts, None => data is already in volts
+
+    18 - 10 - 2026
+    """
+
+    __slots__ = ('index', 'data', 'seq', 'first', 't_wall', 'coeffs')
+
+    def __init__(self, index, data, seq, first, t_wall, coeffs = None):
+        self.index = index
+        self.data = data
+        self.seq = seq
+        self.first = first
+        self.t_wall = t_wall
+        self.coeffs = coeffs
+
+    def volts(self, out = None):
+        """
+        data in units of V, raw codes are scaled by NI_DAQ_Scaling.Scale_Raw, into out if given
+        """
+        return NI_DAQ_Scaling.Scale_Raw(self.data, self.coeffs, out)
+
+class Stage:
+    """
+    One consumer stage of a Pipeline
+
+    Inputs
+    name(str) used in the stats and as the thread name
+    func(function) called as func(block) for each Pipeline_Block, exceptions are counted and the block is passed on
+    max_queue(int) size of the bounded input queue
+    lossy(boolean) True => when several blocks are waiting only the most recent is processed, the others are passed on unprocessed
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, name, func, max_queue = 4, lossy = False):
+        if max_queue < 1:
+            raise ValueError('max_queue must be >= 1')
+        self.name = name
+        self.func = func
+        self.lossy = lossy
+        self.input = queue.Queue(maxsize = max_queue)
+        self.reset()
+
+    def reset(self):
+        self.stats = {'blocks':0, 'skipped':0, 'errors':0, 'busy':0.0, 'starved':0.0, 'stalled':0.0, 'depth_max':0, 'depth_sum':0}
+
+    def put(self, block):
+        """
+        pass block into this stage, waits while the input queue is full, output is the time spent waiting
+        """
+        if block is None:
+            self.input.put(None)
+            return 0.0
+        depth = self.input.qsize()
+        if depth > self.stats['depth_max']: self.stats['depth_max'] = depth
+        self.stats['depth_sum'] += depth
+        if self.input.full():
+            t_start = time.perf_counter()
+            self.input.put(block)
+            return time.perf_counter() - t_start
+        self.input.put(block)
+        return 0.0
+
+    def newer_waiting(self):
+        """
+        True if a block newer than the one just taken is waiting, the end of run None does not count so the last block is always processed
+        """
+        # None is only ever the last item in the queue, so a block is waiting if the head is not None
+        with self.input.mutex:
+            return len(self.input.queue) > 0 and self.input.queue[0] is not None
+
+    def run(self, forward):
+        """
+        thread body, forward(block) hands each block to the next stage or back to the pool, None ends the stage
+        """
+        stats = self.stats
+        while True:
+            t_start = time.perf_counter()
+            block = self.input.get()
+            stats['starved'] += time.perf_counter() - t_start
+            if block is None:
+                forward(None)
+                return
+
+            if self.lossy and self.newer_waiting():
+                stats['skipped'] += 1
+                stats['stalled'] += forward(block)
+                continue
+
+            t_start = time.perf_counter()
+            try:
+                self.func(block)
+            except Exception:
+                stats['errors'] += 1
+            stats['busy'] += time.perf_counter() - t_start
+            stats['blocks'] += 1
+            stats['stalled'] += forward(block)
+
+class Pipeline:
+    """
+    Producer thread filling pooled buffers from source, followed by a chain of Stage threads
+
+    Inputs
+    source(function) called as source(buf) from the producer thread, returns the no. of samples per channel written into buf,
+    0 or None ends the run, an exception also ends the run and is kept in stats()['producer']['exception']
+    stages(list of Stage) in the order each block visits them
+    shape(tuple) (n_channels, n_samples) of each buffer
+    dtype(numpy dtype) of the buffers
+    n_buffers(int) no. of pooled buffers, >= 2 lets the producer fill one buffer while the stages process another
+    coeffs(numpy array) optional scaling attached to every block, see Pipeline_Block.volts
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, source, stages, shape, dtype = numpy.float64, n_buffers = 8, coeffs = None):
+        self.source = source
+        self.stages = list(stages)
+        self.pool = Buffer_Pool(n_buffers, shape, dtype)
+        self.coeffs = coeffs
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.producer = {'blocks':0, 'samples':0, 'read':0.0, 'pool_wait':0.0, 'stalled':0.0, 'exception':None}
+        self.t_start = None
+        self.t_stop = None
+
+    def _forward(self, k):
+        # hand a block on from stage k - 1, the last stage returns the buffer to the pool
+        if k < len(self.stages):
+            stage = self.stages[k]
+            return stage.put
+        def Release(block):
+            if block is not None: self.pool.release(block.index)
+            return 0.0
+        return Release
+
+    def _produce(self):
+        stats = self.producer
+        forward = self._forward(0)
+        first = 0
+        try:
+            while not self.stop_event.is_set():
+                t_start = time.perf_counter()
+                index = self.pool.acquire()
+                t_read = time.perf_counter()
+                stats['pool_wait'] += t_read - t_start
+
+                buf = self.pool.buffers[index]
+                n = self.source(buf)
+                stats['read'] += time.perf_counter() - t_read
+                if not n:
+                    self.pool.release(index)
+                    break
+
+                block = Pipeline_Block(index, buf[:, :n], stats['blocks'], first, time.time(), self.coeffs)
+                first += n
+                stats['blocks'] += 1
+                stats['samples'] = first
+                stats['stalled'] += forward(block)
+        except Exception as e:
+            stats['exception'] = e
+        forward(None)
+
+    def start(self):
+        """
+        start the stage threads and then the producer
+        """
+        if len(self.threads) > 0:
+            raise RuntimeError('Pipeline is already running')
+        self.stop_event.clear()
+        for stage in self.stages: stage.reset()
+        self.producer = {'blocks':0, 'samples':0, 'read':0.0, 'pool_wait':0.0, 'stalled':0.0, 'exception':None}
+        self.t_start = time.perf_counter()
+        self.t_stop = None
+        for k, stage in enumerate(self.stages):
+            thread = threading.Thread(target = stage.run, args = (self._forward(k + 1),), name = MOD_NAME_STR + '.' + stage.name, daemon = True)
+            thread.start()
+            self.threads.append(thread)
+        thread = threading.Thread(target = self._produce, name = MOD_NAME_STR + '.producer', daemon = True)
+        thread.start()
+        self.threads.append(thread)
+
+    def stop(self, wait = True):
+        """
+        ask the producer to stop after the block it is reading, every block already produced is still processed
+        wait(boolean) True => wait until every stage has finished
+        """
+        self.stop_event.set()
+        if wait: self.join()
+
+    def join(self, timeout = None):
+        """
+        wait for the producer to end, e.g. when source returns 0, and the stages to drain, output is True once all have finished
+        """
+        t_end = None if timeout is None else time.perf_counter() + timeout
+        for thread in self.threads[::-1]:
+            thread.join(None if t_end is None else max(0.0, t_end - time.perf_counter()))
+            if thread.is_alive(): return False
+        if self.t_stop is None: self.t_stop = time.perf_counter()
+        self.threads = []
+        return True
+
+    def run(self, duration = None):
+        """
+        start, run until source ends the run or duration has elapsed, then stop and wait for the stages to drain
+        """
+        self.start()
+        if not self.join(duration):
+            self.stop()
+        return self.stats()
+
+    def stats(self):
+        """
+        Output is a dict with keys elapsed, producer, stages
+        producer(dict) blocks, samples, read, pool_wait, stalled, exception, read_utilisation
+        stages(dict) for each stage name the stage stats plus lossy, utilisation and depth_mean
+        """
+        end = time.perf_counter() if self.t_stop is None else self.t_stop
+        elapsed = 0.0 if self.t_start is None else end - self.t_start
+        scale = 1.0 / elapsed if elapsed > 0 else 0.0
+        producer = dict(self.producer)
+        producer['read_utilisation'] = producer['read'] * scale
+        stages = {}
+        for stage in self.stages:
+            s = dict(stage.stats)
+            s['lossy'] = stage.lossy
+            s['utilisation'] = s['busy'] * scale
+            n_arrived = s['blocks'] + s['skipped']
+            s['depth_mean'] = s['depth_sum'] / float(n_arrived) if n_arrived > 0 else 0.0
+            stages[stage.name] = s
+        return {'elapsed':elapsed, 'producer':producer, 'stages':stages}
+
+    def bottleneck(self):
+        """
+        name of the lossless stage with the highest utilisation, ties broken by the mean queue depth, None if there are no lossless stages
+        """
+        stages = dict( [ (name, s) for name, s in self.stats()['stages'].items() if not s['lossy'] ] )
+        if len(stages) == 0: return None
+        return max(stages, key = lambda name: (stages[name]['utilisation'], stages[name]['depth_mean']))
@@ -0,0 +1,283 @@
+"""
+Append-only memory-mapped recorder for long continuous AI acquisitions
+
+Blocks handed to a Recorder are written on a background thread into a single file laid out for memory mapping
+A Recording opened on the same file, while it is still being written or afterwards, returns zero-copy views of any range
+
+18 - 10 - 2026
+"""
+
+# File layout
+# [0, 64)            fixed header: magic, version, JSON length, samples committed, blocks committed, finished flag
+# [64, DATA_OFFSET)  JSON header: channel names, sample rate, dtype, scaling coefficients, start time, chunk size
+# [DATA_OFFSET, ...) samples stored sample-major as a (n_samples, n_channels) array, so every time range is contiguous
+# The file grows in chunks of chunk_samples samples, only the chunk being filled is mapped by the writer
+# The block index is kept in a sidecar file, path + '.idx', one INDEX_DTYPE record per block
+# The writer stores the data before it advances the committed counts, so a reader never sees a partly written block
+
+# RAM use is bounded by the queue of pending blocks, max_pending * block size, whatever the length of the run
+# Blocks arriving when the queue is full are counted as dropped rather than stalling the acquisition thread
+
+# import required libraries
+import json
+import time
+import queue
+import numpy
+import datetime
+import threading
+import NI_DAQ_Timing
+import NI_DAQ_Scaling
+
+MOD_NAME_STR = "NI_DAQ_Recorder"
+
+MAGIC = b'NIDAQREC'
+VERSION = 1
+DATA_OFFSET = 65536 # reserved for the header, a multiple of the mmap allocation granularity on every platform
+FIXED_DTYPE = numpy.dtype( [('magic', 'S8'), ('version', '<u4'), ('json_len', '<u4'), ('n_samples', '<u8'), ('n_blocks', '<u8'),
+                            ('finished', '<u4'), ('pad', 'V28')] )
+INDEX_DTYPE = numpy.dtype( [('first', '<i8'), ('n', '<i8'), ('t_wall', '<f8')] ) # first sample, no. of samples, time.time() at arrival
+
+class Recorder:
+    """
+    Write blocks of shape (n_channels, n_samples) to file_path on a background thread
+
+    Inputs
+    file_path(str) recording to create, an existing file is overwritten
+    channel_names(list of str) physical channel of each row of the blocks
+    sample_rate(float) sample rate per channel in units of Hz
+    dtype(numpy dtype) of the stored samples, e.g. numpy.int16 for raw codes or numpy.float64 for volts
+    coeffs(numpy array) optional (n_channels, n_coeffs) scaling from raw codes to volts, see NI_DAQ_Lib.AI_Scaling_Coefficients
+    chunk_samples(int) no. of samples per channel by which the file is grown and mapped at a time
+    max_pending(int) max no. of blocks queued for the writer thread
+    flush_time(float) interval between flushes of the mapped data to disk in units of second
+    metadata(dict) optional extra entries stored in the JSON header
+
+    write(block) returns at once, close() waits for the queue to drain and finalises the file
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, file_path, channel_names, sample_rate, dtype = numpy.int16, coeffs = None, chunk_samples = 1 << 16,
+                 max_pending = 64, flush_time = 1.0, metadata = None):
+        self.file_path = file_path
+        self.index_path = file_path + '.idx'
+        self.n_channels = len(channel_names)
+        self.dtype = numpy.dtype(dtype)
+        self.chunk_samples = int(chunk_samples)
+        self.flush_time = flush_time
+        self.stats = {'blocks':0, 'samples':0, 'dropped':0, 'errors':0}
+
+        header = {'channel_names':list(channel_names), 'sample_rate':float(sample_rate), 'dtype':self.dtype.str,
+                  'coeffs':None if coeffs is None else numpy.asarray(coeffs, dtype = numpy.float64).tolist(),
+                  'start_time':time.time(), 'start_time_iso':datetime.datetime.now().isoformat(), 'chunk_samples':self.chunk_samples,
+                  'metadata':{} if metadata is None else metadata}
+        text = json.dumps(header).encode('utf-8')
+        if FIXED_DTYPE.itemsize + len(text) > DATA_OFFSET:
+            raise ValueError('Recording header is too large')
+
+        fixed = numpy.zeros(1, dtype = FIXED_DTYPE)
+        fixed['magic'] = MAGIC
+        fixed['version'] = VERSION
+        fixed['json_len'] = len(text)
+        with open(self.file_path, 'wb') as f:
+            f.write(fixed.tobytes())
+            f.write(text)
+            f.truncate(DATA_OFFSET)
+        with open(self.index_path, 'wb'):
+            pass
+
+        self.fixed = numpy.memmap(self.file_path, dtype = FIXED_DTYPE, mode = 'r+', shape = (1,))
+        self.index_file = open(self.index_path, 'ab')
+        self.chunk = None # mapped (chunk_samples, n_channels) view of the chunk being filled
+        self.chunk_start = 0
+        self.n_samples = 0
+        self.n_blocks = 0
+
+        self.pending = queue.Queue(maxsize = max_pending)
+        self.thread = threading.Thread(target = self._run, name = 'NI_DAQ_Recorder', daemon = True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def write(self, block, t_wall = None):
+        """
+        queue a copy of block, shape (n_channels, n_samples), for writing, never blocks
+        Output is False if the queue was full and the block was dropped
+        """
+        try:
+            self.pending.put_nowait( (numpy.array(block, dtype = self.dtype, copy = True), time.time() if t_wall is None else t_wall) )
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def close(self):
+        """
+        write every queued block, trim the file to the samples recorded and mark the recording finished
+        """
+        if self.thread is None: return
+        self.pending.put(None)
+        self.thread.join()
+        self.thread = None
+
+        if self.chunk is not None:
+            self.chunk.flush()
+            self.chunk = None
+        with open(self.file_path, 'r+b') as f:
+            f.truncate( DATA_OFFSET + self.n_samples * self.n_channels * self.dtype.itemsize )
+        self.fixed['finished'] = 1
+        self.fixed.flush()
+        self.index_file.close()
+
+    def _map_chunk(self, start):
+        # grow the file to hold the chunk beginning at sample start and map it
+        if self.chunk is not None: self.chunk.flush()
+        self.chunk = None
+        rec_bytes = self.n_channels * self.dtype.itemsize
+        with open(self.file_path, 'r+b') as f:
+            f.truncate( DATA_OFFSET + (start + self.chunk_samples) * rec_bytes )
+        self.chunk = numpy.memmap(self.file_path, dtype = self.dtype, mode = 'r+', offset = DATA_OFFSET + start * rec_bytes,
+                                  shape = (self.chunk_samples, self.n_channels))
+        self.chunk_start = start
+
+    def _store(self, block, t_wall):
+        n = block.shape[1]
+        done = 0
+        while done < n:
+            if self.chunk is None or self.n_samples >= self.chunk_start + self.chunk_samples:
+                self._map_chunk(self.n_samples)
+            pos = self.n_samples - self.chunk_start
+            m = min(n - done, self.chunk_samples - pos)
+            self.chunk[pos:pos + m, :] = block[:, done:done + m].T
+            self.n_samples += m
+            done += m
+
+        record = numpy.array( [(self.n_samples - n, n, t_wall)], dtype = INDEX_DTYPE )
+        self.index_file.write(record.tobytes())
+        self.index_file.flush()
+        self.n_blocks += 1
+
+        # publish the block only once its data and index record are in place
+        self.fixed['n_blocks'] = self.n_blocks
+        self.fixed['n_samples'] = self.n_samples
+        self.stats['blocks'] += 1
+        self.stats['samples'] += n
+
+    def _run(self):
+        t_flush = time.perf_counter() + self.flush_time
+        while True:
+            item = self.pending.get()
+            if item is None: break
+            try:
+                self._store(item[0], item[1])
+            except Exception:
+                self.stats['errors'] += 1
+            if time.perf_counter() > t_flush:
+                if self.chunk is not None: self.chunk.flush()
+                self.fixed.flush()
+                t_flush = time.perf_counter() + self.flush_time
+
+class Recording:
+    """
+    Read access to a file written by Recorder, it can be opened while the recording is still in progress
+
+    Attributes taken from the header
+    channel_names, sample_rate, dtype, coeffs (None when the samples are already in volts), start_time, metadata
+
+    Call refresh() to pick up samples written since the file was opened or last refreshed
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.index_path = file_path + '.idx'
+
+        with open(file_path, 'rb') as f:
+            fixed = numpy.frombuffer(f.read(FIXED_DTYPE.itemsize), dtype = FIXED_DTYPE)
+            if fixed['magic'][0] != MAGIC:
+                raise ValueError(file_path + ' is not an NI_DAQ_Recorder file')
+            self.header = json.loads( f.read(int(fixed['json_len'][0])).decode('utf-8') )
+
+        self.channel_names = self.header['channel_names']
+        self.n_channels = len(self.channel_names)
+        self.sample_rate = self.header['sample_rate']
+        self.dtype = numpy.dtype(self.header['dtype'])
+        self.coeffs = None if self.header['coeffs'] is None else numpy.array(self.header['coeffs'])
+        self.start_time = self.header['start_time']
+        self.metadata = self.header['metadata']
+
+        self.n_samples = 0
+        self.n_blocks = 0
+        self.finished = False
+        self.data = None # (n_samples, n_channels) read-only map of the committed samples
+        self.refresh()
+
+    def __len__(self):
+        return self.n_samples
+
+    def refresh(self):
+        """
+        re-read the committed sample count and extend the mapping to cover it
+        Output is the no. of samples per channel now available
+        """
+        with open(self.file_path, 'rb') as f:
+            fixed = numpy.frombuffer(f.read(FIXED_DTYPE.itemsize), dtype = FIXED_DTYPE)
+        n_samples = int(fixed['n_samples'][0])
+        self.n_blocks = int(fixed['n_blocks'][0])
+        self.finished = bool(fixed['finished'][0])
+
+        if n_samples > 0 and ( self.data is None or n_samples != self.n_samples ):
+            self.data = numpy.memmap(self.file_path, dtype = self.dtype, mode = 'r', offset = DATA_OFFSET, shape = (n_samples, self.n_channels))
+        self.n_samples = n_samples
+        return n_samples
+
+    def samples(self, start = 0, stop = None, channels = None):
+        """
+        zero-copy (n_channels, n) view of samples [start, stop), clipped to the committed range
+        channels(list of int) rows to return, None => all channels, selecting channels makes a copy
+        """
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        start = max(0, min(start, stop))
+        if self.data is None: return numpy.zeros( (self.n_channels, 0), dtype = self.dtype )
+        view = self.data[start:stop].T
+        return view if channels is None else view[channels]
+
+    def time_range(self, t_start, t_stop, channels = None):
+        """
+        view of the samples between t_start and t_stop, in units of second from the first sample
+        """
+        return self.samples( int(round(t_start * self.sample_rate)), int(round(t_stop * self.sample_rate)), channels )
+
+    def time_axis(self, start = 0, stop = None):
+        """
+        NI_DAQ_Timing.Time_Axis of samples [start, stop), in units of second from the first sample, timestamped with the start time
+        """
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        start = max(0, min(start, stop))
+        return NI_DAQ_Timing.Time_Axis(start / self.sample_rate, 1.0 / self.sample_rate, stop - start,
+                                       datetime.datetime.fromtimestamp(self.start_time))
+
+    def volts(self, start = 0, stop = None, channels = None):
+        """
+        samples [start, stop) converted to volts using the stored scaling coefficients, a copy
+        """
+        codes = self.samples(start, stop, channels)
+        coeffs = self.coeffs if self.coeffs is None or channels is None else self.coeffs[channels]
+        return NI_DAQ_Scaling.Scale_Raw(codes, coeffs)
+
+    def index(self):
+        """
+        block index as a structured array with fields first, n, t_wall, one record per committed block
+        """
+        with open(self.index_path, 'rb') as f:
+            raw = f.read( self.n_blocks * INDEX_DTYPE.itemsize )
+        return numpy.frombuffer(raw, dtype = INDEX_DTYPE)
+
+    def close(self):
+        self.data = None
@@ -0,0 +1,43 @@
+"""
+Conversion of raw AI codes into volts
+
+The driver scales each AI channel with a polynomial in the raw ADC code, see NI_DAQ_Lib.AI_Scaling_Coefficients
+Raw blocks, recordings, pipeline blocks and bus subscribers all convert through Scale_Raw, so there is one
+implementation of the scaling and this module depends on numpy only
+
+18 - 10 - 2026
+"""
+
+# import required libraries
+import numpy
+
+MOD_NAME_STR = "NI_DAQ_Scaling"
+
+def Scale_Raw(codes, coeffs, out = None):
+    """
+    Convert raw ADC codes into volts with one vectorised Horner evaluation per coefficient
+
+    Inputs
+    codes(numpy array) int16 codes of shape (n_channels, n_samples)
+    coeffs(numpy array) of shape (n_channels, n_coeffs) as returned by AI_Scaling_Coefficients, None => codes are already volts
+    out(numpy array) optional float64 array of the same shape as codes, filled in place so that no memory is allocated,
+    must not share memory with codes
+
+    Output is the array of voltages
+
+    18 - 10 - 2026
+    """
+
+    if out is None:
+        out = numpy.empty(codes.shape, dtype = numpy.float64)
+
+    if coeffs is None:
+        out[:] = codes
+        return out
+
+    out[:] = coeffs[:, -1:]
+    for k in range(coeffs.shape[1] - 2, -1, -1):
+        out *= codes
+        out += coeffs[:, k:k + 1]
+
+    return out
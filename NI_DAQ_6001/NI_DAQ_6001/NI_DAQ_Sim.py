@@ -0,0 +1,762 @@
+"""
+Simulated NI-DAQ USB-6001 backend
+
+Mirrors the subset of nidaqmx that NI_DAQ_Lib uses so that every routine can be run without hardware
+Select it with NI_DAQ_Lib.Use_Backend(NI_DAQ_Sim), restore the driver with NI_DAQ_Lib.Use_Backend()
+
+18 - 10 - 2026
+"""
+
+# What is modelled
+# Task with ai_channels / ao_channels, timing.cfg_samp_clk_timing, start / stop / close / control / wait_until_done
+# read / write including READ_ALL_AVAILABLE, on-demand, FINITE and CONTINUOUS sample modes
+# every-N-samples acquired / transferred callbacks, regenerating and non-regenerating AO
+# stream_readers / stream_writers for the analog multi and single channel cases, and the unscaled int16 reader
+# per-channel ai_dev_scaling_coeff, raw reads are quantised to 14-bit codes with a small per-channel calibration error
+# USB-6001 rate limits, 20 kS/s AI aggregate and 5 kS/s per AO channel, and AI buffer overflow
+# AO-to-AI loopback with configurable noise, offset and latency, and a per-device timebase error for multi-device tests
+# Each simulated device either paces itself in real time or runs on a virtual clock that advances as fast as data is requested
+
+# import required libraries
+import re
+import enum
+import math
+import time
+import numpy
+import threading
+
+MOD_NAME_STR = "NI_DAQ_Sim"
+AI_SR_MAX = 20000 # max aggregate sample rate on AI, units of Hz
+AO_SR_MAX = 5000 # max sample rate on each AO channel, units of Hz
+AI_N_CHANNELS = 8 # ai0 - ai7
+AO_N_CHANNELS = 2 # ao0 - ao1
+DEFAULT_BUF_SIZE = 1000 # samps_per_chan used when none is given
+AI_RESOLUTION = 14 # ADC resolution in bits
+AI_LSB = 20.0 / 2**AI_RESOLUTION # nominal size of one ADC code over the [-10, 10] V range, units of V
+
+class DaqError(Exception):
+    """
+    Error raised by the simulated driver, carries an NI-DAQmx style error_code
+    """
+
+    def __init__(self, message, error_code):
+        super().__init__(message + '\nStatus Code: ' + str(error_code))
+        self.error_code = error_code
+
+class constants:
+    """
+    Namespace matching nidaqmx.constants for the values used by NI_DAQ_Lib
+    """
+
+    READ_ALL_AVAILABLE = -1
+
+    class AcquisitionType(enum.Enum):
+        FINITE = 10178
+        CONTINUOUS = 10123
+        HW_TIMED_SINGLE_POINT = 12522
+
+    class TerminalConfiguration(enum.Enum):
+        DEFAULT = -1
+        RSE = 10083
+        NRSE = 10078
+        DIFF = 10106
+        PSEUDO_DIFF = 12529
+
+    class Edge(enum.Enum):
+        RISING = 10280
+        FALLING = 10171
+
+    class RegenerationMode(enum.Enum):
+        ALLOW_REGENERATION = 10097
+        DONT_ALLOW_REGENERATION = 10158
+
+    class TaskMode(enum.Enum):
+        TASK_START = 0
+        TASK_STOP = 1
+        TASK_VERIFY = 2
+        TASK_COMMIT = 3
+        TASK_RESERVE = 4
+        TASK_UNRESERVE = 5
+        TASK_ABORT = 6
+
+    class SampleTimingType(enum.Enum):
+        SAMPLE_CLOCK = 10388
+        ON_DEMAND = 10390
+
+    class EveryNSamplesEventType(enum.Enum):
+        ACQUIRED_INTO_BUFFER = 1
+        TRANSFERRED_FROM_BUFFER = 2
+
+READ_ALL_AVAILABLE = constants.READ_ALL_AVAILABLE
+
+# Simulated devices
+
+class Sim_Device:
+    """
+    One simulated USB-6001
+
+    name(str) device name used in physical channel strings, e.g. 'Dev2'
+    noise(float) standard deviation of the gaussian noise added to every AI sample in units of V
+    offset(float) constant offset added to every AI sample in units of V
+    latency(float) delay between an AO sample being generated and it appearing on AI in units of second
+    loopback(dict) maps AI channel no. onto the AO channel no. it reads, None => every AI channel reads ao0
+    channels missing from the dict read noise + offset only
+    realtime(boolean) True => reads block until the data would have been acquired, False => run as fast as possible
+    seed(int) seed for the noise generator
+    drift_ppm(float) error of the device timebase in parts per million, in real time the device clock runs at (1 + drift_ppm * 1e-6)
+    times the host clock, so a device at a nominal 5 kS/s actually delivers 5000 * (1 + drift_ppm * 1e-6) samples per host second
+    """
+
+    def __init__(self, name = 'Dev2', noise = 1.0e-3, offset = 0.0, latency = 0.0, loopback = None, realtime = True, seed = None, drift_ppm = 0.0):
+        self.name = name
+        self.noise = noise
+        self.offset = offset
+        self.latency = latency
+        self.loopback = dict( [ (n, 0) for n in range(AI_N_CHANNELS) ] ) if loopback is None else dict(loopback)
+        self.realtime = realtime
+        self.clock_ratio = 1.0 + 1.0e-6 * drift_ppm
+        self.rng = numpy.random.default_rng(seed)
+        self.lock = threading.RLock()
+        self.t0 = time.perf_counter()
+        self.virtual = 0.0
+        self.ao_owner = {} # AO channel no. -> (task, index of the channel in the task)
+        self.ao_idle = numpy.zeros(AO_N_CHANNELS) # value held on each AO channel when no task is driving it
+        self.ai_busy = None # the USB-6001 only supports one running AI task
+
+    def now(self):
+        """
+        current device time in units of second
+        """
+        if self.realtime:
+            return (time.perf_counter() - self.t0) * self.clock_ratio
+        with self.lock:
+            return self.virtual
+
+    def wait_until(self, t, stop_event = None):
+        """
+        block until device time t, on the virtual clock this simply advances the clock
+        """
+        if self.realtime:
+            while True:
+                dt = t - self.now()
+                if dt <= 0 or ( stop_event is not None and stop_event.is_set() ): break
+                time.sleep( min(dt / self.clock_ratio, 0.05) )
+        else:
+            with self.lock:
+                self.virtual = max(self.virtual, t)
+
+    def ao_values(self, ao_num, times):
+        """
+        value of AO channel ao_num at each of the device times in times
+        """
+        owner = self.ao_owner.get(ao_num)
+        if owner is None:
+            return numpy.full(times.shape, self.ao_idle[ao_num])
+        task, index = owner
+        return task._ao_values(index, times, self.ao_idle[ao_num])
+
+    def ai_scaling(self, ai_num):
+        """
+        polynomial coefficients mapping raw ADC codes of AI channel ai_num onto volts, lowest order first
+        each channel has a small, fixed gain and offset calibration error as on a real device
+        """
+        return numpy.array( [ -2.0e-4 * ai_num, AI_LSB * (1.0 + 1.0e-4 * ai_num), 0.0, 0.0 ] )
+
+    def ai_values(self, ai_nums, times):
+        """
+        (len(ai_nums), len(times)) array of simulated AI samples at the device times in times
+        """
+        data = numpy.empty( (len(ai_nums), len(times)), dtype = numpy.float64 )
+        with self.lock:
+            for k, num in enumerate(ai_nums):
+                src = self.loopback.get(num)
+                if src is None:
+                    data[k] = self.offset
+                else:
+                    data[k] = self.ao_values(src, times - self.latency) + self.offset
+            if self.noise > 0:
+                data += self.noise * self.rng.standard_normal(data.shape)
+        return data
+
+SIM_DEVICES = {}
+SIM_LOCK = threading.Lock()
+
+def Add_Device(name = 'Dev2', **kwargs):
+    """
+    Create or replace the simulated device name, kwargs are passed to Sim_Device
+    Returns the new Sim_Device
+    """
+    with SIM_LOCK:
+        SIM_DEVICES[name] = Sim_Device(name, **kwargs)
+        return SIM_DEVICES[name]
+
+def Get_Device(name):
+    """
+    Return the simulated device name, creating it with default settings if it does not exist
+    """
+    with SIM_LOCK:
+        if name not in SIM_DEVICES: SIM_DEVICES[name] = Sim_Device(name)
+        return SIM_DEVICES[name]
+
+def Reset_Devices():
+    """
+    Remove every simulated device
+    """
+    with SIM_LOCK:
+        SIM_DEVICES.clear()
+
+# single item of a physical channel string, e.g. 'Dev2/ai0' or 'Dev2/ai1:3'
+SIM_CHANNEL_PATTERN = re.compile(r"^\s*([^/,\s]+)/(ai|ao)(\d+)(?::(\d+))?\s*$")
+
+def Parse_Channels(physical_channel):
+    """
+    Return [device_name, kind, list of channel no.] for a physical channel string on a single device
+    """
+    devs = []
+    kinds = []
+    nums = []
+    for item in physical_channel.split(','):
+        match = SIM_CHANNEL_PATTERN.match(item)
+        if match is None:
+            raise DaqError('Physical channel specified does not exist on this device: ' + item.strip(), -200170)
+        dev, kind, v1, v2 = match.groups()
+        devs.append(dev)
+        kinds.append(kind)
+        v1 = int(v1)
+        v2 = v1 if v2 is None else int(v2)
+        step = 1 if v2 >= v1 else -1
+        nums.extend( range(v1, v2 + step, step) )
+    if len(set(devs)) > 1 or len(set(kinds)) > 1:
+        raise DaqError('Simulated tasks support a single device and a single channel type: ' + physical_channel, -200170)
+    n_max = AI_N_CHANNELS if kinds[0] == 'ai' else AO_N_CHANNELS
+    if max(nums) >= n_max:
+        raise DaqError('Physical channel specified does not exist on this device: ' + physical_channel, -200170)
+    return [devs[0], kinds[0], nums]
+
+# Task
+
+class Sim_Channel_Collection:
+    """
+    stand-in for task.ai_channels / task.ao_channels
+    """
+
+    def __init__(self, task, kind):
+        self.task = task
+        self.kind = kind
+
+    def add_ai_voltage_chan(self, physical_channel, name_to_assign_to_channel = '', terminal_config = None, min_val = -5.0, max_val = 5.0, **kwargs):
+        self.task._add_channels(physical_channel, 'ai', min_val, max_val)
+
+    def add_ao_voltage_chan(self, physical_channel, name_to_assign_to_channel = '', min_val = -10.0, max_val = 10.0, **kwargs):
+        self.task._add_channels(physical_channel, 'ao', min_val, max_val)
+
+    @property
+    def channel_names(self):
+        return list(self.task.channel_names)
+
+    def __len__(self):
+        return len(self.task.channel_names)
+
+    def __getitem__(self, index):
+        return Sim_Channel(self.task, index)
+
+    def __iter__(self):
+        return iter( [ Sim_Channel(self.task, index) for index in range(len(self.task.channel_names)) ] )
+
+class Sim_Channel:
+    """
+    stand-in for a single nidaqmx AIChannel / AOChannel
+    """
+
+    def __init__(self, task, index):
+        self.task = task
+        self.index = index
+        self.name = task.channel_names[index]
+
+    @property
+    def ai_dev_scaling_coeff(self):
+        return list( self.task.device.ai_scaling(self.task.channel_nums[self.index]) )
+
+    @property
+    def ai_resolution(self):
+        return float(AI_RESOLUTION)
+
+class Sim_Timing:
+    """
+    stand-in for task.timing
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.samp_clk_rate = 0.0
+        self.samp_quant_samp_mode = None
+        self.samp_quant_samp_per_chan = DEFAULT_BUF_SIZE
+        self.samp_timing_type = constants.SampleTimingType.ON_DEMAND
+
+    def cfg_samp_clk_timing(self, rate, source = '', active_edge = None, sample_mode = None, samps_per_chan = DEFAULT_BUF_SIZE):
+        task = self.task
+        if len(task.channel_nums) == 0:
+            raise DaqError('Task contains no channels', -200478)
+        rate = float(rate)
+        if task.kind == 'ai' and rate * len(task.channel_nums) > AI_SR_MAX * (1.0 + 1.0e-9):
+            raise DaqError('Requested AI sample rate exceeds the aggregate maximum of the USB-6001', -200077)
+        if task.kind == 'ao' and rate > AO_SR_MAX * (1.0 + 1.0e-9):
+            raise DaqError('Requested AO sample rate exceeds the maximum of the USB-6001', -200077)
+        if rate <= 0:
+            raise DaqError('Requested sample rate is not supported', -200077)
+        self.samp_clk_rate = rate
+        self.samp_quant_samp_mode = constants.AcquisitionType.FINITE if sample_mode is None else sample_mode
+        self.samp_quant_samp_per_chan = int(samps_per_chan)
+        self.samp_timing_type = constants.SampleTimingType.SAMPLE_CLOCK
+
+class Sim_In_Stream:
+    """
+    stand-in for task.in_stream
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.read_all_avail_samp = False
+
+    @property
+    def avail_samp_per_chan(self):
+        return self.task._ai_available()
+
+    @property
+    def total_samp_per_chan_acquired(self):
+        return self.task._ai_acquired()
+
+    @property
+    def input_buf_size(self):
+        return self.task._buf_size()
+
+    @property
+    def num_chans(self):
+        return len(self.task.channel_nums)
+
+class Sim_Out_Stream:
+    """
+    stand-in for task.out_stream
+    """
+
+    def __init__(self, task):
+        self.task = task
+        self.regen_mode = constants.RegenerationMode.ALLOW_REGENERATION
+
+    @property
+    def total_samp_per_chan_generated(self):
+        return self.task._ao_generated()
+
+    @property
+    def output_buf_size(self):
+        return self.task._buf_size()
+
+    @property
+    def space_avail(self):
+        return max(0, self.task._buf_size() - ( self.task.ao_written - self.task._ao_generated() ))
+
+    @property
+    def num_chans(self):
+        return len(self.task.channel_nums)
+
+class Task:
+    """
+    Simulated nidaqmx.Task, see the module docstring for what is modelled
+    """
+
+    TASK_COUNT = 0
+
+    def __init__(self, new_task_name = ''):
+        Task.TASK_COUNT += 1
+        self.name = new_task_name if new_task_name != '' else '_sim_task' + str(Task.TASK_COUNT)
+        self.kind = None
+        self.device = None
+        self.channel_nums = []
+        self.channel_names = []
+        self.ranges = []
+        self.ai_channels = Sim_Channel_Collection(self, 'ai')
+        self.ao_channels = Sim_Channel_Collection(self, 'ao')
+        self.timing = Sim_Timing(self)
+        self.in_stream = Sim_In_Stream(self)
+        self.out_stream = Sim_Out_Stream(self)
+        self.lock = threading.RLock()
+        self.running = False
+        self.implicit = False
+        self.closed = False
+        self.state = 'unverified'
+        self.t_start = 0.0
+        self.read_pos = 0
+        self.ao_events_t = []
+        self.ao_events_v = []
+        self.ao_chunks = []
+        self.ao_chunk_starts = []
+        self.ao_written = 0
+        self.ao_regen_data = None
+        self.ao_underflows = 0
+        self.callbacks = []
+        self.cb_threads = []
+        self.cb_stop = threading.Event()
+
+    # context manager
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    # configuration
+
+    def _add_channels(self, physical_channel, kind, min_val, max_val):
+        if self.kind is not None and self.kind != kind:
+            raise DaqError('Simulated tasks support a single channel type', -200559)
+        dev_name, kind, nums = Parse_Channels(physical_channel)
+        device = Get_Device(dev_name)
+        if self.device is not None and self.device is not device:
+            raise DaqError('Simulated tasks support a single device', -200559)
+        if kind == 'ao':
+            with device.lock:
+                for num in nums:
+                    owner = device.ao_owner.get(num)
+                    if owner is not None and owner[0] is not self and not owner[0].closed:
+                        raise DaqError('The specified resource is reserved: ' + dev_name + '/ao' + str(num), -50103)
+                for num in nums:
+                    device.ao_owner[num] = (self, len(self.channel_nums) + nums.index(num))
+        self.kind = kind
+        self.device = device
+        self.channel_nums.extend(nums)
+        self.channel_names.extend( [ dev_name + '/' + kind + str(num) for num in nums ] )
+        self.ranges.extend( [ (min_val, max_val) ] * len(nums) )
+
+    def _clocked(self):
+        return self.timing.samp_timing_type == constants.SampleTimingType.SAMPLE_CLOCK
+
+    def _finite(self):
+        return self.timing.samp_quant_samp_mode == constants.AcquisitionType.FINITE
+
+    def _buf_size(self):
+        return self.timing.samp_quant_samp_per_chan
+
+    def control(self, action):
+        if action == constants.TaskMode.TASK_START: self.start()
+        elif action in (constants.TaskMode.TASK_STOP, constants.TaskMode.TASK_ABORT): self.stop()
+        elif action == constants.TaskMode.TASK_VERIFY: self.state = 'verified'
+        elif action == constants.TaskMode.TASK_RESERVE: self.state = 'reserved'
+        elif action == constants.TaskMode.TASK_COMMIT: self.state = 'committed'
+        elif action == constants.TaskMode.TASK_UNRESERVE: self.state = 'verified'
+
+    def register_every_n_samples_acquired_into_buffer_event(self, sample_interval, callback_method):
+        self.callbacks.append( (constants.EveryNSamplesEventType.ACQUIRED_INTO_BUFFER, int(sample_interval), callback_method) )
+
+    def register_every_n_samples_transferred_from_buffer_event(self, sample_interval, callback_method):
+        self.callbacks.append( (constants.EveryNSamplesEventType.TRANSFERRED_FROM_BUFFER, int(sample_interval), callback_method) )
+
+    # state transitions
+
+    def start(self):
+        with self.lock:
+            if self.closed: raise DaqError('Task has been closed', -200088)
+            if self.running: return
+            if self.kind is None: raise DaqError('Task contains no channels', -200478)
+            if self.kind == 'ai':
+                with self.device.lock:
+                    busy = self.device.ai_busy
+                    if busy is not None and busy is not self and busy.running:
+                        raise DaqError('The specified resource is reserved, only one AI task can run at a time', -50103)
+                    self.device.ai_busy = self
+            if self.kind == 'ao' and self._clocked():
+                if self.ao_written == 0:
+                    raise DaqError('No data was written to the AO buffer before the task was started', -200462)
+                if self.out_stream.regen_mode == constants.RegenerationMode.ALLOW_REGENERATION:
+                    self.ao_regen_data = numpy.concatenate(self.ao_chunks, axis = 1)
+            self.t_start = self.device.now()
+            self.read_pos = 0
+            self.running = True
+            self.state = 'running'
+            self.cb_stop.clear()
+            self.cb_threads = []
+            for event_type, n, cb in self.callbacks:
+                thread = threading.Thread(target = self._callback_loop, args = (event_type, n, cb), daemon = True)
+                self.cb_threads.append(thread)
+            for thread in self.cb_threads: thread.start()
+
+    def stop(self):
+        with self.lock:
+            if not self.running: return
+            if self.kind == 'ao':
+                # the output holds its final value after the task stops
+                t = numpy.array( [self.device.now()] )
+                with self.device.lock:
+                    for num in self.channel_nums:
+                        self.device.ao_idle[num] = self.device.ao_values(num, t)[0]
+                self.ao_events_t = []
+                self.ao_events_v = []
+            self.running = False
+            self.implicit = False
+            self.state = 'committed'
+            self.cb_stop.set()
+            threads = self.cb_threads
+            self.cb_threads = []
+        for thread in threads:
+            if thread is not threading.current_thread(): thread.join(timeout = 5.0)
+        if self.kind == 'ao' and self._clocked():
+            self.ao_chunks = []
+            self.ao_chunk_starts = []
+            self.ao_written = 0
+            self.ao_regen_data = None
+
+    def close(self):
+        if self.closed: return
+        self.stop()
+        if self.kind == 'ao' and self.device is not None:
+            with self.device.lock:
+                t = numpy.array( [self.device.now()] )
+                for num in self.channel_nums:
+                    owner = self.device.ao_owner.get(num)
+                    if owner is not None and owner[0] is self:
+                        self.device.ao_idle[num] = self.device.ao_values(num, t)[0]
+                        del self.device.ao_owner[num]
+        self.closed = True
+
+    def is_task_done(self):
+        if not self.running: return True
+        if self._clocked() and self._finite():
+            return self.device.now() >= self.t_start + self._buf_size() / self.timing.samp_clk_rate
+        return False
+
+    def wait_until_done(self, timeout = 10.0):
+        if not self.running: return
+        if not ( self._clocked() and self._finite() ):
+            raise DaqError('wait_until_done is not supported for a task that is not finite', -200560)
+        t_done = self.t_start + self._buf_size() / self.timing.samp_clk_rate
+        if t_done - self.device.now() > timeout:
+            self.device.wait_until(self.device.now() + timeout)
+            raise DaqError('Wait Until Done did not indicate all samples were acquired or generated before the timeout', -200560)
+        self.device.wait_until(t_done)
+
+    def _callback_loop(self, event_type, n, cb):
+        # fires cb each time another n samples per channel have been acquired / generated
+        k = 1
+        while not self.cb_stop.is_set():
+            self.device.wait_until(self.t_start + k * n / self.timing.samp_clk_rate, self.cb_stop)
+            if self.cb_stop.is_set(): break
+            if self._finite() and k * n > self._buf_size(): break
+            cb(self.name, event_type.value, n, None)
+            k += 1
+
+    # AI
+
+    def _ai_acquired(self):
+        if not self.running or not self._clocked(): return 0
+        n = int( math.floor( ( self.device.now() - self.t_start ) * self.timing.samp_clk_rate + 1.0e-9 ) )
+        return min(n, self._buf_size()) if self._finite() else n
+
+    def _ai_available(self):
+        return max(0, self._ai_acquired() - self.read_pos)
+
+    def _ai_samples(self, n):
+        # n samples per channel following on from read_pos, waits until they have been acquired
+        if self.kind != 'ai': raise DaqError('Read is not supported for an output task', -200477)
+        rate = self.timing.samp_clk_rate
+        with self.lock:
+            if not self.running:
+                self.start()
+                self.implicit = True
+            if n == READ_ALL_AVAILABLE:
+                n = ( self._buf_size() - self.read_pos ) if self._finite() else self._ai_available()
+            if self._finite() and self.read_pos + n > self._buf_size():
+                raise DaqError('Attempted to read samples that will never be acquired in a finite acquisition', -200278)
+            if not self._finite() and self._ai_available() > self._buf_size():
+                raise DaqError('Onboard device memory overflow, samples were lost before they could be read', -200279)
+            pos = self.read_pos
+            self.read_pos += n
+        self.device.wait_until(self.t_start + (pos + n) / rate)
+        times = self.t_start + ( pos + numpy.arange(n, dtype = numpy.float64) ) / rate
+        data = self.device.ai_values(self.channel_nums, times)
+        if self.implicit and self._finite() and self.read_pos >= self._buf_size(): self.stop()
+        return data
+
+    def _ai_codes(self, n):
+        # n samples per channel quantised to raw 14-bit ADC codes
+        data = self._ai_samples(n)
+        coeffs = numpy.array( [ self.device.ai_scaling(num) for num in self.channel_nums ] )
+        codes = numpy.rint( ( data - coeffs[:, 0:1] ) / coeffs[:, 1:2] )
+        return numpy.clip(codes, -2**(AI_RESOLUTION - 1), 2**(AI_RESOLUTION - 1) - 1).astype(numpy.int16)
+
+    def read(self, number_of_samples_per_channel = None, timeout = 10.0):
+        if self.kind != 'ai': raise DaqError('Read is not supported for an output task', -200477)
+        n_ch = len(self.channel_nums)
+        if not self._clocked():
+            data = self.device.ai_values(self.channel_nums, numpy.array( [self.device.now()] ))
+            return float(data[0, 0]) if n_ch == 1 else [ float(v) for v in data[:, 0] ]
+        if number_of_samples_per_channel is None:
+            data = self._ai_samples(1)
+            return float(data[0, 0]) if n_ch == 1 else [ float(v) for v in data[:, 0] ]
+        data = self._ai_samples(number_of_samples_per_channel)
+        return data[0].tolist() if n_ch == 1 else data.tolist()
+
+    # AO
+
+    def _ao_generated(self):
+        if not self.running or not self._clocked(): return 0
+        n = int( math.floor( ( self.device.now() - self.t_start ) * self.timing.samp_clk_rate + 1.0e-9 ) )
+        return min(n, self._buf_size()) if self._finite() else n
+
+    def _ao_values(self, index, times, idle):
+        # value of channel index of this task at the device times in times
+        if not self._clocked():
+            if len(self.ao_events_t) == 0: return numpy.full(times.shape, idle)
+            idx = numpy.searchsorted(self.ao_events_t, times, side = 'right') - 1
+            vals = numpy.asarray(self.ao_events_v)[:, index]
+            return numpy.where( idx >= 0, vals[numpy.clip(idx, 0, None)], idle )
+        if not self.running or self.ao_written == 0: return numpy.full(times.shape, idle)
+        i = numpy.floor( ( times - self.t_start ) * self.timing.samp_clk_rate + 1.0e-9 ).astype(numpy.int64)
+        before = i < 0
+        if self.ao_regen_data is not None and not self._finite():
+            vals = self.ao_regen_data[index, numpy.mod(i, self.ao_regen_data.shape[1])]
+        else:
+            data = self.ao_regen_data if self.ao_regen_data is not None else numpy.concatenate(self.ao_chunks, axis = 1)
+            base = 0 if self.ao_regen_data is not None else self.ao_chunk_starts[0]
+            n_max = min(self._buf_size(), self.ao_written) if self._finite() else self.ao_written
+            vals = data[index, numpy.clip(i, base, n_max - 1) - base]
+        return numpy.where(before, idle, vals)
+
+    def _ao_write(self, data):
+        # data is a (n_channels, n) float array
+        if self.kind != 'ao': raise DaqError('Write is not supported for an input task', -200477)
+        n_ch = len(self.channel_nums)
+        if data.shape[0] != n_ch:
+            raise DaqError('Write cannot be performed, the no. of channels in the data does not match the task', -200524)
+        lo = min( [ r[0] for r in self.ranges ] )
+        hi = max( [ r[1] for r in self.ranges ] )
+        if numpy.any(data < lo - 1.0e-9) or numpy.any(data > hi + 1.0e-9):
+            raise DaqError('Value passed to the Task/Channels In control is outside the range of the channel', -200561)
+        with self.lock:
+            if not self._clocked():
+                with self.device.lock:
+                    self.ao_events_t.append(self.device.now())
+                    self.ao_events_v.append(numpy.array(data[:, -1], dtype = numpy.float64))
+                    if len(self.ao_events_t) > 256:
+                        self.ao_events_t = self.ao_events_t[-128:]
+                        self.ao_events_v = self.ao_events_v[-128:]
+                return data.shape[1]
+            regen = self.out_stream.regen_mode == constants.RegenerationMode.ALLOW_REGENERATION
+            if self.running and regen:
+                # the buffer is replaced, as for a regenerating task that is rewritten while running
+                self.ao_regen_data = numpy.array(data, dtype = numpy.float64)
+                return data.shape[1]
+            if self.running and not regen and self._ao_generated() > self.ao_written:
+                self.ao_underflows += 1
+                raise DaqError('The generation has stopped to prevent the regeneration of old samples', -200290)
+            with self.device.lock:
+                self.ao_chunks.append( numpy.array(data, dtype = numpy.float64) )
+                self.ao_chunk_starts.append(self.ao_written)
+                self.ao_written += data.shape[1]
+                if self.running and not regen:
+                    # discard chunks that were generated more than a second ago so memory stays constant
+                    keep_from = self._ao_generated() - int( ( self.device.latency + 1.0 ) * self.timing.samp_clk_rate )
+                    while len(self.ao_chunks) > 1 and self.ao_chunk_starts[1] <= keep_from:
+                        self.ao_chunks.pop(0)
+                        self.ao_chunk_starts.pop(0)
+        return data.shape[1]
+
+    def write(self, data, auto_start = None, timeout = 10.0):
+        if self.kind != 'ao': raise DaqError('Write is not supported for an input task', -200477)
+        if hasattr(data, 'scaled_data'): data = data.scaled_data # nitypes AnalogWaveform
+        n_ch = len(self.channel_nums)
+        arr = numpy.asarray(data, dtype = numpy.float64)
+        if arr.ndim == 0:
+            arr = arr.reshape(1, 1)
+        elif arr.ndim == 1:
+            arr = arr.reshape(1, -1) if n_ch == 1 else arr.reshape(n_ch, -1)
+        if auto_start is None: auto_start = not self._clocked()
+        n = self._ao_write(arr)
+        if auto_start and not self.running:
+            self.start()
+            if not self._clocked(): self.implicit = True
+        return n
+
+# Stream readers and writers
+
+class stream_readers:
+    """
+    Namespace matching nidaqmx.stream_readers for the analog readers
+    """
+
+    class AnalogMultiChannelReader:
+
+        def __init__(self, task_in_stream):
+            self.task = task_in_stream.task
+
+        def read_many_sample(self, data, number_of_samples_per_channel = READ_ALL_AVAILABLE, timeout = 10.0):
+            n = data.shape[1] if number_of_samples_per_channel == READ_ALL_AVAILABLE else number_of_samples_per_channel
+            data[:, :n] = self.task._ai_samples(n)
+            return n
+
+        def read_one_sample(self, data, timeout = 10.0):
+            data[:] = self.task._ai_samples(1)[:, 0]
+
+    class AnalogSingleChannelReader:
+
+        def __init__(self, task_in_stream):
+            self.task = task_in_stream.task
+
+        def read_many_sample(self, data, number_of_samples_per_channel = READ_ALL_AVAILABLE, timeout = 10.0):
+            n = data.shape[0] if number_of_samples_per_channel == READ_ALL_AVAILABLE else number_of_samples_per_channel
+            data[:n] = self.task._ai_samples(n)[0]
+            return n
+
+        def read_one_sample(self, timeout = 10.0):
+            return float( self.task._ai_samples(1)[0, 0] )
+
+    class AnalogUnscaledReader:
+
+        def __init__(self, task_in_stream):
+            self.task = task_in_stream.task
+
+        def read_int16(self, data, number_of_samples_per_channel = READ_ALL_AVAILABLE, timeout = 10.0):
+            n = data.shape[1] if number_of_samples_per_channel == READ_ALL_AVAILABLE else number_of_samples_per_channel
+            data[:, :n] = self.task._ai_codes(n)
+            return n
+
+class stream_writers:
+    """
+    Namespace matching nidaqmx.stream_writers for the analog writers
+    """
+
+    class AnalogMultiChannelWriter:
+
+        def __init__(self, task_out_stream, auto_start = False):
+            self.task = task_out_stream.task
+            self.auto_start = auto_start
+
+        def write_many_sample(self, data, timeout = 10.0):
+            n = self.task._ao_write( numpy.asarray(data, dtype = numpy.float64) )
+            if self.auto_start and not self.task.running: self.task.start()
+            return n
+
+        def write_one_sample(self, data, timeout = 10.0):
+            self.task._ao_write( numpy.asarray(data, dtype = numpy.float64).reshape(-1, 1) )
+            if self.auto_start and not self.task.running: self.task.start()
+
+    class AnalogSingleChannelWriter:
+
+        def __init__(self, task_out_stream, auto_start = False):
+            self.task = task_out_stream.task
+            self.auto_start = auto_start
+
+        def write_many_sample(self, data, timeout = 10.0):
+            n = self.task._ao_write( numpy.asarray(data, dtype = numpy.float64).reshape(1, -1) )
+            if self.auto_start and not self.task.running: self.task.start()
+            return n
+
+        def write_one_sample(self, data, timeout = 10.0):
+            self.task._ao_write( numpy.array( [[data]], dtype = numpy.float64 ) )
+            if self.auto_start and not self.task.running: self.task.start()
+
+class errors:
+    """
+    Namespace matching nidaqmx.errors
+    """
+
+    DaqError = DaqError
@@ -0,0 +1,268 @@
+"""
+Streaming spectral analysis of AI blocks
+
+Welch_PSD keeps a running Welch average of the power spectral density of each channel, blocks of any length are split into
+overlapping windowed segments as they arrive, a partial segment is carried over to the next block, so memory use is
+one segment per channel plus the accumulated spectrum however long the stream runs
+Spectrum_Metrics extracts the fundamental, THD, SNR, SINAD and ENOB from an averaged spectrum
+Transfer_Function estimates a complex frequency response and its coherence from a reference and response record
+
+18 - 10 - 2026
+"""
+
+# Usage
+# psd = Welch_PSD(4, 5000.0, n_per_seg = 4096)
+# psd.update(block)   once per (n_channels, n_samples) block, e.g. from an AI_Monitor consumer, see NI_DAQ_Lib.AI_Spectrum
+# psd.frequencies, psd.psd() averaged one-sided PSD in units of V^2 / Hz, Spectrum_Metrics(psd.frequencies, psd.psd()[0], psd.mainlobe)
+
+# Windows are periodic (DFT-even) and cached with their normalisation, numpy.fft keeps its own cache of twiddle factors per length
+# so every segment after the first reuses both, segments are transformed together with one rfft call per block
+
+# import required libraries
+import math
+import numpy
+import functools
+
+MOD_NAME_STR = "NI_DAQ_Spectrum"
+
+# half width in bins of the region summed as the power of a tone, the main lobe plus the leakage skirt of a tone that is not
+# bin-centred, wide enough that the skirt left outside is below a 57 dB SNR, i.e. it is not counted as noise
+# hann sidelobes fall at 18 dB / octave so 12 bins suffice, hamming sidelobes fall at only 6 dB / octave and its far leakage
+# limits the measured SNR to about 45 dB whatever the width, use blackman or flattop for SNR / ENOB
+WINDOW_MAINLOBE = {'rect':1, 'hann':12, 'hamming':20, 'blackman':8, 'flattop':5}
+FLATTOP_COEFFS = (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368)
+
+@functools.lru_cache(maxsize = 32)
+def Window(name, n):
+    """
+    Periodic window of length n and its power normalisation, cached
+
+    Inputs
+    name(str) one of 'rect', 'hann', 'hamming', 'blackman', 'flattop'
+    n(int) window length
+
+    Output is a list [w, s2], w a read-only numpy array, s2 = sum(w**2)
+
+    18 - 10 - 2026
+    """
+
+    k = 2.0 * numpy.pi * numpy.arange(n) / n
+    if name == 'rect':
+        w = numpy.ones(n)
+    elif name == 'hann':
+        w = 0.5 - 0.5 * numpy.cos(k)
+    elif name == 'hamming':
+        w = 0.54 - 0.46 * numpy.cos(k)
+    elif name == 'blackman':
+        w = 0.42 - 0.5 * numpy.cos(k) + 0.08 * numpy.cos(2.0 * k)
+    elif name == 'flattop':
+        w = sum( [ (-1)**i * a * numpy.cos(i * k) for i, a in enumerate(FLATTOP_COEFFS) ] )
+    else:
+        raise ValueError('Unknown window ' + str(name) + ', use one of ' + str(tuple(WINDOW_MAINLOBE)))
+    w.flags.writeable = False
+    return [w, float(numpy.sum(w * w))]
+
+class Welch_PSD:
+    """
+    Running Welch estimate of the one-sided PSD of n_channels channels
+
+    Inputs
+    n_channels(int), sample_rate(float) per channel in units of Hz
+    n_per_seg(int) segment length, sets the resolution, sample_rate / n_per_seg
+    overlap(float) fraction of each segment shared with the next, in [0, 1)
+    window(str) see Window
+    detrend(boolean) remove the mean of each segment before the transform
+
+    Attributes
+    frequencies(numpy array) of the n_per_seg // 2 + 1 bins in units of Hz
+    n_segments(int) no. of segments averaged
+    enbw(float) equivalent noise bandwidth of one bin in units of Hz
+    mainlobe(int) half width in bins of the region summed as the power of a tone, see WINDOW_MAINLOBE
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_channels, sample_rate, n_per_seg = 4096, overlap = 0.5, window = 'hann', detrend = True):
+        if n_per_seg < 2 or overlap < 0 or overlap >= 1:
+            raise ValueError('n_per_seg must be >= 2 and overlap in [0, 1)')
+        self.n_channels = n_channels
+        self.sample_rate = float(sample_rate)
+        self.n_per_seg = int(n_per_seg)
+        self.step = max(1, int(round(self.n_per_seg * (1.0 - overlap))))
+        self.window_name = window
+        self.window, s2 = Window(window, self.n_per_seg)
+        self.detrend = detrend
+        self.mainlobe = WINDOW_MAINLOBE[window]
+        self.frequencies = numpy.fft.rfftfreq(self.n_per_seg, 1.0 / self.sample_rate)
+        self.enbw = self.sample_rate * s2 / numpy.sum(self.window)**2
+
+        # one-sided density scaling, every bin but DC and Nyquist counts twice
+        self.scale = numpy.full(len(self.frequencies), 2.0 / (self.sample_rate * s2))
+        self.scale[0] /= 2.0
+        if self.n_per_seg % 2 == 0: self.scale[-1] /= 2.0
+        self.reset()
+
+    def reset(self):
+        self.acc = numpy.zeros( (self.n_channels, len(self.frequencies)) )
+        self.n_segments = 0
+        self.tail = numpy.zeros( (self.n_channels, 0) ) # samples not yet part of a complete segment
+
+    def update(self, block):
+        """
+        add a (n_channels, n_samples) block, or (n_samples,) for one channel, every segment it completes is transformed
+        Output is the no. of new segments
+        """
+        block = numpy.asarray(block, dtype = numpy.float64).reshape(self.n_channels, -1)
+        data = numpy.concatenate( [self.tail, block], axis = 1 ) if self.tail.shape[1] > 0 else block
+        n = data.shape[1]
+        n_seg = 0 if n < self.n_per_seg else 1 + (n - self.n_per_seg) // self.step
+        if n_seg > 0:
+            # (n_channels, n_seg, n_per_seg) view of the overlapping segments, no copy until the window is applied
+            segs = numpy.lib.stride_tricks.sliding_window_view(data, self.n_per_seg, axis = 1)[:, ::self.step][:, :n_seg]
+            if self.detrend:
+                segs = segs - numpy.mean(segs, axis = 2, keepdims = True)
+            spec = numpy.fft.rfft(segs * self.window, axis = 2)
+            power = spec.real**2 + spec.imag**2
+            self.acc += numpy.sum(power, axis = 1)
+            self.n_segments += n_seg
+        # keep from the start of the next segment, at most n_per_seg - 1 samples
+        self.tail = numpy.array(data[:, n_seg * self.step:], copy = True) if n_seg > 0 else numpy.array(data, copy = True)
+        return n_seg
+
+    def psd(self):
+        """
+        averaged one-sided PSD, (n_channels, n_bins) in units of V^2 / Hz, zeros until a segment has been averaged
+        """
+        if self.n_segments == 0: return numpy.zeros_like(self.acc)
+        return self.acc * ( self.scale / self.n_segments )
+
+    def amplitude_spectrum(self):
+        """
+        RMS amplitude of a tone at each bin in units of V, sqrt(psd * enbw)
+        """
+        return numpy.sqrt( self.psd() * self.enbw )
+
+def Spectrum_Metrics(frequencies, psd, mainlobe = WINDOW_MAINLOBE['hann'], fundamental = None, n_harmonics = 5, dc_bins = None):
+    """
+    Fundamental, harmonic distortion and noise figures of one channel of an averaged spectrum
+
+    The power of a tone is the PSD summed over its main lobe times the bin width, harmonics fold about the Nyquist frequency
+    Noise is everything else, excluding the DC bins
+
+    Inputs
+    frequencies(numpy array) bin frequencies in units of Hz
+    psd(numpy array) one-sided PSD of one channel in units of V^2 / Hz
+    mainlobe(int) half width in bins of the region summed as the power of a tone, see WINDOW_MAINLOBE
+    fundamental(float) frequency of the fundamental in units of Hz, None => the largest bin above DC
+    n_harmonics(int) no. of harmonics counted in THD, 2nd to (n_harmonics + 1)th
+    dc_bins(int) no. of bins at DC excluded from the noise, None => mainlobe + 1, the fundamental must lie above them
+
+    Output is a dict with keys
+    frequency, amplitude (peak, in units of V), power (V^2), harmonics (list of [frequency, power]),
+    thd, thd_db, snr_db, sinad_db, enob, noise_rms (V), noise_floor (V^2 / Hz, median)
+    every figure is NaN when the PSD holds no power above DC, e.g. before any segment has been averaged
+
+    18 - 10 - 2026
+    """
+
+    n_bins = len(psd)
+    df = frequencies[1] - frequencies[0]
+    f_nyq = frequencies[-1]
+    dc_bins = mainlobe + 1 if dc_bins is None else dc_bins
+
+    if not numpy.any(psd[dc_bins:] > 0):
+        nan = float('nan')
+        return {'frequency':nan, 'amplitude':nan, 'power':nan, 'harmonics':[], 'thd':nan, 'thd_db':nan, 'snr_db':nan, 'sinad_db':nan,
+                'enob':nan, 'noise_rms':nan, 'noise_floor':nan}
+
+    if fundamental is None:
+        k0 = dc_bins + int( numpy.argmax(psd[dc_bins:]) )
+    else:
+        k0 = int( round(fundamental / df) )
+    # refine the peak to the centre of mass of the main lobe
+    lo, hi = max(dc_bins, k0 - mainlobe), min(n_bins, k0 + mainlobe + 1)
+    f0 = float( numpy.sum(frequencies[lo:hi] * psd[lo:hi]) / numpy.sum(psd[lo:hi]) )
+
+    used = numpy.zeros(n_bins, dtype = bool)
+    used[:dc_bins] = True
+
+    def Tone_Power(f):
+        # sum the main lobe around the bin nearest f, bins already counted are skipped
+        k = int( round(f / df) )
+        lo, hi = max(0, k - mainlobe), min(n_bins, k + mainlobe + 1)
+        sel = numpy.arange(lo, hi)[ ~used[lo:hi] ]
+        used[sel] = True
+        return float( numpy.sum(psd[sel]) * df )
+
+    p_fund = Tone_Power(f0)
+    harmonics = []
+    for h in range(2, n_harmonics + 2):
+        f = math.fmod(h * f0, 2.0 * f_nyq)
+        if f > f_nyq: f = 2.0 * f_nyq - f
+        harmonics.append( [f, Tone_Power(f)] )
+    p_harm = sum( [ p for f, p in harmonics ] )
+    p_noise = float( numpy.sum(psd[~used]) * df )
+    # the noise bins removed with the tones are replaced by the mean noise density
+    n_noise = numpy.count_nonzero(~used)
+    if n_noise > 0: p_noise *= (n_bins - dc_bins) / n_noise
+
+    tiny = 1.0e-300
+    sinad = p_fund / max(p_noise + p_harm, tiny)
+    sinad_db = 10.0 * math.log10(max(sinad, tiny))
+    return {'frequency':f0, 'amplitude':math.sqrt(2.0 * p_fund), 'power':p_fund, 'harmonics':harmonics,
+            'thd':math.sqrt(p_harm / max(p_fund, tiny)), 'thd_db':10.0 * math.log10(max(p_harm, tiny) / max(p_fund, tiny)),
+            'snr_db':10.0 * math.log10(max(p_fund, tiny) / max(p_noise, tiny)), 'sinad_db':sinad_db, 'enob':(sinad_db - 1.76) / 6.02,
+            'noise_rms':math.sqrt(p_noise), 'noise_floor':float( numpy.median(psd[~used]) ) if n_noise > 0 else 0.0}
+
+def Transfer_Function(x, y, sample_rate, n_per_seg, overlap = 0.5, window = 'hann'):
+    """
+    H1 estimate of the transfer function from x to each row of y, with the magnitude squared coherence
+
+    Segments are windowed and transformed together as in Welch_PSD, then
+    H = sum(conj(X) Y) / sum(|X|^2) and coherence = |sum(conj(X) Y)|^2 / ( sum(|X|^2) sum(|Y|^2) ) over the segments
+    The coherence of a single segment is 1 by definition, average several to make it meaningful
+    For a periodic excitation use n_per_seg = one period, window = 'rect' and overlap = 0, there is then no leakage
+
+    Inputs
+    x(numpy array) 1D reference, e.g. the AI loopback of the AO excitation
+    y(numpy array) (n_outputs, n) or (n,) responses sampled on the same clock as x
+    sample_rate(float) in units of Hz
+    n_per_seg(int), overlap(float), window(str) as for Welch_PSD
+
+    Output is a list [frequencies, H, coherence, pxx]
+    frequencies(numpy array) in units of Hz
+    H(numpy array) complex (n_outputs, n_bins)
+    coherence(numpy array) (n_outputs, n_bins) in [0, 1]
+    pxx(numpy array) one-sided PSD of x in units of V^2 / Hz, shows where x carries power
+
+    18 - 10 - 2026
+    """
+
+    x = numpy.asarray(x, dtype = numpy.float64)
+    y = numpy.atleast_2d( numpy.asarray(y, dtype = numpy.float64) )
+    n = min(len(x), y.shape[1])
+    step = max(1, int(round(n_per_seg * (1.0 - overlap))))
+    if n < n_per_seg:
+        raise ValueError('Transfer_Function needs at least n_per_seg samples')
+    n_seg = 1 + (n - n_per_seg) // step
+    w, s2 = Window(window, n_per_seg)
+
+    data = numpy.vstack( [x[:n], y[:, :n]] )
+    segs = numpy.lib.stride_tricks.sliding_window_view(data, n_per_seg, axis = 1)[:, ::step][:, :n_seg]
+    segs = segs - numpy.mean(segs, axis = 2, keepdims = True)
+    spec = numpy.fft.rfft(segs * w, axis = 2)
+
+    X = spec[0]
+    Y = spec[1:]
+    sxx = numpy.sum(X.real**2 + X.imag**2, axis = 0)
+    syy = numpy.sum(Y.real**2 + Y.imag**2, axis = 1)
+    sxy = numpy.sum(numpy.conj(X) * Y, axis = 1)
+
+    tiny = 1.0e-300
+    H = sxy / numpy.maximum(sxx, tiny)
+    coherence = (sxy.real**2 + sxy.imag**2) / numpy.maximum(sxx * syy, tiny)
+
+    pxx = sxx * ( 2.0 / (sample_rate * s2 * n_seg) )
+    pxx[0] /= 2.0
+    if n_per_seg % 2 == 0: pxx[-1] /= 2.0
+    return [numpy.fft.rfftfreq(n_per_seg, 1.0 / sample_rate), H, coherence, pxx]
@@ -0,0 +1,84 @@
+"""
+Streaming per-channel statistics for DAQ measurements
+
+Running mean, variance, min, max and count updated block by block, memory use is O(channels) however many samples are seen
+Blocks are combined with the pairwise update of Chan, Golub and LeVeque, which is the block form of Welford's algorithm
+and stays numerically stable when the mean is large compared with the spread, e.g. mV noise on a 10 V set-point
+
+18 - 10 - 2026
+"""
+
+# import required libraries
+import numpy
+
+MOD_NAME_STR = "NI_DAQ_Stats"
+
+class Running_Stats:
+    """
+    Running statistics of n_channels channels
+
+    update(block) accepts
+    a (n_channels, n_samples) array of samples
+    a (n_channels,) array or list holding one sample per channel, or a float when n_channels = 1
+    a (n_samples,) array when n_channels = 1
+
+    Attributes
+    count(int) no. of samples per channel seen
+    mean, min, max(numpy array) of shape (n_channels,)
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, n_channels = 1):
+        self.n_channels = n_channels
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = numpy.zeros(self.n_channels)
+        self.m2 = numpy.zeros(self.n_channels) # sum of squared deviations from the mean
+        self.min = numpy.full(self.n_channels, numpy.inf)
+        self.max = numpy.full(self.n_channels, -numpy.inf)
+
+    def update(self, block):
+        """
+        add a block of samples, see the class docstring for the accepted shapes
+        """
+        block = numpy.asarray(block, dtype = numpy.float64)
+        if block.ndim < 2:
+            block = block.reshape(1, -1) if self.n_channels == 1 else block.reshape(self.n_channels, 1)
+
+        n_b = block.shape[1]
+        if n_b == 0: return
+        mean_b = numpy.mean(block, axis = 1)
+        m2_b = numpy.var(block, axis = 1) * n_b if n_b > 1 else numpy.zeros(self.n_channels)
+        self._combine(n_b, mean_b, m2_b)
+        numpy.minimum(self.min, numpy.min(block, axis = 1), out = self.min)
+        numpy.maximum(self.max, numpy.max(block, axis = 1), out = self.max)
+
+    def merge(self, other):
+        """
+        fold the statistics of another Running_Stats over the same channels into this one
+        """
+        if other.count == 0: return
+        self._combine(other.count, other.mean, other.m2)
+        numpy.minimum(self.min, other.min, out = self.min)
+        numpy.maximum(self.max, other.max, out = self.max)
+
+    def _combine(self, n_b, mean_b, m2_b):
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * (n_b / n)
+        self.m2 += m2_b + delta * delta * (n_a * n_b / n)
+        self.count = n
+
+    def variance(self, ddof = 1):
+        """
+        per-channel variance, ddof = 1 => sample variance as numpy.var(..., ddof = 1), nan until count > ddof
+        """
+        if self.count <= ddof: return numpy.full(self.n_channels, numpy.nan)
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof = 1):
+        return numpy.sqrt(self.variance(ddof))
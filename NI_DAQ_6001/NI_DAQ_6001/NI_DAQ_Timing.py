@@ -0,0 +1,168 @@
+"""
+Lazy time axis for regularly sampled blocks
+
+A Time_Axis holds only (t0, dt, n), so attaching one to every acquired or generated block costs O(1) memory
+Sample times are produced on demand as t0 + k * dt, so the no. of times always equals the no. of samples,
+which numpy.arange(t0, tf, dT) does not guarantee once rounding error accumulates in tf
+
+18 - 10 - 2026
+"""
+
+# import required libraries
+import numpy
+import datetime
+
+try:
+    import nitypes
+    import nitypes.waveform
+except ImportError:
+    nitypes = None
+
+MOD_NAME_STR = "NI_DAQ_Timing"
+
+class Time_Axis:
+    """
+    Regular time axis, sample k is at time t0 + k * dt, for k in [0, n)
+
+    t0(float) time of the first sample in units of second, relative to timestamp when one is given
+    dt(float) sample interval in units of second
+    n(int) no. of samples
+    timestamp(datetime) optional absolute time of t = 0, carried through slicing and to nitypes Timing
+
+    Indexing
+    axis[k] is the time of sample k, a float
+    axis[i:j:s] is another Time_Axis, no times are computed
+    axis[index_array] is a numpy array of the selected times
+    numpy.asarray(axis) or axis.values() materialises every time
+
+    18 - 10 - 2026
+    """
+
+    __slots__ = ('t0', 'dt', 'n', 'timestamp')
+
+    def __init__(self, t0, dt, n, timestamp = None):
+        if dt <= 0 or n < 0:
+            raise ValueError('Time_Axis needs dt > 0 and n >= 0')
+        self.t0 = float(t0)
+        self.dt = float(dt)
+        self.n = int(n)
+        self.timestamp = timestamp
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        return "Time_Axis(t0 = %(v1)r, dt = %(v2)r, n = %(v3)d)"%{"v1":self.t0, "v2":self.dt, "v3":self.n}
+
+    def __eq__(self, other):
+        return isinstance(other, Time_Axis) and (self.t0, self.dt, self.n, self.timestamp) == (other.t0, other.dt, other.n, other.timestamp)
+
+    @property
+    def end(self):
+        """
+        time one sample interval after the last sample, i.e. t0 of the block that would follow this one
+        """
+        return self.t0 + self.n * self.dt
+
+    @property
+    def sample_rate(self):
+        return 1.0 / self.dt
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.n)
+            return Time_Axis(self.t0 + start * self.dt, self.dt * step, len( range(start, stop, step) ), self.timestamp)
+        if isinstance(key, (int, numpy.integer)):
+            k = int(key) + self.n if key < 0 else int(key)
+            if k < 0 or k >= self.n:
+                raise IndexError('Time_Axis index out of range')
+            return self.t0 + k * self.dt
+        idx = numpy.asarray(key)
+        if idx.dtype == bool:
+            idx = numpy.flatnonzero(idx)
+        return self.t0 + idx * self.dt
+
+    def values(self, out = None):
+        """
+        materialise the n sample times, into out if given
+        """
+        if out is None:
+            out = numpy.empty(self.n, dtype = numpy.float64)
+        out[:] = numpy.arange(self.n)
+        out *= self.dt
+        out += self.t0
+        return out
+
+    def __array__(self, dtype = None, copy = None):
+        vals = self.values()
+        return vals if dtype is None else vals.astype(dtype)
+
+    def index_of(self, t):
+        """
+        index of the sample nearest to time t, not clipped to [0, n)
+        """
+        return int( round( (t - self.t0) / self.dt ) )
+
+    def follows(self, other, rtol = 1.0e-9):
+        """
+        True if this axis starts where other ends, with the same sample interval
+        """
+        return ( abs(self.dt - other.dt) <= rtol * self.dt and abs(self.t0 - other.end) <= rtol * max(1.0, abs(other.end))
+                and self.timestamp == other.timestamp )
+
+    def concatenate(self, *others):
+        """
+        axis covering this block followed by others, each of which must follow on from the one before
+        raises ValueError if there is a gap, overlap or change of sample interval
+        """
+        n = self.n
+        last = self
+        for other in others:
+            if not other.follows(last):
+                raise ValueError('Time_Axis blocks are not contiguous: ' + repr(last) + ', ' + repr(other))
+            n += other.n
+            last = other
+        return Time_Axis(self.t0, self.dt, n, self.timestamp)
+
+    def shift(self, delta):
+        """
+        same axis delayed by delta seconds
+        """
+        return Time_Axis(self.t0 + delta, self.dt, self.n, self.timestamp)
+
+    def to_timing(self):
+        """
+        equivalent nitypes.waveform.Timing with a regular sample interval
+        the sample interval and offset are rounded to the microsecond resolution of datetime.timedelta
+        """
+        if nitypes is None:
+            raise ImportError('nitypes is required for Time_Axis.to_timing')
+        return nitypes.waveform.Timing.create_with_regular_interval( datetime.timedelta(seconds = self.dt), self.timestamp,
+                                                                    datetime.timedelta(seconds = self.t0) )
+
+    @classmethod
+    def from_timing(cls, timing, n):
+        """
+        Time_Axis for n samples described by a regular nitypes.waveform.Timing, e.g. waveform.timing
+        """
+        dt = timing.sample_interval.total_seconds()
+        offset = getattr(timing, 'time_offset', None)
+        t0 = offset.total_seconds() if offset is not None else 0.0
+        timestamp = timing.timestamp if getattr(timing, 'has_timestamp', False) else None
+        return cls(t0, dt, n, timestamp)
+
+    @classmethod
+    def from_sweep_space(cls, space):
+        """
+        Time_Axis with the same points as a Sweep_Interval.SweepSpace, as returned by the waveform generators
+        """
+        return cls(space.start, space.delta, space.Nsteps)
+
+def Concatenate(axes):
+    """
+    Single Time_Axis covering a list of contiguous blocks, see Time_Axis.concatenate
+
+    18 - 10 - 2026
+    """
+
+    return axes[0].concatenate(*axes[1:])
@@ -0,0 +1,232 @@
+"""
+Software trigger with pre- and post-trigger capture on a continuous AI stream
+
+The USB-6001 only offers a digital start trigger, so analog level / edge / window conditions are evaluated in software
+Each block is tested with a handful of vectorised comparisons as it arrives from the driver, so a trigger is detected
+at most one block after the sample that caused it, and the samples around it are copied out of the AI_Ring_Buffer
+once the post-trigger samples have been acquired
+
+18 - 10 - 2026
+"""
+
+# Usage
+# trig = Software_Trigger(sample_rate, channel = 0, mode = 'edge', level = 1.0, slope = 'rising', hysteresis = 0.05, pre_time = 0.01, post_time = 0.04)
+# AI_Monitor(..., consumer = trig.process) runs the trigger on every block, trig.captures holds the results
+# or see NI_DAQ_Lib.AI_Triggered_Capture which does both
+
+# Conditions, for each sample the condition is met (+1), clearly not met (-1) or in the hysteresis band (0, keep the previous state)
+# edge rising:   +1 when x >= level, -1 when x < level - hysteresis, trigger on a change -1 => +1
+# edge falling:  +1 when x <= level, -1 when x > level + hysteresis, trigger on a change -1 => +1
+# level:         as edge, but any sample meeting the condition while the trigger is armed fires it, even without a crossing
+# window rising: +1 inside [low, high], -1 further than hysteresis outside, i.e. trigger on entering the window
+# window falling: +1 outside [low, high], -1 further than hysteresis inside, i.e. trigger on leaving the window
+# An edge or window trigger needs the signal to be seen in the -1 state first, so a signal already past the level at the start does not fire it
+
+# import required libraries
+import time
+import numpy
+import NI_DAQ_Timing
+import NI_DAQ_Scaling
+
+MOD_NAME_STR = "NI_DAQ_Trigger"
+
+TRIGGER_MODES = ('edge', 'level', 'window')
+TRIGGER_SLOPES = ('rising', 'falling')
+
+def Condition_State(x, mode = 'edge', level = 0.0, slope = 'rising', hysteresis = 0.0, window = None):
+    """
+    Per-sample trigger condition state of x, see the table at the top of the module
+
+    Inputs
+    x(numpy array) 1D samples
+    mode(str) 'edge', 'level' or 'window'
+    level(float) trigger level for edge and level modes in units of V
+    slope(str) 'rising' or 'falling'
+    hysteresis(float) width of the band in which the previous state is held in units of V
+    window(tuple) (low, high) limits for window mode in units of V
+
+    Output is an int8 array, +1 where the condition is met, -1 where it is clearly not met, 0 in the hysteresis band
+
+    18 - 10 - 2026
+    """
+
+    state = numpy.zeros(len(x), dtype = numpy.int8)
+    if mode == 'window':
+        low, high = window
+        inside = (x >= low) & (x <= high)
+        outside = (x < low - hysteresis) | (x > high + hysteresis)
+        if slope == 'falling':
+            inside, outside = (x < low) | (x > high), (x >= low + hysteresis) & (x <= high - hysteresis)
+        state[inside] = 1
+        state[outside] = -1
+    elif slope == 'rising':
+        state[x >= level] = 1
+        state[x < level - hysteresis] = -1
+    else:
+        state[x <= level] = 1
+        state[x > level + hysteresis] = -1
+    return state
+
+def Find_Triggers(state, previous = 0, level_mode = False):
+    """
+    Indices at which a trigger condition fires
+
+    The state is forward filled through the hysteresis band, an edge or window trigger fires where the filled state changes -1 => +1
+    and a level trigger at every sample where it is +1, the caller takes the first one allowed by its re-arm logic
+
+    Inputs
+    state(numpy array) output of Condition_State
+    previous(int) filled state before state[0], 0 => unknown, carry the last filled state between blocks
+    level_mode(boolean) True => return every sample at which the filled state is +1
+
+    Output is a list [indices, last]
+    indices(numpy array) positions in state at which the trigger fires
+    last(int) filled state at the end of the block, pass it as previous for the next block
+
+    18 - 10 - 2026
+    """
+
+    n = len(state)
+    if n == 0: return [numpy.zeros(0, dtype = numpy.intp), previous]
+
+    # index of the latest sample at or before each position with a definite state, -1 => none in this block
+    pos = numpy.where(state != 0, numpy.arange(n), -1)
+    numpy.maximum.accumulate(pos, out = pos)
+    filled = numpy.where(pos >= 0, state[pos], previous)
+    if level_mode: return [ numpy.flatnonzero(filled == 1), int(filled[-1]) ]
+
+    before = numpy.empty(n, dtype = filled.dtype)
+    before[0] = previous
+    before[1:] = filled[:-1]
+    return [ numpy.flatnonzero( (filled == 1) & (before == -1) ), int(filled[-1]) ]
+
+class Software_Trigger:
+    """
+    Software trigger with pre- and post-trigger capture for use as an AI_Monitor consumer
+
+    Inputs
+    sample_rate(float) per channel in units of Hz
+    channel(int) row of the ring buffer tested by the trigger
+    mode(str), level(float), slope(str), hysteresis(float), window(tuple) see Condition_State
+    pre_time(float) length of time kept before the trigger sample in units of second
+    post_time(float) length of time kept from the trigger sample on in units of second
+    holdoff_time(float) extra dead time after each capture before the trigger re-arms in units of second
+    rearm(boolean) True => re-arm automatically after each capture, False => single shot, call arm() for the next capture
+    max_captures(int) stop triggering after this many captures, None => no limit
+    on_capture(function) optional, called as on_capture(capture) from the acquisition thread, captures are then not kept
+    keep(int) no. of most recent captures kept in captures when on_capture is None
+
+    Each capture is a dict with keys
+    data(numpy array) (n_channels, n_pre + n_post) samples in units of V
+    time_axis(Time_Axis) time of each sample relative to the trigger sample in units of second
+    index(int) sample no. of the trigger sample since the start of the acquisition
+    time(float) index / sample_rate
+    latency(int) no. of samples acquired after the trigger sample by the time it was detected, at most one block
+
+    stats(dict) with keys blocks, samples, triggers, captures, dropped, max_latency, process_time
+    triggers counts the triggers accepted, captures those delivered, process_time is the total time spent in process in units of second
+    dropped counts triggers whose pre-trigger samples were not, or no longer, in the ring buffer
+
+    18 - 10 - 2026
+    """
+
+    def __init__(self, sample_rate, channel = 0, mode = 'edge', level = 0.0, slope = 'rising', hysteresis = 0.0, window = None,
+                 pre_time = 0.01, post_time = 0.04, holdoff_time = 0.0, rearm = True, max_captures = None, on_capture = None, keep = 100):
+        if mode not in TRIGGER_MODES:
+            raise ValueError('mode must be one of ' + str(TRIGGER_MODES))
+        if slope not in TRIGGER_SLOPES:
+            raise ValueError('slope must be one of ' + str(TRIGGER_SLOPES))
+        if mode == 'window' and ( window is None or window[0] >= window[1] ):
+            raise ValueError('window mode needs window = (low, high) with low < high')
+        if hysteresis < 0 or pre_time < 0 or post_time <= 0 or holdoff_time < 0:
+            raise ValueError('hysteresis, pre_time, holdoff_time must be >= 0 and post_time > 0')
+
+        self.sample_rate = float(sample_rate)
+        self.channel = channel
+        self.condition = {'mode':mode, 'level':level, 'slope':slope, 'hysteresis':hysteresis, 'window':window}
+        self.n_pre = int(round(pre_time * self.sample_rate))
+        self.n_post = max(1, int(round(post_time * self.sample_rate)))
+        self.n_holdoff = int(round(holdoff_time * self.sample_rate))
+        self.rearm = rearm
+        self.max_captures = max_captures
+        self.on_capture = on_capture
+        self.keep = keep
+        self.time_axis = NI_DAQ_Timing.Time_Axis(-self.n_pre / self.sample_rate, 1.0 / self.sample_rate, self.n_pre + self.n_post)
+
+        self.captures = []
+        self.stats = {'blocks':0, 'samples':0, 'triggers':0, 'captures':0, 'dropped':0, 'max_latency':0, 'process_time':0.0}
+        self.seen = 0 # no. of samples per channel already tested
+        self.pending = [] # (trigger index, latency) waiting for their post-trigger samples
+        self.arm()
+
+    def arm(self):
+        """
+        arm the trigger, the next sample meeting the condition after the signal has left it fires the trigger
+        """
+        self.armed = True
+        self.state = 0
+        self.next_allowed = self.seen
+
+    def done(self):
+        """
+        True once max_captures captures have been made
+        """
+        return self.max_captures is not None and self.stats['captures'] >= self.max_captures
+
+    def process(self, ring):
+        """
+        test the samples written to ring since the last call and complete any captures whose post-trigger samples have arrived
+        ring(AI_Ring_Buffer) the signature matches the AI_Monitor consumer, so trig.process can be passed directly
+        """
+        t_start = time.perf_counter()
+        total = ring.total
+        n_new = min(total - self.seen, ring.capacity)
+        if n_new > 0 and self.armed and not self.done():
+            self._test(ring, total, n_new)
+        self.seen = total
+        self.stats['blocks'] += 1
+        self.stats['samples'] = total
+
+        while len(self.pending) > 0 and self.pending[0][0] + self.n_post <= total:
+            self._capture(ring, total, *self.pending.pop(0))
+        self.stats['process_time'] += time.perf_counter() - t_start
+
+    def _test(self, ring, total, n_new):
+        x = ring.latest(n_new)[self.channel]
+        if ring.coeffs is not None:
+            # same scaling as every other raw block, see NI_DAQ_Scaling.Scale_Raw
+            x = NI_DAQ_Scaling.Scale_Raw(x[numpy.newaxis, :], ring.coeffs[self.channel:self.channel + 1])[0]
+        first = total - n_new # sample no. of x[0]
+
+        state = Condition_State(x, **self.condition)
+        idx, self.state = Find_Triggers(state, self.state, self.condition['mode'] == 'level')
+
+        # accept triggers in order, each one blocks the next until its capture and holdoff are over
+        k = numpy.searchsorted(idx, self.next_allowed - first)
+        while k < len(idx):
+            trig = first + int(idx[k])
+            latency = total - 1 - trig
+            self.pending.append( (trig, latency) )
+            self.stats['triggers'] += 1
+            if latency > self.stats['max_latency']: self.stats['max_latency'] = latency
+            self.next_allowed = trig + self.n_post + self.n_holdoff
+            if not self.rearm or ( self.max_captures is not None and self.stats['captures'] + len(self.pending) >= self.max_captures ):
+                self.armed = False
+                break
+            k = numpy.searchsorted(idx, self.next_allowed - first)
+
+    def _capture(self, ring, total, trig, latency):
+        start = trig - self.n_pre
+        if start < 0 or total - start > ring.capacity:
+            self.stats['dropped'] += 1
+            if self.rearm and not self.armed and not self.done(): self.arm()
+            return
+        data = ring.latest_volts(total - start)[:, :self.n_pre + self.n_post]
+        capture = {'data':numpy.array(data, dtype = numpy.float64), 'time_axis':self.time_axis, 'index':trig,
+                   'time':trig / self.sample_rate, 'latency':latency}
+        self.stats['captures'] += 1
+        if self.on_capture is not None:
+            self.on_capture(capture)
+        else:
+            self.captures.append(capture)
+            if len(self.captures) > self.keep: del self.captures[0]